@@ -1,5 +1,14 @@
+import sys
 from collections import UserDict
-from datetime import datetime
+from datetime import date, datetime
+from itertools import islice
+
+from columns import BookColumns
+from dedupe import DEFAULT_THRESHOLD, find_duplicates
+from indexes import (BirthdayCalendar, DeletionIndex, NGramIndex, PhoneIndex, birthday_countdown, calendar_slot,
+                     days_until_birthday)
+from query import QueryPlan, parse_query
+from storage import QueryableStorage, VersionedRecords
 
 
 def is_valid_date(date_str, date_format='%d-%m-%Y'):
@@ -26,6 +35,8 @@ class Field:
 
     :param value: Початкове значення поля.
     """
+    __slots__ = ('__value',)
+
     def __init__(self, value):
         self.__value = value
 
@@ -55,6 +66,16 @@ class Field:
             raise ValueError("Invalid value format")
         self.__value = new_value
 
+    def __setstate__(self, state):
+        """
+        Відновлює поле з pickle, зокрема зі старих файлів, де поле зберігалось у __dict__.
+
+        :param state: Стан об'єкту (словник або кортеж (dict, slots)).
+        """
+        if isinstance(state, tuple):
+            state = state[1]
+        self.__value = state['_Field__value']
+
     def __str__(self):
         """Повертає рядкове представлення поточного значення поля."""
         return str(self.value)
@@ -63,17 +84,66 @@ class Birthday(Field):
     """
     Клас для представлення поля "дата народження".
 
-    :param value: Значення поля (об'єкт datetime).
+    Дата зберігається як порядковий номер дня (date.toordinal()).
+
+    :param value: Значення поля (об'єкт datetime або рядок у форматі '%d-%m-%Y').
     """
+    __slots__ = ('ordinal',)
+
     def __init__(self, value):
         self.value = value
 
+    @classmethod
+    def from_ordinal(cls, ordinal):
+        """
+        Створює поле з порядкового номера дня без повторної перевірки.
+
+        :param ordinal: Порядковий номер дня.
+        :return: Екземпляр Birthday.
+        """
+        birthday = cls.__new__(cls)
+        birthday.ordinal = ordinal
+        return birthday
+
     def validate(self, value):
-        """Перевіряє, чи є значення об'єктом datetime."""
-        return isinstance(value, datetime)
+        """Перевіряє, чи є значення об'єктом date/datetime або рядком у форматі '%d-%m-%Y'."""
+        return isinstance(value, date) or (isinstance(value, str) and is_valid_date(value))
+
+    @property
+    def value(self):
+        """Повертає дату народження як об'єкт datetime."""
+        return datetime.fromordinal(self.ordinal)
+
+    @value.setter
+    def value(self, new_value):
+        """
+        Встановлює нову дату народження.
+
+        :param new_value: Об'єкт date/datetime або рядок у форматі '%d-%m-%Y'.
+        :raise ValueError: Якщо нове значення невірного формату.
+        """
+        if not self.validate(new_value):
+            raise ValueError("Invalid value format")
+        if isinstance(new_value, str):
+            new_value = datetime.strptime(new_value, '%d-%m-%Y')
+        self.ordinal = new_value.toordinal()
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            state = state[1]
+        if 'ordinal' in state:
+            self.ordinal = state['ordinal']
+        else:
+            self.value = state['_Field__value']
+
+    def __str__(self):
+        """Повертає дату у форматі '%d-%m-%Y'."""
+        return self.value.strftime('%d-%m-%Y')
 
 
 class Name(Field):
+    __slots__ = ()
+
     def validate(self, value):
         return value is None or (isinstance(value, str) and value.replace(" ", "").isalpha())
 
@@ -83,6 +153,8 @@ class Phone(Field):
 
     :param value: Значення поля (рядок).
     """
+    __slots__ = ()
+
     def __init__(self, value):
         self.value = value
 
@@ -90,29 +162,207 @@ class Phone(Field):
         """Перевіряє, чи є значення рядком, що складається лише з цифр."""
         return value is None or (isinstance(value, str) and value.isdigit())
 
+    def __getitem__(self, key):
+        """Підтримує старий доступ до телефону як до словника: phone['value']."""
+        if key != 'value':
+            raise KeyError(key)
+        return self.value
+
+
+class _RecordPhone(Phone):
+    """
+    Телефон, отриманий з контакту: нове значення записується назад у контакт
+    (на тому ж місці в списку телефонів), а контакт повідомляє книгу про зміну.
+
+    :param value: Нормалізований номер телефону.
+    :param record: Контакт, якому належить телефон.
+    """
+    __slots__ = ('_record',)
+
+    def __init__(self, value, record):
+        Field.__init__(self, value)
+        self._record = record
+
+    def _set_value(self, new_value):
+        old_value = self.value
+        Phone.value.fset(self, new_value)
+        record = self._record
+        record.phones = [new_value if phone == old_value else phone for phone in record.phone_numbers]
+
+    value = property(Phone.value.fget, _set_value, doc=Phone.value.__doc__)
+
+    def __reduce__(self):
+        """Серіалізується як звичайне поле Phone, без контакту."""
+        return Phone, (self.value,)
+
+
+class _RecordBirthday(Birthday):
+    """
+    Дата народження, отримана з контакту: нове значення записується назад у контакт.
+
+    :param ordinal: Порядковий номер дня.
+    :param record: Контакт, якому належить дата.
+    """
+    __slots__ = ('_record',)
+
+    def __init__(self, ordinal, record):
+        self.ordinal = ordinal
+        self._record = record
+
+    def _set_value(self, new_value):
+        Birthday.value.fset(self, new_value)
+        self._record.birthday = self.ordinal
+
+    value = property(Birthday.value.fget, _set_value, doc=Birthday.value.__doc__)
+
+    def __reduce__(self):
+        """Серіалізується як звичайне поле Birthday, без контакту."""
+        return Birthday.from_ordinal, (self.ordinal,)
+
+
+PHONE_SEPARATORS = str.maketrans('', '', ' ()-.+')
+
+
+def normalize_phone(phone):
+    """
+    Нормалізує номер телефону: прибирає пробіли, дужки, дефіси, крапки і '+'.
+
+    :param phone: Номер телефону (рядок, словник {'value': ...} або Phone).
+    :return: Інтернований рядок з цифр.
+    :raise ValueError: Якщо після нормалізації номер містить не лише цифри.
+    """
+    if isinstance(phone, str) and phone.isdigit():
+        return sys.intern(phone)
+    if isinstance(phone, (dict, Phone)):
+        phone = phone['value']
+    phone = str(phone).translate(PHONE_SEPARATORS)
+    if not phone.isdigit():
+        raise ValueError(f"Invalid phone number: {phone}")
+    return sys.intern(phone)
+
+
 class Record(Field):
     """
     Клас для представлення контакту.
 
+    Телефони зберігаються як кортеж інтернованих рядків, а дата народження —
+    як порядковий номер дня; атрибути phones (кортеж) і birthday повертають
+    поля Phone і Birthday, створені з цього компактного представлення. Нове
+    значення такого поля записується назад у контакт, а щоб додати чи
+    видалити телефон, використовуйте add_phone і remove_phone. Контакт, доданий
+    до адресної книги або отриманий через AddressBook.find чи AddressBook.edit,
+    повідомляє її про свої зміни; книга зберігає незалежну копію, тож збережені
+    контакти ніколи не змінюються на місці і версії та знімки книги лишаються
+    стабільними.
+
+    Незмінні частини рядків виведення кешуються при першому форматуванні і
+    скидаються при будь-якій зміні телефонів або дати народження; щоразу
+    обчислюється лише кількість днів до дня народження.
+
     :param name: Ім'я контакту (рядок).
     :param birthday: Дата народження контакту (рядок у форматі '%d-%m-%Y').
     """
+    __slots__ = ('name', '_phones', '_birthday', '_book', '_rendered')
+
     def __init__(self, name, birthday=None):
+        self._book = None
+        self._rendered = None
         self.name = Name(name)
-        self.phones = [{'value': ''}]
-        self.birthday = Birthday(birthday) if birthday else None
+        self._phones = ()
+        self.birthday = birthday
+
+    def _changed(self):
+        """Скидає кеш рядків виведення і повідомляє адресну книгу про зміну контакту."""
+        self._rendered = None
+        if self._book is not None:
+            self._book._record_changed(self)
+
+    @property
+    def phones(self):
+        """
+        Повертає телефони контакту як кортеж полів Phone.
+
+        Кортеж не можна змінити; зміна значення поля записується в контакт.
+        """
+        return tuple(_RecordPhone(phone, self) for phone in self._phones)
+
+    @phones.setter
+    def phones(self, phones):
+        """
+        Замінює всі телефони контакту.
+
+        :param phones: Ітерований набір рядків, полів Phone або словників {'value': ...}.
+        """
+        self._phones = tuple(normalize_phone(phone) for phone in phones)
+        self._changed()
+
+    @property
+    def phone_numbers(self):
+        """Повертає кортеж нормалізованих номерів телефонів."""
+        return self._phones
+
+    @property
+    def birthday(self):
+        """Повертає дату народження як поле Birthday, зміна значення якого записується в контакт, або None."""
+        if self._birthday is None:
+            return None
+        return _RecordBirthday(self._birthday, self)
+
+    @birthday.setter
+    def birthday(self, birthday):
+        """
+        Встановлює дату народження.
+
+        :param birthday: Поле Birthday, об'єкт datetime, рядок '%d-%m-%Y' або None.
+        :raise ValueError: Якщо формат дати невірний.
+        """
+        if birthday is None or isinstance(birthday, int):
+            self._birthday = birthday
+        elif isinstance(birthday, Birthday):
+            self._birthday = birthday.ordinal
+        else:
+            self._birthday = Birthday(birthday).ordinal
+        self._changed()
+
+    @property
+    def birthday_ordinal(self):
+        """Повертає дату народження як порядковий номер дня або None."""
+        return self._birthday
+
+    def __getstate__(self):
+        """Повертає компактний стан контакту для pickle."""
+        return self.name.value, self._phones, self._birthday
+
+    def __setstate__(self, state):
+        """
+        Відновлює контакт з pickle.
+
+        :param state: Кортеж (ім'я, телефони, день народження) або словник
+                      атрибутів зі старих файлів.
+        """
+        self._book = None
+        self._rendered = None
+        if isinstance(state, tuple):
+            name, phones, birthday = state
+            self.name = Name(name)
+            self._phones = tuple(sys.intern(phone) for phone in phones)
+            self._birthday = birthday
+        else:
+            self.name = state['name']
+            self.phones = [phone for phone in state.get('phones', []) if phone['value']]
+            self.birthday = state.get('birthday')
 
     def add_phone(self, phone):
         """Добавити номер телефону"""
-        self.phones.append({'value': phone})
+        self._phones += (normalize_phone(phone),)
+        self._changed()
 
     def remove_phone(self, phone):
         """Видалити номер телефону"""
-        while any(p.value == phone for p in self.phones if p.value):
-            for p in self.phones:
-                if p.value == phone:
-                    self.phones.remove(p)
-                    break
+        phone = normalize_phone(phone)
+        if phone in self._phones:
+            self._phones = tuple(p for p in self._phones if p != phone)
+            self._changed()
 
     def edit_phone(self, old_phone, new_phone):
         """
@@ -122,12 +372,43 @@ class Record(Field):
         :param new_phone: Новий номер телефону.
         :raise ValueError: Якщо старий номер телефону не знайдений.
         """
-        phone_to_edit = self.find_phone(old_phone)
-        if phone_to_edit is not None:
-            self.remove_phone(old_phone)
-            self.add_phone(new_phone)
-        else:
+        old_phone = normalize_phone(old_phone)
+        if old_phone not in self._phones:
             raise ValueError(f"Phone {old_phone} not found for {self.name.value}")
+        new_phone = normalize_phone(new_phone)
+        self._phones = tuple(p for p in self._phones if p != old_phone) + (new_phone,)
+        self._changed()
+
+    def copy(self):
+        """
+        Створює незалежну копію контакту, не прив'язану до книги.
+
+        Поля незмінні (телефони — кортеж рядків, дата — число), тому копія
+        неглибока і коштує O(1).
+
+        :return: Новий екземпляр Record.
+        """
+        record = Record.__new__(Record)
+        record._book = None
+        record.name = self.name
+        record._phones = self._phones
+        record._birthday = self._birthday
+        record._rendered = self._rendered
+        return record
+
+    def merge(self, other):
+        """
+        Додає до контакту нові телефони іншого контакту і його дату народження, якщо вона вказана.
+
+        Книга не сповіщається: виклик використовується пакетними операціями,
+        які оновлюють індекси самостійно.
+
+        :param other: Контакт, дані якого додаються.
+        """
+        self._phones += tuple(phone for phone in dict.fromkeys(other._phones) if phone not in self._phones)
+        if other._birthday is not None:
+            self._birthday = other._birthday
+        self._rendered = None
 
     def find_phone(self, phone):
         """
@@ -136,61 +417,231 @@ class Record(Field):
         :param phone: Номер телефону для пошуку.
         :return: Знайдений телефон або None, якщо не знайдено.
         """
-        for p in self.phones:
-            if p.value == phone:
-                return p
+        phone = normalize_phone(phone)
+        if phone in self._phones:
+            return _RecordPhone(phone, self)
         return None
 
-    def days_to_birthday(self, today):
+    def days_to_birthday(self, today=None):
         """
         Обчислює кількість днів до дня народження.
 
-        :param today: Поточна дата.
+        :param today: Поточна дата (date або datetime); якщо не вказана, береться сьогоднішня.
         :return: Кількість днів до дня народження або None, якщо день народження не вказано.
-        :raise ValueError: Якщо формат дня народження невірний.
         """
-        if self.birthday:
-            today = datetime.now()
-
-            if isinstance(self.birthday.value, datetime):
-                next_birthday = datetime(today.year, self.birthday.value.month, self.birthday.value.day)
-
-                if today > next_birthday:
-                    next_birthday = datetime(today.year + 1, self.birthday.value.month, self.birthday.value.day)
-
-                days_left = (next_birthday - today).days
-                return days_left
-            elif is_valid_date(self.birthday.value, '%d-%m-%Y'):
-                day, month, _ = map(int, self.birthday.value.split('-'))
-                next_birthday = datetime(today.year, month, day)
+        if self._birthday is None:
+            return None
+        return days_until_birthday(date.fromordinal(self._birthday), today or date.today())
 
-                if today > next_birthday:
-                    next_birthday = datetime(today.year + 1, month, day)
+    def _render(self):
+        """
+        Повертає закешовані незмінні частини рядків виведення, форматуючи їх за потреби.
 
-                days_left = (next_birthday - today).days
-                return days_left
+        :return: Кортеж (рядок show all без кількості днів, кошик календаря дня
+                 народження або None, телефони через '; ', дата народження або '').
+        """
+        rendered = self._rendered
+        if rendered is None:
+            phones_str = '; '.join(self._phones)
+            if self._birthday is None:
+                rendered = (f"{self.name.value}: Phone - {phones_str}. Days until birthday:  days\n",
+                            None, phones_str, "")
             else:
-                raise ValueError("Invalid birthday format")
-        else:
-            return None
-        
+                birthday = date.fromordinal(self._birthday)
+                birthday_str = str(self.birthday)
+                rendered = (f"{self.name.value}: Phone - {phones_str}, Birthday - {birthday_str}. "
+                            f"Days until birthday: ", calendar_slot(birthday.month, birthday.day),
+                            phones_str, birthday_str)
+            self._rendered = rendered
+        return rendered
+
     def get_info(self):
         """Повертає рядкове представлення контакту для виведення."""
-        phones_str = '; '.join(str(p['value']) for p in self.phones)
-        birthday_str = f", birthday: {self.birthday.value}" if self.birthday else ""
+        _, _, phones_str, birthday_str = self._render()
+        birthday_str = f", birthday: {birthday_str}" if birthday_str else ""
         return f"Contact name: {self.name.value}, phones: {phones_str}{birthday_str}"
 
     def __str__(self):
         """Повертає рядкове представлення контакту для виведення."""
-        phones_str = '; '.join(str(p['value']) for p in self.phones)
-        birthday_str = f", Birthday - {self.birthday.value}" if self.birthday else ""
-        days_until_birthday = self.days_to_birthday(None)
+        _, slot, phones_str, birthday_str = self._render()
+        birthday_str = f", Birthday - {birthday_str}" if birthday_str else ""
+        days_left = None if slot is None else birthday_countdown(date.today())[slot]
+
+        return f"Contact name: {self.name.value}, phones: {phones_str}{birthday_str}. Days until birthday: {days_left} days"
 
-        return f"Contact name: {self.name.value}, phones: {phones_str}{birthday_str}. Days until birthday: {days_until_birthday} days"
+    def format_line(self, today):
+        """
+        Форматує контакт у рядок для команд show all та search.
+
+        :param today: Поточна дата.
+        :return: Рядок із символом нового рядка в кінці.
+        """
+        line, slot, _, _ = self._rendered or self._render()
+        if slot is None:
+            return line
+        return f"{line}{birthday_countdown(today)[slot]} days\n"
+
+    def search_fields(self):
+        """
+        Повертає текстові поля контакту, за якими виконується пошук.
+
+        :return: Список з ім'ям, усіма телефонами та датою народження.
+        """
+        fields = [self.name.value or ""]
+        fields.extend(self._phones)
+        fields.append(str(self.birthday) if self.birthday else "")
+        return fields
 
 class AddressBook(UserDict):
+    history_limit = 100
+
     def __init__(self):
         self.data = {}
+        self._search_index = None
+        self._birthday_index = None
+        self._phone_index = None
+        self._fuzzy_index = None
+        self._columns = None
+        self.version = 0
+        self.dirty = {}
+        self._history = None
+        self._history_position = 0
+        self._tags = {}
+
+    @property
+    def search_index(self):
+        """
+        Повертає n-грамний індекс пошуку, будуючи його при першому зверненні.
+
+        :return: Екземпляр NGramIndex, синхронізований з адресною книгою.
+        """
+        if self._search_index is None:
+            index = NGramIndex()
+            for name, record in self.data.items():
+                index.add(name, record.search_fields())
+            self._search_index = index
+        return self._search_index
+
+    @property
+    def birthday_index(self):
+        """
+        Повертає календарний індекс днів народження, будуючи його при першому зверненні.
+
+        :return: Екземпляр BirthdayCalendar, синхронізований з адресною книгою.
+        """
+        if self._birthday_index is None:
+            index = BirthdayCalendar()
+            for name, record in self.data.items():
+                index.add(name, record.birthday_ordinal)
+            self._birthday_index = index
+        return self._birthday_index
+
+    @property
+    def phone_index(self):
+        """
+        Повертає зворотний індекс телефонів, будуючи його при першому зверненні.
+
+        :return: Екземпляр PhoneIndex, синхронізований з адресною книгою.
+        """
+        if self._phone_index is None:
+            index = PhoneIndex()
+            for name, record in self.data.items():
+                index.add(name, record.phone_numbers)
+            self._phone_index = index
+        return self._phone_index
+
+    @property
+    def fuzzy_index(self):
+        """
+        Повертає індекс нечіткого пошуку за іменами, будуючи його при першому зверненні.
+
+        :return: Екземпляр DeletionIndex, синхронізований з адресною книгою.
+        """
+        if self._fuzzy_index is None:
+            index = DeletionIndex(capacity=len(self.data))
+            for name in self.data:
+                index.add(name)
+            self._fuzzy_index = index
+        return self._fuzzy_index
+
+    @property
+    def columns(self):
+        """
+        Повертає стовпцевий знімок книги для аналітики, будуючи його за потреби.
+
+        Знімок кешується до наступної зміни книги (поки номер версії не зміниться).
+
+        :return: Екземпляр BookColumns.
+        """
+        columns = self._columns
+        if columns is None or columns.version != self.version:
+            columns = BookColumns(self.snapshot().values(), self.version)
+            self._columns = columns
+        return columns
+
+    def reset_indexes(self):
+        """Скидає індекси після повної заміни даних (наприклад, після завантаження з файлу)."""
+        self._search_index = None
+        self._birthday_index = None
+        self._phone_index = None
+        self._fuzzy_index = None
+        self.version += 1
+
+    def _record_changed(self, record):
+        """
+        Реєструє доданий або змінений контакт: записує його копію у сховище,
+        оновлює вже побудовані індекси, номер версії та множину змінених імен.
+
+        Сам контакт лишається прив'язаним до книги, і кожна наступна його зміна
+        записується як нова копія, тому об'єкти у сховищі (а отже й у попередніх
+        версіях та знімках) ніколи не змінюються на місці.
+        """
+        self.version += 1
+        name = record.name.value
+        record._book = self
+        self.data[name] = record.copy()
+        self.dirty[name] = None
+        self._index_record(name, record)
+
+    def _record_removed(self, name):
+        """Видаляє контакт з уже побудованих індексів і позначає його ім'я зміненим."""
+        self.version += 1
+        self.dirty[name] = None
+        self._unindex_record(name)
+
+    def take_dirty(self):
+        """
+        Забирає імена контактів, змінених після попереднього виклику.
+
+        Кілька змін одного контакту між викликами дають одне ім'я; імена
+        йдуть у порядку першої зміни, тому нові контакти зберігають порядок додавання.
+
+        :return: Словник з іменами доданих, змінених або видалених контактів як ключами.
+        """
+        dirty, self.dirty = self.dirty, {}
+        return dirty
+
+    def _index_record(self, name, record):
+        """Оновлює вже побудовані індекси для контакту."""
+        if self._search_index is not None:
+            self._search_index.add(name, record.search_fields())
+        if self._birthday_index is not None:
+            self._birthday_index.add(name, record.birthday_ordinal)
+        if self._phone_index is not None:
+            self._phone_index.add(name, record.phone_numbers)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(name)
+
+    def _unindex_record(self, name):
+        """Видаляє контакт з уже побудованих індексів."""
+        if self._search_index is not None:
+            self._search_index.discard(name)
+        if self._birthday_index is not None:
+            self._birthday_index.discard(name)
+        if self._phone_index is not None:
+            self._phone_index.discard(name)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.discard(name)
 
     def add_record(self, user):
         """
@@ -203,17 +654,70 @@ class AddressBook(UserDict):
         if not isinstance(user, Record):
             raise ValueError("Invalid contact type. Expected Record.")
         
-        self.data[user.name.value] = user
+        self._record_changed(user)
         return f"Contact {user.name.value} added."
 
+    def add_records(self, records):
+        """
+        Пакетно додає контакти до адресної книги.
+
+        Контакти з іменами, що вже є в книзі (або повторюються в пакеті),
+        об'єднуються як у команді 'add': додаються нові телефони, а дата
+        народження замінюється, якщо вона вказана. Індекси оновлюються одним
+        проходом після вставки всього пакета.
+
+        :param records: Ітерований набір екземплярів Record.
+        :return: Пара (кількість нових контактів, кількість об'єднаних).
+        :raise ValueError: Якщо серед об'єктів є не Record.
+        """
+        added = merged = 0
+        touched = {}
+        for record in records:
+            if not isinstance(record, Record):
+                raise ValueError("Invalid contact type. Expected Record.")
+            name = record.name.value
+            existing = touched.get(name)
+            if existing is None:
+                existing = self.data.get(name)
+                if existing is None:
+                    touched[name] = record
+                    added += 1
+                    continue
+                existing = existing.copy()
+            existing.merge(record)
+            touched[name] = existing
+            merged += 1
+
+        for record in touched.values():
+            self._record_changed(record)
+        return added, merged
+
     def find(self, name):
         """
         Пошук контакту за ім'ям.
 
+        Повертається копія контакту, прив'язана до книги: її зміни записуються
+        в книгу як нова версія контакту, а об'єкт, який бачать попередні версії
+        та знімки книги, лишається незмінним.
+
         :param name: Ім'я для пошуку контакту.
         :return: Знайдений контакт або None, якщо не знайдено.
         """
-        return self.data.get(name)
+        record = self.data.get(name)
+        if record is None:
+            return None
+        record = record.copy()
+        record._book = self
+        return record
+
+    def edit(self, name):
+        """
+        Повертає контакт для зміни; те саме, що find.
+
+        :param name: Ім'я контакту.
+        :return: Копія контакту, прив'язана до книги, або None, якщо не знайдено.
+        """
+        return self.find(name)
 
     def delete(self, name):
         """
@@ -221,8 +725,289 @@ class AddressBook(UserDict):
 
         :param name: Ім'я контакту для видалення.
         """
-        if name in self.data:
-            del self.data[name]
+        if self.data.pop(name, None) is not None:
+            self._record_removed(name)
+
+    def enable_versions(self):
+        """
+        Вмикає незмінні версії даних книги для undo/redo і знімків.
+
+        Дані обгортаються у VersionedRecords (якщо ще не обгорнуті), а історія
+        версій починається з поточного стану.
+        """
+        if not isinstance(self.data, VersionedRecords):
+            self.data = VersionedRecords(self.data)
+        self._history = [self.data.current]
+        self._history_position = 0
+        self._tags = {}
+
+    def rebase_versions(self, base, written):
+        """
+        Переносить книгу на нове базове сховище разом з історією версій і знімками.
+
+        Використовується після перезапису знімка з версії written: зміни,
+        зроблені після неї, переносяться поверх нової бази, а версії історії
+        та збережені знімки перевиражаються через нову базу, тож undo, redo і
+        restore працюють і після перезапису.
+
+        :param base: Нове базове сховище зі станом written.
+        :param written: Версія поточних даних, з якої записано нову базу.
+        """
+        data = self.data.rebase(base, written)
+        self.data = data
+        if self._history is None:
+            self.enable_versions()
+            return
+        # Поточний стан не змінився, тому поточна версія історії — це data.current.
+        adopted = {id(self._history[self._history_position]): data.current}
+
+        def adopt(version):
+            key = id(version)
+            if key not in adopted:
+                adopted[key] = data.adopt(version, written)
+            return adopted[key]
+
+        self._history = [adopt(version) for version in self._history]
+        self._tags = {tag: adopt(version) for tag, version in self._tags.items()}
+
+    def disable_versions(self):
+        """Вимикає історію версій (наприклад, для сховища SQLite)."""
+        self._history = None
+        self._history_position = 0
+        self._tags = {}
+
+    def _require_versions(self):
+        if self._history is None:
+            raise ValueError("Version history is not available for this storage")
+
+    def commit_version(self):
+        """
+        Закріплює поточний стан як нову версію в історії, якщо він змінився.
+
+        Версії, до яких можна було повернутись через redo, відкидаються;
+        історія обмежена history_limit останніми версіями.
+
+        :return: True, якщо додано нову версію.
+        """
+        if self._history is None or self.data.current is self._history[self._history_position]:
+            return False
+        del self._history[self._history_position + 1:]
+        self._history.append(self.data.current)
+        if len(self._history) > self.history_limit + 1:
+            del self._history[0]
+        self._history_position = len(self._history) - 1
+        return True
+
+    def _apply_changes(self, names):
+        """
+        Оновлює індекси для контактів, що змінились після перемикання версії.
+
+        :param names: Імена змінених контактів.
+        """
+        self.version += 1
+        self.dirty.update(dict.fromkeys(names))
+        for name in names:
+            record = self.data.get(name)
+            if record is None:
+                self._unindex_record(name)
+            else:
+                self._index_record(name, record)
+
+    def undo(self):
+        """
+        Повертає книгу до попередньої версії.
+
+        :return: Кількість контактів, що змінились.
+        :raise ValueError: Якщо історія недоступна або повертатись нікуди.
+        """
+        self._require_versions()
+        self.commit_version()
+        if self._history_position == 0:
+            raise ValueError("Nothing to undo")
+        self._history_position -= 1
+        return self._switch_version(self._history[self._history_position])
+
+    def redo(self):
+        """
+        Повторює скасовану зміну.
+
+        :return: Кількість контактів, що змінились.
+        :raise ValueError: Якщо історія недоступна або повторювати нічого.
+        """
+        self._require_versions()
+        if self.commit_version() or self._history_position + 1 >= len(self._history):
+            raise ValueError("Nothing to redo")
+        self._history_position += 1
+        return self._switch_version(self._history[self._history_position])
+
+    def _switch_version(self, version):
+        """Робить версію поточною і синхронізує індекси зі зміненими контактами."""
+        names = self.data.restore(version)
+        self._apply_changes(names)
+        return len(names)
+
+    def tag_version(self, tag):
+        """
+        Зберігає поточну версію під назвою.
+
+        :param tag: Назва знімка.
+        :raise ValueError: Якщо історія недоступна.
+        """
+        self._require_versions()
+        self.commit_version()
+        self._tags[tag] = self.data.current
+
+    def restore_version(self, tag):
+        """
+        Перемикає книгу на збережений знімок; перемикання саме стає версією, яку можна скасувати.
+
+        :param tag: Назва знімка.
+        :return: Кількість контактів, що змінились.
+        :raise KeyError: Якщо знімка з такою назвою немає.
+        """
+        self._require_versions()
+        if tag not in self._tags:
+            raise KeyError(f"Snapshot {tag} not found")
+        self.commit_version()
+        changed = self._switch_version(self._tags[tag])
+        self.commit_version()
+        return changed
+
+    @property
+    def tags(self):
+        """Назви збережених знімків."""
+        return list(self._tags)
+
+    @property
+    def versions_enabled(self):
+        """True, якщо дані книги зберігаються у VersionedRecords і snapshot() стабільний."""
+        return isinstance(self.data, VersionedRecords)
+
+    def snapshot(self):
+        """
+        Повертає стабільне подання контактів для читання.
+
+        Якщо версії ввімкнено, подання не змінюється, поки книга змінюється;
+        інакше повертається саме сховище.
+
+        :return: Словник контактів тільки для читання.
+        """
+        if self.versions_enabled:
+            return self.data.snapshot()
+        return self.data
+
+    def search(self, search_term):
+        """
+        Шукає контакти, в імені, телефонах або даті народження яких є підрядок.
+
+        :param search_term: Термін для пошуку (без урахування регістру).
+        :return: Список знайдених контактів у порядку додавання.
+        """
+        if isinstance(self.data, QueryableStorage):
+            return [self.data[name] for name in self.data.search_keys(search_term)]
+        return [self.data[name] for name in self.search_index.search(search_term)]
+
+    def query(self, text):
+        """
+        Виконує структурований запит пошуку, наприклад 'name:^iv phone:067* born:03'.
+
+        Синтаксис описано в query.parse_query; план запиту обирає найвибірковіший індекс.
+
+        :param text: Текст запиту.
+        :return: Список знайдених контактів, впорядкований за ім'ям.
+        :raise ValueError: Якщо запит невірний.
+        """
+        return QueryPlan(self, parse_query(text)).execute()
+
+    def explain(self, text):
+        """
+        Описує план структурованого запиту без виконання фільтра.
+
+        :param text: Текст запиту.
+        :return: Рядок з кроками плану і кількістю кандидатів.
+        :raise ValueError: Якщо запит невірний.
+        """
+        return QueryPlan(self, parse_query(text)).explain()
+
+    def find_duplicates(self, threshold=DEFAULT_THRESHOLD):
+        """
+        Шукає групи контактів, які ймовірно описують одну людину.
+
+        Порівнюються лише контакти зі спільним блоком (нормалізоване ім'я,
+        закінчення номера або дата народження), див. dedupe.find_duplicates.
+
+        :param threshold: Мінімальна оцінка пари, від 0 до 1.
+        :return: Пара (список DuplicateCluster від найвищої оцінки, кількість порівнянь).
+        :raise ValueError: Якщо поріг поза межами від 0 до 1.
+        """
+        return find_duplicates(self.data.items(), threshold)
+
+    def merge_duplicates(self, clusters):
+        """
+        Об'єднує кожну групу дублікатів в один контакт.
+
+        Залишається перший контакт групи; до нього додаються телефони решти
+        контактів, а дата народження береться з першого контакту, де вона вказана.
+        Решта контактів групи видаляється.
+
+        :param clusters: Ітерований набір DuplicateCluster.
+        :return: Кількість видалених контактів.
+        """
+        removed = 0
+        for cluster in clusters:
+            records = [self.data[name] for name in cluster.names if name in self.data]
+            if len(records) < 2:
+                continue
+            target = self.edit(records[0].name.value)
+            phones = dict.fromkeys(target.phone_numbers)
+            birthday = target.birthday_ordinal
+            for record in records[1:]:
+                phones.update(dict.fromkeys(record.phone_numbers))
+                if birthday is None:
+                    birthday = record.birthday_ordinal
+                self.delete(record.name.value)
+                removed += 1
+            target.phones = phones
+            target.birthday = birthday
+        return removed
+
+    def fuzzy_search(self, search_term, max_distance=None):
+        """
+        Шукає контакти, ім'я яких відрізняється від терміну не більше ніж на max_distance правок.
+
+        :param search_term: Ім'я або його частина з можливими помилками.
+        :param max_distance: Максимальна відстань редагування (за замовчуванням 2).
+        :return: Список пар (відстань, контакт), впорядкований за відстанню, потім за ім'ям.
+        :raise ValueError: Якщо max_distance поза допустимими межами.
+        """
+        return [(distance, self.data[name])
+                for distance, name in self.fuzzy_index.search(search_term, max_distance)]
+
+    def phone_owners(self, phone):
+        """
+        Повертає контакти, яким належить номер телефону.
+
+        :param phone: Номер телефону (нормалізується перед пошуком).
+        :return: Список контактів у порядку додавання номера.
+        :raise ValueError: Якщо номер телефону невірний.
+        """
+        phone = normalize_phone(phone)
+        if isinstance(self.data, QueryableStorage):
+            return [self.data[name] for name in self.data.phone_keys(phone)]
+        return [self.data[name] for name in self.phone_index.owners(phone)]
+
+    def upcoming_birthdays(self, days, today=None):
+        """
+        Повертає контакти, день народження яких настає протягом найближчих днів.
+
+        :param days: Кількість днів уперед (0 — лише сьогодні).
+        :param today: Поточна дата; якщо не вказана, береться сьогоднішня.
+        :return: Список контактів, впорядкований за кількістю днів до дня народження.
+        """
+        today = today or date.today()
+        if isinstance(self.data, QueryableStorage):
+            return [self.data[name] for _, name in self.data.upcoming_keys(today, days)]
+        return [self.data[name] for _, name in self.birthday_index.upcoming(today, days)]
 
     def __iter__(self):
         """
@@ -232,16 +1017,42 @@ class AddressBook(UserDict):
         """
         return iter(self.data.values())
 
-    def iterator(self, n):
+    def iterator(self, n, start=0):
         """
         Розділяє контакти на групи по n елементів і повертає ітератор.
 
         :param n: Кількість контактів у кожній групі.
+        :param start: Порядковий номер контакту, з якого починається перша група.
         :return: Ітератор з групами контактів.
         """
-        records = list(self.data.values())
-        for i in range(0, len(records), n):
-            yield records[i:i + n]
+        names = islice(iter(self.data), start, None)
+        while True:
+            group = [self.data[name] for name in islice(names, n)]
+            if not group:
+                return
+            yield group
+
+    def page(self, number, size):
+        """
+        Повертає сторінку контактів.
+
+        :param number: Номер сторінки, починаючи з 1.
+        :param size: Кількість контактів на сторінці.
+        :return: Список контактів сторінки (порожній, якщо сторінки не існує).
+        """
+        return next(self.iterator(size, (number - 1) * size), [])
+
+    def iter_lines(self, contacts, today=None):
+        """
+        Послідовно форматує контакти у рядки для виведення.
+
+        :param contacts: Ітерований набір контактів.
+        :param today: Поточна дата; обчислюється один раз для всіх рядків.
+        :return: Генератор рядків, кожен із символом нового рядка в кінці.
+        """
+        today = today or date.today()
+        for contact in contacts:
+            yield contact.format_line(today)
 
     def format_contacts(self, contacts, today=None):
         """
@@ -254,15 +1065,7 @@ class AddressBook(UserDict):
         if not contacts:
             return "No matching contacts found"
 
-        result = ""
-        for contact in contacts:
-            phones_str = '; '.join(str(phone['value']) for phone in contact.phones)
-            birthday_str = f", Birthday - {contact.birthday.value}" if contact.birthday else ""
-            days_until_birthday = contact.days_to_birthday(today) if contact.birthday else ""
-
-            result += f"{contact.name.value}: Phone - {phones_str}{birthday_str}. Days until birthday: {days_until_birthday} days\n"
-
-        return result
+        return ''.join(self.iter_lines(contacts, today))
 
     def show_all_contacts(self, today=None):
         """
@@ -274,18 +1077,8 @@ class AddressBook(UserDict):
         if not self.data:
             return "No contacts found"
 
-        result = ""
-        for contact in self.data.values():
-            phones_str = '; '.join(str(phone['value']) for phone in contact.phones)
-            birthday_str = f", Birthday - {contact.birthday}" if contact.birthday else ""
-            days_until_birthday = contact.days_to_birthday(today) if contact.birthday else ""
+        return ''.join(self.iter_lines(self.data.values(), today))
 
-            result += f"{contact.name.value}: Phone - {phones_str}{birthday_str}. Days until birthday: {days_until_birthday} days\n"
-
-        return result
-
-
-    
     def show_all(self, *args):
         """
         Виводить усі контакти з адресної книги у вигляді рядка.
@@ -294,3 +1087,26 @@ class AddressBook(UserDict):
         :return: Рядок з відформатованими контактами.
         """
         return self.show_all_contacts(*args)
+
+
+def write_lines(lines, stream=None, chunk_size=64 * 1024):
+    """
+    Записує рядки у потік буферизованими блоками.
+
+    :param lines: Ітерований набір рядків.
+    :param stream: Потік для запису (за замовчуванням sys.stdout).
+    :param chunk_size: Приблизний розмір блоку у символах.
+    """
+    stream = stream or sys.stdout
+    buffer = []
+    buffered = 0
+    for line in lines:
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= chunk_size:
+            stream.write(''.join(buffer))
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        stream.write(''.join(buffer))
+    stream.flush()
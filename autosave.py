@@ -0,0 +1,46 @@
+import threading
+
+
+class Autosaver:
+    """
+    Фоновий потік, що періодично зберігає змінені контакти адресної книги.
+
+    Зміни між збереженнями збираються в множину змінених імен книги, тому
+    кілька змін одного контакту дають один запис. Потік лише викликає
+    book.write_changes(), яка тримає блокування книги тільки на час збору
+    змін, тому консоль не чекає на запис і fsync.
+
+    :param book: Адресна книга з методом write_changes (AddressBookWithFileOps).
+    :param interval: Інтервал між збереженнями в секундах.
+    """
+    def __init__(self, book, interval=5.0):
+        self.book = book
+        self.interval = interval
+        self.saves = 0
+        self.last_error = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Запускає фоновий потік збереження."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Зупиняє потік, дочікуючись завершення збереження, що вже почалось."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                if self.book.write_changes():
+                    self.saves += 1
+            except Exception as e:
+                # Збій одного збереження не зупиняє потік: змінені контакти
+                # лишаються позначеними і записуються наступного разу.
+                self.last_error = e
+                print(f"Autosave failed: {e}", file=self.book.status_stream)
@@ -0,0 +1 @@
+"""Бенчмарки адресної книги. Запуск з кореня репозиторію: python -m benchmarks.<назва>."""
@@ -0,0 +1,52 @@
+import random
+import sys
+import time
+
+from address_book import Record
+from benchmarks.synthetic import realistic_records
+from dedupe import find_duplicates
+
+
+DUPLICATE_SHARE = 0.01
+
+
+def near_duplicate(record, rng):
+    """
+    Створює ймовірний дублікат контакту: те саме ім'я з пробілом і іншим регістром
+    або ім'я з однією помилкою і тим самим номером телефону.
+    """
+    name = record.name.value
+    if rng.random() < 0.5:
+        i = rng.randrange(1, len(name))
+        duplicate = Record(name[:i].capitalize() + "  " + name[i:].capitalize(), record.birthday_ordinal)
+        duplicate.phones = [f"0{rng.randrange(10 ** 9):09d}"]
+    else:
+        i = rng.randrange(len(name) - 1)
+        duplicate = Record(name[:i] + name[i + 1] + name[i] + name[i + 2:])
+        duplicate.phones = ["+38" + record.phone_numbers[0]]
+    return duplicate
+
+
+def main(sizes=(10_000, 100_000, 1_000_000)):
+    print(f"{'records':>10} {'seconds':>8} {'us/record':>10} {'pairs':>10} {'clusters':>9} {'found dup':>10}")
+    for size in sizes:
+        rng = random.Random(1)
+        records = {record.name.value: record for record in realistic_records(size)}
+        planted = {}
+        for record in rng.sample(list(records.values()), int(size * DUPLICATE_SHARE)):
+            duplicate = near_duplicate(record, rng)
+            if duplicate.name.value not in records:
+                planted[duplicate.name.value] = record.name.value
+                records[duplicate.name.value] = duplicate
+
+        start = time.perf_counter()
+        clusters, compared = find_duplicates(records.items())
+        seconds = time.perf_counter() - start
+
+        found = sum(1 for cluster in clusters for name in cluster.names if planted.get(name) in cluster.names)
+        print(f"{len(records):>10} {seconds:>8.2f} {seconds / len(records) * 1e6:>10.2f} {compared:>10} "
+              f"{len(clusters):>9} {found / max(len(planted), 1):>9.1%}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
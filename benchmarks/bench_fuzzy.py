@@ -0,0 +1,58 @@
+import random
+import sys
+import time
+
+from benchmarks.synthetic import synthetic_records
+from indexes import DeletionIndex, edit_distance
+
+
+def typo(word, rng):
+    """Вносить у слово одну випадкову помилку: заміну, вставку, вилучення або транспозицію."""
+    i = rng.randrange(len(word) - 1)
+    kind = rng.randrange(4)
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    if kind == 0:
+        return word[:i] + letter + word[i + 1:]
+    if kind == 1:
+        return word[:i] + letter + word[i:]
+    if kind == 2:
+        return word[:i] + word[i + 1:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def linear_fuzzy(names, term, max_distance):
+    """Повний перебір імен з обчисленням відстані для кожного."""
+    return sorted((distance, name) for name in names
+                  if (distance := edit_distance(term, name, max_distance)) <= max_distance)
+
+
+def main(sizes=(10_000, 100_000, 1_000_000), queries=200):
+    print(f"{'records':>10} {'build s':>8} {'scan ms':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for size in sizes:
+        names = [record.name.value for record in synthetic_records(size)]
+        start = time.perf_counter()
+        index = DeletionIndex(capacity=size)
+        for name in names:
+            index.add(name)
+        build_time = time.perf_counter() - start
+
+        rng = random.Random(1)
+        terms = [typo(rng.choice(names), rng) for _ in range(queries)]
+        latencies = []
+        for term in terms:
+            start = time.perf_counter()
+            index.search(term)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        start = time.perf_counter()
+        expected = linear_fuzzy(names, terms[0], index.max_distance)
+        scan_time = time.perf_counter() - start
+        assert index.search(terms[0]) == expected, terms[0]
+        print(f"{size:>10} {build_time:>8.2f} {scan_time * 1000:>10.1f} "
+              f"{latencies[len(latencies) // 2] * 1000:>8.3f} "
+              f"{latencies[int(len(latencies) * 0.99)] * 1000:>8.3f} {latencies[-1] * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_records
+from bulk_io import export_records
+from main import AddressBookWithFileOps
+
+
+def per_line_add(records):
+    """Додавання по одному контакту через команду 'add', як при ручному введенні."""
+    book = AddressBookWithFileOps()
+    for record in records:
+        phones = record.phone_numbers
+        book.add_contact(record.name.value, phones[0], str(record.birthday))
+        for phone in phones[1:]:
+            book.add_contact(record.name.value, phone)
+    return book
+
+
+def main(count=200_000):
+    records = list(synthetic_records(count))
+    print(f"records: {count}")
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in ("csv", "jsonl"):
+            filename = os.path.join(directory, f"contacts.{extension}")
+            export_records(records, filename)
+            book = AddressBookWithFileOps()
+            start = time.perf_counter()
+            print(book.import_contacts(filename))
+            elapsed = time.perf_counter() - start
+            print(f"import {extension:>5}: {count / elapsed:>10.0f} records/s")
+
+    start = time.perf_counter()
+    per_line_add(records)
+    elapsed = time.perf_counter() - start
+    print(f"add per line: {count / elapsed:>10.0f} records/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_records
+from storage import write_snapshot
+from main import AddressBookWithFileOps
+
+
+def main(sizes=(10_000, 100_000)):
+    print(f"{'records':>10} {'full save ms':>14} {'journal save ms':>16}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "book.pkl")
+            book = AddressBookWithFileOps()
+            for record in synthetic_records(size):
+                book.data[record.name.value] = record
+            write_snapshot(filename, book.data)
+            book.load_from_file(filename)
+
+            start = time.perf_counter()
+            write_snapshot(filename, book.data)
+            full_time = time.perf_counter() - start
+
+            book.add_contact("benchmark", "0501234567")
+            start = time.perf_counter()
+            book.save_to_file(filename)
+            journal_time = time.perf_counter() - start
+            book.journal.close()
+        print(f"{size:>10} {full_time * 1000:>14.2f} {journal_time * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000))
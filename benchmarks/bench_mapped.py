@@ -0,0 +1,50 @@
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import synthetic_records
+from storage import write_snapshot
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+from main import AddressBookWithFileOps
+book = AddressBookWithFileOps()
+book.load_from_file(sys.argv[1])
+loaded = time.perf_counter() - start
+book.find(sys.argv[2])
+first_answer = time.perf_counter() - start
+with open("/proc/self/status") as status:
+    rss = next(int(line.split()[1]) for line in status if line.startswith("VmHWM"))
+print(f"{loaded * 1000:.1f} {first_answer * 1000:.1f} {rss / 1024:.1f}", file=sys.stderr)
+"""
+
+
+def probe(filename, name):
+    result = subprocess.run([sys.executable, "-c", PROBE, filename, name],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return result.stderr.split()
+
+
+def main(sizes=(10_000, 100_000, 500_000)):
+    print(f"{'records':>10} {'format':>8} {'load ms':>10} {'find ms':>10} {'peak RSS MB':>12}")
+    for size in sizes:
+        data = {record.name.value: record for record in synthetic_records(size)}
+        probe_name = next(reversed(data))
+        with tempfile.TemporaryDirectory() as directory:
+            legacy = os.path.join(directory, "legacy.pkl")
+            with open(legacy, 'wb') as file:
+                pickle.dump(data, file)
+            mapped = os.path.join(directory, "mapped.pkl")
+            write_snapshot(mapped, data)
+            del data
+            for label, filename in (("pickle", legacy), ("mmap", mapped)):
+                loaded, answered, rss = probe(filename, probe_name)
+                print(f"{size:>10} {label:>8} {loaded:>10} {answered:>10} {rss:>12}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 500_000))
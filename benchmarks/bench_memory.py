@@ -0,0 +1,62 @@
+import gc
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+
+from address_book import Record
+
+
+class LegacyField:
+    """Поле з __dict__ та name-mangled значенням, як до переходу на __slots__."""
+    def __init__(self, value):
+        self.__value = value
+
+    @property
+    def value(self):
+        return self.__value
+
+
+class LegacyRecord:
+    """Контакт зі списком словників {'value': ...} для телефонів, як до переходу на __slots__."""
+    def __init__(self, name, birthday=None):
+        self.name = LegacyField(name)
+        self.phones = [{'value': ''}]
+        self.birthday = LegacyField(birthday) if birthday else None
+
+    def add_phone(self, phone):
+        self.phones.append({'value': phone})
+
+
+def synthetic_rows(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        birthday = datetime(rng.randint(1950, 2010), rng.randint(1, 12), rng.randint(1, 28))
+        phones = [f"0{rng.randint(100000000, 999999999)}" for _ in range(rng.randint(1, 3))]
+        yield f"contact{i}", birthday, phones
+
+
+def bytes_per_record(record_class, count):
+    gc.collect()
+    tracemalloc.start()
+    book = {}
+    for name, birthday, phones in synthetic_rows(count):
+        record = record_class(name, birthday)
+        for phone in phones:
+            record.add_phone(phone)
+        book[name] = record
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / count
+
+
+def main(count=1_000_000):
+    legacy = bytes_per_record(LegacyRecord, count)
+    compact = bytes_per_record(Record, count)
+    print(f"records: {count}")
+    print(f"before: {legacy:.0f} bytes/record")
+    print(f"after:  {compact:.0f} bytes/record ({compact / legacy:.0%} of before)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+from datetime import date
+
+from address_book import AddressBook
+from benchmarks.synthetic import synthetic_records
+from parallel import ParallelExecutor
+
+
+def serial_search(book, term):
+    return [record for record in book.data.values()
+            if any(term in field.lower() for field in record.search_fields())]
+
+
+def serial_render(book, today):
+    return ''.join(book.iter_lines(book.data.values(), today))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(count=500_000, worker_counts=(1, 2, 4, 8)):
+    book = AddressBook()
+    book.add_records(synthetic_records(count))
+    today = date.today()
+    term = "ab"
+    print(f"records: {count}, cpus: {os.cpu_count()}")
+    print(f"{'workers':>8} {'cold search s':>14} {'search s':>9} {'render s':>9}")
+    for workers in worker_counts:
+        if workers == 1:
+            search_time, expected = timed(serial_search, book, term)
+            render_time, rendered = timed(serial_render, book, today)
+            cold_time = search_time
+        else:
+            executor = ParallelExecutor(workers, threshold=0)
+            cold_time, found = timed(executor.search, book, term)
+            search_time, found = timed(executor.search, book, term)
+            render_time, chunks = timed(lambda: ''.join(executor.render(book, today)))
+            executor.close()
+            assert found == expected and chunks == rendered
+        print(f"{workers:>8} {cold_time:>14.2f} {search_time:>9.2f} {render_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,38 @@
+import sys
+import time
+
+from address_book import AddressBook
+from benchmarks.synthetic import synthetic_records
+
+
+def linear_search(book, search_term):
+    """Повний перебір контактів, як у search_contacts до появи індексу."""
+    term = search_term.lower()
+    return [record for record in book.data.values()
+            if any(term in field.lower() for field in record.search_fields())]
+
+
+def timed(func, *args, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(sizes=(10_000, 50_000, 200_000)):
+    terms = ["qx", "abc", "0671", "12-1985", "zzzzz"]
+    print(f"{'records':>10} {'term':>10} {'scan ms':>10} {'index ms':>10} {'hits':>8}")
+    for size in sizes:
+        book = AddressBook()
+        for record in synthetic_records(size):
+            book.add_record(record)
+        book.search_index
+        for term in terms:
+            scan_time, expected = timed(linear_search, book, term, repeat=3)
+            index_time, found = timed(book.search, term)
+            assert found == expected, term
+            print(f"{size:>10} {term:>10} {scan_time * 1000:>10.2f} {index_time * 1000:>10.3f} {len(found):>8}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 50_000, 200_000))
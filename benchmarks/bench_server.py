@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import os
+import random
+import signal
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_records
+from server import open_connection, read_response
+from storage import write_snapshot
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def request_mix(names, count, write_ratio, rng):
+    """
+    Генерує суміш команд для одного клієнта.
+
+    :param names: Імена наявних контактів.
+    :param count: Кількість команд.
+    :param write_ratio: Частка команд зміни ('add').
+    :param rng: Генератор випадкових чисел.
+    :return: Список рядків команд.
+    """
+    commands = []
+    for i in range(count):
+        if rng.random() < write_ratio:
+            commands.append(f"add {rng.choice(names)} 0{rng.randint(100000000, 999999999)}")
+        elif i % 3 == 0:
+            commands.append(f"search {rng.choice(names)[:3]}")
+        else:
+            commands.append(f"get {rng.choice(names)}")
+    return commands
+
+
+async def run_client(address, commands, depth, latencies):
+    """
+    Надсилає команди конвеєром, тримаючи в роботі не більше depth запитів.
+
+    :param latencies: Список, до якого додаються затримки відповідей у секундах.
+    """
+    reader, writer = await open_connection(address)
+    window = asyncio.Semaphore(depth)
+    sent = []
+
+    async def send():
+        for command in commands:
+            await window.acquire()
+            sent.append(time.perf_counter())
+            writer.write(command.encode("utf-8") + b"\n")
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for i in range(len(commands)):
+        await read_response(reader)
+        latencies.append(time.perf_counter() - sent[i])
+        window.release()
+    await sender
+    writer.write(b"exit\n")
+    writer.close()
+    await writer.wait_closed()
+
+
+async def warm_up(address, name):
+    """Будує індекси сервера до вимірювань, щоб не враховувати їх у затримках."""
+    reader, writer = await open_connection(address)
+    writer.write(f"search {name[:3]}\n".encode("utf-8"))
+    await read_response(reader)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def swarm(address, names, clients, requests, depth, write_ratio):
+    await warm_up(address, names[0])
+    rng = random.Random(1)
+    latencies = []
+    workloads = [request_mix(names, requests, write_ratio, rng) for _ in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(address, commands, depth, latencies) for commands in workloads))
+    return latencies, time.perf_counter() - start
+
+
+async def start_server(directory, address):
+    """Запускає main.py --serve у каталозі зі знімком і чекає на готовність."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, MAIN, "--serve", address, cwd=directory,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+    while True:
+        line = await process.stderr.readline()
+        if not line:
+            raise RuntimeError("Server exited before it started serving")
+        if line.startswith(b"Serving on"):
+            return process
+
+
+async def main(size, clients, requests, depth, write_ratio):
+    records = list(synthetic_records(size))
+    names = [record.name.value for record in records]
+    with tempfile.TemporaryDirectory() as directory:
+        write_snapshot(os.path.join(directory, "address_book_data.pkl"),
+                       {record.name.value: record for record in records})
+        address = os.path.join(directory, "book.sock")
+        process = await start_server(directory, address)
+        try:
+            latencies, elapsed = await swarm(address, names, clients, requests, depth, write_ratio)
+        finally:
+            process.send_signal(signal.SIGINT)
+            await process.communicate()
+    latencies.sort()
+    print(f"{size} records, {clients} clients x {requests} requests, pipeline depth {depth}, "
+          f"{write_ratio:.0%} writes")
+    print(f"p50 {latencies[len(latencies) // 2] * 1000:.3f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms, "
+          f"max {latencies[-1] * 1000:.3f} ms")
+    print(f"{len(latencies)} requests in {elapsed:.3f} s ({len(latencies) / elapsed:.0f} requests/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for main.py --serve")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    options = parser.parse_args()
+    asyncio.run(main(options.size, options.clients, options.requests, options.depth, options.write_ratio))
@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import realistic_records
+from shards import open_shards, write_shards
+from storage import open_snapshot, write_snapshot
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return time.perf_counter() - start, value
+
+
+def _read_all(data):
+    """Розпаковує всі контакти, як це робить повне завантаження книги."""
+    return sum(1 for _ in data.values())
+
+
+def main(sizes=(100_000, 1_000_000), shard_counts=(1, 2, 4, 8)):
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'records':>10} {'shards':>7} {'save s':>8} {'open s':>8} {'read all s':>11}")
+    for size in sizes:
+        records = {record.name.value: record for record in realistic_records(size)}
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "address_book_data.pkl")
+            save, _ = _timed(write_snapshot, filename, records)
+            opened, data = _timed(open_snapshot, filename)
+            read, _ = _timed(_read_all, data)
+            data.close()
+            print(f"{size:>10} {'single':>7} {save:>8.2f} {opened:>8.3f} {read:>11.2f}")
+            os.remove(filename)
+            for count in shard_counts:
+                save, _ = _timed(write_shards, filename, records, count, count)
+                opened, data = _timed(open_shards, filename, count)
+                read, _ = _timed(_read_all, data)
+                data.close()
+                print(f"{size:>10} {count:>7} {save:>8.2f} {opened:>8.3f} {read:>11.2f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (100_000, 1_000_000))
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+from address_book import AddressBook, write_lines
+from benchmarks.synthetic import synthetic_records
+
+
+class FirstLineProbe:
+    """Потік-заглушка, що запам'ятовує момент першого запису."""
+    def __init__(self, sink):
+        self.sink = sink
+        self.first_write = None
+
+    def write(self, text):
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        self.sink.write(text)
+
+    def flush(self):
+        self.sink.flush()
+
+
+def concatenated(book, stream, today):
+    """Побудова всього виводу одним рядком через result += ..., як до потокового виводу."""
+    result = ""
+    for contact in book.data.values():
+        result += contact.format_line(today)
+    stream.write(result)
+    stream.flush()
+
+
+def streamed(book, stream, today):
+    write_lines(book.iter_lines(book.data.values(), today), stream)
+
+
+def measure(render, book, today):
+    with open(os.devnull, 'w') as sink:
+        probe = FirstLineProbe(sink)
+        tracemalloc.start()
+        start = time.perf_counter()
+        render(book, probe, today)
+        total = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return probe.first_write - start, total, peak
+
+
+def main(count=1_000_000):
+    book = AddressBook()
+    for record in synthetic_records(count):
+        book.add_record(record)
+    today = date.today()
+    print(f"records: {count}")
+    print(f"{'mode':>12} {'first line ms':>14} {'total s':>9} {'peak MB':>9}")
+    for label, render in (("concatenate", concatenated), ("stream", streamed)):
+        first, total, peak = measure(render, book, today)
+        print(f"{label:>12} {first * 1000:>14.2f} {total:>9.2f} {peak / 2 ** 20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from benchmarks.synthetic import synthetic_records
+from main import AddressBookWithFileOps
+from storage import write_snapshot
+
+
+def _measure(book, name, filename):
+    """Вимірює основні операції над відкритою книгою; повертає час у мілісекундах."""
+    results = {}
+    start = time.perf_counter()
+    book.find(name)
+    results["find"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    book.search("abc")
+    results["search"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    book.upcoming_birthdays(7, date(2024, 6, 1))
+    results["upcoming"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    book.add_contact("benchmark", "0501234567")
+    book.save_to_file(filename)
+    results["change+save"] = time.perf_counter() - start
+    return {key: value * 1000 for key, value in results.items()}
+
+
+def main(sizes=(10_000, 100_000)):
+    columns = ("open", "find", "search", "upcoming", "change+save")
+    print(f"{'records':>10} {'backend':>8} " + " ".join(f"{column + ' ms':>15}" for column in columns))
+    for size in sizes:
+        records = list(synthetic_records(size))
+        name = records[size // 2].name.value
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot = os.path.join(directory, "book.pkl")
+            write_snapshot(snapshot, {record.name.value: record for record in records})
+            database = os.path.join(directory, "book.db")
+            migration = AddressBookWithFileOps()
+            migration.status_stream = sys.stderr
+            migration.open_database(database, migrate_from=snapshot)
+            migration.close()
+
+            for backend in ("pickle", "sqlite"):
+                book = AddressBookWithFileOps()
+                book.status_stream = sys.stderr
+                start = time.perf_counter()
+                if backend == "pickle":
+                    book.load_from_file(snapshot)
+                    filename = snapshot
+                else:
+                    book.open_database(database)
+                    filename = database
+                results = {"open": (time.perf_counter() - start) * 1000}
+                results.update(_measure(book, name, filename))
+                book.close()
+                print(f"{size:>10} {backend:>8} " + " ".join(f"{results[column]:>15.3f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000))
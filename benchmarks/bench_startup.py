@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import realistic_records
+from storage import write_snapshot
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def _median_run(args, cwd, repeat, stdin=None):
+    """Запускає процес repeat разів і повертає медіанну тривалість у мілісекундах."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=cwd, input=stdin, text=True, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main(sizes=(1_000, 10_000, 100_000), repeat=5):
+    interpreter = _median_run([sys.executable, "-c", "pass"], None, repeat)
+    imports = _median_run([sys.executable, "-c", "import main"], os.path.dirname(MAIN), repeat)
+    print(f"interpreter start: {interpreter:.1f} ms, import main: {imports:.1f} ms")
+    print(f"{'records':>10} {'one-shot get ms':>16} {'full load + get ms':>19}")
+    for size in sizes:
+        records = {record.name.value: record for record in realistic_records(size)}
+        name = next(iter(records))
+        with tempfile.TemporaryDirectory() as directory:
+            write_snapshot(os.path.join(directory, "address_book_data.pkl"), records)
+            del records
+            one_shot = _median_run([sys.executable, MAIN, "get", name], directory, repeat)
+            full = _median_run([sys.executable, MAIN, "--batch", "--autosave", "0"], directory, repeat,
+                               stdin=f"get {name}\n")
+        print(f"{size:>10} {one_shot:>16.1f} {full:>19.1f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (1_000, 10_000, 100_000))
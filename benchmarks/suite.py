@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+from address_book import write_lines
+from benchmarks.synthetic import realistic_records
+from main import AddressBookWithFileOps
+
+
+TODAY = date(2026, 1, 1)
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def _peak_rss_kb():
+    """Повертає пікове споживання пам'яті процесом у кілобайтах."""
+    try:
+        with open("/proc/self/status") as status:
+            return next(int(line.split()[1]) for line in status if line.startswith("VmHWM"))
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_peak_rss():
+    """Скидає лічильник пікової пам'яті (Linux), щоб виміряти пік окремої операції."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def measure(results, name, operations, func, *args):
+    """
+    Виконує операцію і записує її тривалість і пікову пам'ять.
+
+    :param results: Словник результатів для поточного розміру книги.
+    :param name: Назва операції.
+    :param operations: Кількість елементарних операцій для розрахунку часу на одну.
+    :param func: Функція, що виконує операцію.
+    :return: Результат func.
+    """
+    _reset_peak_rss()
+    start = time.perf_counter()
+    value = func(*args)
+    seconds = time.perf_counter() - start
+    results[name] = {
+        "seconds": seconds,
+        "operations": operations,
+        "us_per_op": seconds / max(operations, 1) * 1_000_000,
+        "peak_rss_mb": _peak_rss_kb() / 1024,
+    }
+    return value
+
+
+def _add_all(book, records):
+    for record in records:
+        book.add_record(record)
+
+
+def _find_all(book, names):
+    for name in names:
+        book.find(name)
+
+
+def _build_search_index(book):
+    return book.search_index
+
+
+def _search_all(book, terms):
+    for term in terms:
+        book.search(term)
+
+
+def _show_all(book):
+    with open(os.devnull, "w") as sink:
+        write_lines(book.iter_lines(book.data.values(), TODAY), sink)
+
+
+def _days_to_birthday(book):
+    for record in book.data.values():
+        record.days_to_birthday(TODAY)
+
+
+def _load(filename):
+    book = AddressBookWithFileOps()
+    book.status_stream = open(os.devnull, "w")
+    book.load_from_file(filename)
+    book.status_stream.close()
+    return book
+
+
+def run_size(size, seed, queries):
+    """
+    Вимірює основні операції на книзі заданого розміру.
+
+    :param size: Кількість контактів.
+    :param seed: Зерно генератора.
+    :param queries: Кількість запитів find і search.
+    :return: Словник {операція: результати}.
+    """
+    results = {}
+    records = measure(results, "generate", size, lambda: list(realistic_records(size, seed)))
+    rng = random.Random(seed)
+    names = [rng.choice(records).name.value for _ in range(queries)]
+    terms = [name[rng.randrange(len(name) - 3):][:3] for name in names[:queries // 10 or 1]]
+
+    book = AddressBookWithFileOps()
+    measure(results, "add", size, _add_all, book, records)
+    del records
+    measure(results, "find", len(names), _find_all, book, names)
+    measure(results, "search_index_build", size, _build_search_index, book)
+    measure(results, "search", len(terms), _search_all, book, terms)
+    measure(results, "show_all", size, _show_all, book)
+    measure(results, "days_to_birthday", size, _days_to_birthday, book)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "address_book_data.pkl")
+        book.status_stream = open(os.devnull, "w")
+        measure(results, "save_to_file", size, book.save_to_file, filename)
+        book.status_stream.close()
+        del book
+        loaded = measure(results, "load_from_file", size, _load, filename)
+        measure(results, "show_all_after_load", size, _show_all, loaded)
+        loaded.close()
+    return results
+
+
+def run(sizes, seed, queries, output):
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "queries": queries,
+        },
+        "results": {},
+    }
+    print(f"{'records':>10} {'operation':<20} {'seconds':>10} {'us/op':>10} {'peak MB':>9}")
+    for size in sizes:
+        results = run_size(size, seed, queries)
+        report["results"][str(size)] = results
+        for name, values in results.items():
+            print(f"{size:>10} {name:<20} {values['seconds']:>10.4f} {values['us_per_op']:>10.3f} "
+                  f"{values['peak_rss_mb']:>9.1f}")
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results saved to {output}")
+
+
+def compare(baseline_file, current_file, threshold, min_seconds):
+    """
+    Порівнює два запуски і позначає регресії.
+
+    Регресією вважається операція, що стала повільнішою більш ніж на
+    threshold (частка) і щонайменше на min_seconds, або пікова пам'ять якої
+    зросла більш ніж на threshold.
+
+    :return: Кількість регресій.
+    """
+    with open(baseline_file, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    with open(current_file, encoding="utf-8") as file:
+        current = json.load(file)["results"]
+
+    regressions = 0
+    print(f"{'records':>10} {'operation':<20} {'base s':>10} {'new s':>10} {'time':>8} {'memory':>8}")
+    for size in sorted(set(baseline) & set(current), key=int):
+        for name in baseline[size]:
+            if name not in current[size]:
+                continue
+            old, new = baseline[size][name], current[size][name]
+            time_ratio = new["seconds"] / old["seconds"] if old["seconds"] else 1.0
+            memory_ratio = new["peak_rss_mb"] / old["peak_rss_mb"] if old["peak_rss_mb"] else 1.0
+            slower = time_ratio > 1 + threshold and new["seconds"] - old["seconds"] >= min_seconds
+            bigger = memory_ratio > 1 + threshold
+            flag = "  REGRESSION" if slower or bigger else ""
+            regressions += slower or bigger
+            print(f"{size:>10} {name:<20} {old['seconds']:>10.4f} {new['seconds']:>10.4f} "
+                  f"{time_ratio - 1:>+8.1%} {memory_ratio - 1:>+8.1%}{flag}")
+    print(f"{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reproducible address book benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                            help="book sizes, from 1000 up to 10000000 contacts")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--queries", type=int, default=10_000,
+                            help="number of find queries (search uses a tenth of them)")
+    run_parser.add_argument("--output", metavar="FILE", help="save results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="compare two JSON results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.20,
+                                help="relative slowdown or memory growth to flag (default 0.20)")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.005,
+                                help="ignore slowdowns smaller than this many seconds")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    if options.command == "run":
+        run(options.sizes, options.seed, options.queries, options.output)
+    else:
+        sys.exit(1 if compare(options.baseline, options.current, options.threshold, options.min_seconds) else 0)
@@ -0,0 +1,116 @@
+import random
+import string
+from datetime import date
+from itertools import accumulate
+
+from address_book import Record
+
+
+def synthetic_records(count, seed=0):
+    """
+    Генерує детермінований набір синтетичних контактів.
+
+    :param count: Кількість контактів.
+    :param seed: Зерно генератора випадкових чисел.
+    :return: Генератор екземплярів Record з унікальними іменами.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        name = ''.join(rng.choices(string.ascii_lowercase, k=6)) + _suffix(i)
+        birthday = f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(1950, 2010)}"
+        record = Record(name, birthday)
+        for _ in range(rng.randint(1, 3)):
+            record.add_phone(f"0{rng.randint(100000000, 999999999)}")
+        yield record
+
+
+def _suffix(number):
+    """Кодує номер літерами, щоб імена залишались унікальними і проходили перевірку Name."""
+    letters = []
+    while True:
+        number, rest = divmod(number, 26)
+        letters.append(string.ascii_lowercase[rest])
+        if not number:
+            return ''.join(letters)
+
+
+FIRST_NAMES = (
+    "oleksandr", "olena", "andrii", "iryna", "serhii", "natalia", "dmytro", "tetiana", "volodymyr",
+    "oksana", "mykola", "yulia", "ivan", "svitlana", "yurii", "mariia", "vasyl", "anna", "oleh",
+    "liudmyla", "viktor", "kateryna", "maksym", "halyna", "petro", "valentyna", "artem", "viktoriia",
+    "bohdan", "nadiia", "taras", "larysa", "roman", "alina", "vitalii", "daria", "yaroslav", "sofiia",
+    "denys", "khrystyna",
+)
+SURNAMES = (
+    "melnyk", "shevchenko", "boiko", "kovalenko", "bondarenko", "tkachenko", "kovalchuk", "kravchenko",
+    "oliinyk", "shevchuk", "koval", "polishchuk", "bondar", "tkachuk", "moroz", "marchenko", "lysenko",
+    "rudenko", "savchenko", "petrenko", "klymenko", "pavlenko", "savchuk", "kuzmenko", "ponomarenko",
+    "kravchuk", "kuzmych", "vasylenko", "levchenko", "kharchenko", "karpenko", "lytvynenko", "sydorenko",
+    "ivanenko", "mazur", "tymoshenko", "hnatiuk", "zinchenko", "pavliuk", "kushnir",
+)
+# Коди мобільних операторів з приблизними частками абонентів.
+OPERATOR_CODES = ("067", "097", "050", "066", "095", "099", "063", "073", "093", "068", "096", "098")
+OPERATOR_WEIGHTS = (18, 12, 14, 8, 7, 5, 9, 6, 5, 4, 6, 6)
+PHONE_COUNT_WEIGHTS = (70, 25, 5)
+BIRTHDAY_SHARE = 0.85
+SUFFIX_WIDTH = 5
+
+
+def _fixed_suffix(number, width):
+    """Кодує номер рівно width літерами."""
+    letters = []
+    for _ in range(width):
+        number, rest = divmod(number, 26)
+        letters.append(string.ascii_lowercase[rest])
+    return ''.join(letters)
+
+
+def _zipf_weights(count):
+    return [1 / rank for rank in range(1, count + 1)]
+
+
+def realistic_records(count, seed=0):
+    """
+    Генерує детермінований набір контактів з реалістичними розподілами.
+
+    Імена складаються з поширених українських імен і прізвищ з частотами за
+    законом Ціпфа; повтори розрізняються буквеним суфіксом з п'яти літер. У контакту від
+    одного до трьох мобільних номерів з кодами операторів за їх часткою
+    ринку; у 85% контактів є дата народження з роком, розподіленим
+    нормально навколо 1985 року, включно з 29 лютого у високосні роки.
+
+    :param count: Кількість контактів.
+    :param seed: Зерно генератора випадкових чисел.
+    :return: Генератор екземплярів Record з унікальними іменами.
+    """
+    rng = random.Random(seed)
+    first_weights = list(accumulate(_zipf_weights(len(FIRST_NAMES))))
+    surname_weights = list(accumulate(_zipf_weights(len(SURNAMES))))
+    operator_weights = list(accumulate(OPERATOR_WEIGHTS))
+    phone_count_weights = list(accumulate(PHONE_COUNT_WEIGHTS))
+    bases = {first + surname for first in FIRST_NAMES for surname in SURNAMES}
+    seen = {}
+    for _ in range(count):
+        base = (rng.choices(FIRST_NAMES, cum_weights=first_weights)[0]
+                + rng.choices(SURNAMES, cum_weights=surname_weights)[0])
+        duplicates = seen.get(base, 0)
+        name = base
+        if duplicates:
+            # Суфікс фіксованої довжини не може збігтися з суфіксом іншого імені;
+            # лишається лише пропустити збіги з іменами без суфікса.
+            name = base + _fixed_suffix(duplicates - 1, SUFFIX_WIDTH)
+            while name in bases:
+                duplicates += 1
+                name = base + _fixed_suffix(duplicates - 1, SUFFIX_WIDTH)
+        seen[base] = duplicates + 1
+
+        birthday = None
+        if rng.random() < BIRTHDAY_SHARE:
+            year = min(2015, max(1940, round(rng.gauss(1985, 15))))
+            start = date(year, 1, 1).toordinal()
+            birthday = rng.randrange(start, date(year + 1, 1, 1).toordinal())
+        record = Record(name, birthday)
+        phone_count = rng.choices((1, 2, 3), cum_weights=phone_count_weights)[0]
+        record.phones = [rng.choices(OPERATOR_CODES, cum_weights=operator_weights)[0]
+                         + f"{rng.randrange(10 ** 7):07d}" for _ in range(phone_count)]
+        yield record
@@ -0,0 +1,147 @@
+import csv
+import json
+import os
+from datetime import datetime
+from itertools import islice
+
+from address_book import Record
+
+
+CSV_FIELDS = ("name", "phones", "birthday")
+
+
+def file_format(filename):
+    """
+    Визначає формат файлу імпорту/експорту за розширенням.
+
+    :param filename: Ім'я файлу.
+    :return: 'csv' або 'jsonl'.
+    :raise ValueError: Якщо розширення не підтримується.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file format: {filename}. Use .csv or .jsonl")
+
+
+def _read_csv(file):
+    for row in csv.DictReader(file):
+        phones = row.get("phones") or ""
+        yield {
+            "name": row.get("name"),
+            "phones": [phone for phone in phones.split(";") if phone.strip()],
+            "birthday": row.get("birthday") or None,
+        }
+
+
+def _read_jsonl(file):
+    for line in file:
+        line = line.strip()
+        yield line or None
+
+
+def read_chunks(filename, chunk_size=10000):
+    """
+    Потоково читає рядки файлу CSV або JSON Lines частинами.
+
+    :param filename: Ім'я файлу.
+    :param chunk_size: Кількість рядків у частині.
+    :return: Генератор списків пар (номер рядка, словник з полями name, phones, birthday
+             для CSV або нерозібраний рядок JSON для JSON Lines).
+    """
+    reader = _read_csv if file_format(filename) == "csv" else _read_jsonl
+    with open(filename, newline='', encoding='utf-8') as file:
+        rows = enumerate(reader(file), start=1)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+class BulkValidator:
+    """
+    Пакетна перевірка рядків імпорту.
+
+    Розібрані дати кешуються за рядком, тому strptime викликається лише один
+    раз для кожної різної дати у файлі.
+    """
+    def __init__(self):
+        self._dates = {}
+        self.errors = []
+
+    def birthday_ordinal(self, value):
+        """
+        Перетворює рядок дати '%d-%m-%Y' у порядковий номер дня.
+
+        :param value: Рядок дати або None.
+        :return: Порядковий номер дня або None.
+        :raise ValueError: Якщо формат дати невірний.
+        """
+        if not value:
+            return None
+        ordinal = self._dates.get(value)
+        if ordinal is None:
+            ordinal = datetime.strptime(value, '%d-%m-%Y').toordinal()
+            self._dates[value] = ordinal
+        return ordinal
+
+    def records(self, chunk):
+        """
+        Перевіряє частину рядків і створює з них контакти.
+
+        Невірні рядки пропускаються, а опис помилки додається до errors.
+
+        :param chunk: Список пар (номер рядка, поля рядка) з read_chunks.
+        :return: Список контактів Record.
+        """
+        records = []
+        for line_number, row in chunk:
+            if row is None:
+                continue
+            try:
+                if isinstance(row, str):
+                    row = json.loads(row)
+                name = str(row.get("name") or "").strip().lower()
+                if not name.replace(" ", "").isalpha():
+                    raise ValueError(f"Invalid name: {name!r}")
+                phones = row.get("phones") or []
+                if isinstance(phones, str):
+                    phones = [phones]
+                record = Record(name, self.birthday_ordinal(row.get("birthday")))
+                record.phones = phones
+            except (AttributeError, TypeError, ValueError) as e:
+                self.errors.append(f"row {line_number}: {e}")
+                continue
+            records.append(record)
+        return records
+
+
+def export_records(records, filename):
+    """
+    Потоково записує контакти у файл CSV або JSON Lines.
+
+    :param records: Ітерований набір контактів.
+    :param filename: Ім'я файлу.
+    :return: Кількість записаних контактів.
+    """
+    format_name = file_format(filename)
+    count = 0
+    with open(filename, 'w', newline='', encoding='utf-8') as file:
+        if format_name == "csv":
+            writer = csv.writer(file)
+            writer.writerow(CSV_FIELDS)
+            for record in records:
+                birthday = str(record.birthday) if record.birthday else ""
+                writer.writerow((record.name.value, ";".join(record.phone_numbers), birthday))
+                count += 1
+        else:
+            for record in records:
+                row = {"name": record.name.value, "phones": list(record.phone_numbers),
+                       "birthday": str(record.birthday) if record.birthday else None}
+                file.write(json.dumps(row, ensure_ascii=False))
+                file.write("\n")
+                count += 1
+    return count
@@ -0,0 +1,212 @@
+from array import array
+from datetime import date, datetime
+
+from indexes import birthday_countdown, calendar_slot
+
+
+MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+# Перший кошик calendar_slot() кожного місяця високосного року.
+MONTH_SLOTS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+UNIX_EPOCH = date(1970, 1, 1).toordinal()
+AGE_BUCKET = 10
+UPCOMING_DAYS = 7
+
+
+def load_numpy():
+    """
+    Імпортує NumPy, якщо він встановлений.
+
+    NumPy — необов'язкова залежність: без нього стовпці обробляються
+    звичайними циклами Python.
+
+    :return: Модуль numpy або None.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class BookColumns:
+    """
+    Стовпцевий знімок адресної книги для масової аналітики.
+
+    Номер рядка є ідентифікатором імені; дати народження зберігаються як
+    масив int32 порядкових номерів дня (0 — дата не вказана), кількість
+    телефонів — як масив int32. Самі контакти не зберігаються: масиви
+    заповнюються за один прохід по книзі. Якщо встановлено NumPy, агрегати
+    обчислюються векторними операціями над цими масивами без копіювання.
+
+    :param records: Ітерований набір контактів у порядку книги.
+    :param version: Номер версії книги, для якої побудовано знімок.
+    """
+    def __init__(self, records, version):
+        self.version = version
+        self.names = []
+        self.birthdays = array('i')
+        self.phone_counts = array('i')
+        for record in records:
+            self.names.append(record.name.value)
+            self.birthdays.append(record.birthday_ordinal or 0)
+            self.phone_counts.append(len(record.phone_numbers))
+        self.numpy = load_numpy()
+        self._dates = None
+        self._slots = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def _birth_dates(self):
+        """
+        Розкладає дати народження на рік, місяць і день.
+
+        :return: Кортеж (маска рядків з датою, роки, місяці, дні) для NumPy
+                 або (None, роки, місяці, дні) зі списками лише для рядків з датою.
+        """
+        if self._dates is None:
+            np = self.numpy
+            if np is not None:
+                ordinals = np.frombuffer(self.birthdays, dtype=np.intc)
+                known = ordinals > 0
+                days = (ordinals[known] - UNIX_EPOCH).astype('datetime64[D]')
+                months = days.astype('datetime64[M]')
+                self._dates = (known, days.astype('datetime64[Y]').astype(np.int64) + 1970,
+                               months.astype(np.int64) % 12 + 1, (days - months).astype(np.int64) + 1)
+            else:
+                dates = [date.fromordinal(ordinal) for ordinal in self.birthdays if ordinal]
+                self._dates = (None, [birthday.year for birthday in dates],
+                               [birthday.month for birthday in dates], [birthday.day for birthday in dates])
+        return self._dates
+
+    def slots(self):
+        """
+        Повертає кошик calendar_slot() дня народження для кожного рядка.
+
+        :return: Масив (NumPy або array('h')), -1 для рядків без дати.
+        """
+        if self._slots is None:
+            known, _, months, days = self._birth_dates()
+            np = self.numpy
+            if np is not None:
+                slots = np.full(len(self.names), -1, dtype=np.int16)
+                slots[known] = np.asarray(MONTH_SLOTS, dtype=np.int16)[months - 1] + days - 1
+            else:
+                known_slots = iter([calendar_slot(month, day) for month, day in zip(months, days)])
+                slots = array('h', [next(known_slots) if ordinal else -1 for ordinal in self.birthdays])
+            self._slots = slots
+        return self._slots
+
+    def days_to_birthday(self, today):
+        """
+        Обчислює кількість днів до дня народження для всіх рядків за один прохід.
+
+        :param today: Поточна дата (date або datetime).
+        :return: Список чисел у порядку рядків; -1 для рядків без дати.
+        """
+        countdown = birthday_countdown(today)
+        slots = self.slots()
+        np = self.numpy
+        if np is not None:
+            # Рядки без дати мають кошик -1, тобто останній елемент таблиці.
+            table = np.asarray(countdown + (-1,), dtype=np.int16)
+            return table[slots].tolist()
+        return [countdown[slot] if slot >= 0 else -1 for slot in slots]
+
+    def birthdays_per_month(self):
+        """:return: Список з 12 чисел — кількість днів народження в кожному місяці."""
+        _, _, months, _ = self._birth_dates()
+        np = self.numpy
+        if np is not None:
+            return np.bincount(months - 1, minlength=12).tolist()
+        counts = [0] * 12
+        for month in months:
+            counts[month - 1] += 1
+        return counts
+
+    def ages(self, today):
+        """
+        Обчислює повний вік на дату today для рядків з датою народження.
+
+        :param today: Поточна дата.
+        :return: Масив NumPy або список віків.
+        """
+        _, years, months, days = self._birth_dates()
+        today_key = today.month * 100 + today.day
+        np = self.numpy
+        if np is not None:
+            return today.year - years - (months * 100 + days > today_key)
+        return [today.year - year - (month * 100 + day > today_key)
+                for year, month, day in zip(years, months, days)]
+
+    def age_distribution(self, today, bucket=AGE_BUCKET):
+        """
+        Групує вік контактів за інтервалами.
+
+        :param today: Поточна дата.
+        :param bucket: Ширина інтервалу в роках.
+        :return: Список пар (початок інтервалу, кількість) лише для непорожніх інтервалів.
+        """
+        ages = self.ages(today)
+        np = self.numpy
+        if np is not None:
+            counts = np.bincount(np.maximum(ages, 0) // bucket).tolist()
+        else:
+            counts = []
+            for age in ages:
+                index = max(age, 0) // bucket
+                counts.extend([0] * (index + 1 - len(counts)))
+                counts[index] += 1
+        return [(index * bucket, count) for index, count in enumerate(counts) if count]
+
+    def phone_count_distribution(self):
+        """:return: Список з чотирьох чисел — контакти без телефону, з одним, двома, трьома і більше."""
+        np = self.numpy
+        if np is not None:
+            phone_counts = np.frombuffer(self.phone_counts, dtype=np.intc)
+            return np.bincount(np.minimum(phone_counts, 3), minlength=4).tolist()
+        counts = [0] * 4
+        for count in self.phone_counts:
+            counts[min(count, 3)] += 1
+        return counts
+
+    def without_phone(self):
+        """:return: Імена контактів без телефону в порядку книги."""
+        np = self.numpy
+        if np is not None:
+            rows = np.flatnonzero(np.frombuffer(self.phone_counts, dtype=np.intc) == 0)
+            return [self.names[row] for row in rows.tolist()]
+        return [name for name, count in zip(self.names, self.phone_counts) if not count]
+
+    def report(self, today=None):
+        """
+        Формує зведення по книзі: телефони, дні народження за місяцями, вік.
+
+        :param today: Поточна дата; якщо не вказана, береться сьогоднішня.
+        :return: Рядок зі зведенням.
+        """
+        today = today or date.today()
+        if isinstance(today, datetime):
+            today = today.date()
+        phones = self.phone_count_distribution()
+        per_month = self.birthdays_per_month()
+        with_birthday = sum(per_month)
+        upcoming = sum(1 for days in self.days_to_birthday(today) if 0 <= days <= UPCOMING_DAYS)
+        lines = [
+            f"Contacts: {len(self)}",
+            f"Phones per contact: none {phones[0]}, one {phones[1]}, two {phones[2]}, three or more {phones[3]}",
+            f"With birthday: {with_birthday}",
+            "Birthdays per month: " + ", ".join(f"{name} {count}" for name, count in zip(MONTH_NAMES, per_month)),
+            f"Birthdays in the next {UPCOMING_DAYS} days: {upcoming}",
+        ]
+        if with_birthday:
+            ages = self.ages(today)
+            total = int(ages.sum()) if self.numpy is not None else sum(ages)
+            lines.append(f"Average age: {total / with_birthday:.1f}")
+            lines.append("Age distribution: " + ", ".join(
+                f"{start}-{start + AGE_BUCKET - 1}: {count}" for start, count in self.age_distribution(today)))
+        without_phone = self.without_phone()
+        if without_phone:
+            shown = ", ".join(without_phone[:10]) + (", ..." if len(without_phone) > 10 else "")
+            lines.append(f"Without phone: {shown}")
+        return "\n".join(lines)
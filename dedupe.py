@@ -0,0 +1,188 @@
+from collections import defaultdict
+
+from indexes import edit_distance
+
+
+# Останні цифри номера однакові для '0671234567' і '+380671234567'.
+PHONE_SUFFIX_LENGTH = 9
+# У великому блоці (усі, хто народився одного дня) контакт порівнюється лише
+# з найближчими за алфавітом сусідами, щоб кількість пар росла лінійно.
+WINDOW = 4
+DEFAULT_THRESHOLD = 0.6
+# Більша відстань робить порівняння дорогим і вже не схожа на описку.
+MAX_NAME_DISTANCE = 2
+NAME_WEIGHT = 0.6
+PHONE_WEIGHT = 0.3
+BIRTHDAY_WEIGHT = 0.1
+BIRTHDAY_CONFLICT_PENALTY = 0.3
+
+
+def name_key(name):
+    """
+    Нормалізує ім'я для порівняння: нижній регістр без пробілів.
+
+    'Ivan  Petrenko', 'ivan petrenko' і 'IvanPetrenko' дають один ключ.
+
+    :param name: Ім'я контакту.
+    :return: Нормалізований ключ імені.
+    """
+    return "".join(name.lower().split())
+
+
+def name_similarity(first, second):
+    """
+    Оцінює схожість нормалізованих імен за відстанню редагування.
+
+    :param first: Ключ першого імені (name_key).
+    :param second: Ключ другого імені.
+    :return: Число від 0 до 1; 1 — імена збігаються, 0 — відстань більша за MAX_NAME_DISTANCE.
+    """
+    if first == second:
+        return 1.0
+    length = max(len(first), len(second))
+    if length - min(len(first), len(second)) > MAX_NAME_DISTANCE:
+        return 0.0
+    # Кожна правка додає або прибирає щонайбільше по одній літері з кожного боку,
+    # тож різні імена відсіюються без обчислення відстані.
+    if len(set(first).symmetric_difference(second)) > 2 * MAX_NAME_DISTANCE:
+        return 0.0
+    # Спільні початок і кінець не змінюють відстань, а без них таблиця
+    # edit_distance для імен з одного блоку зазвичай займає кілька клітинок.
+    start = 0
+    while start < len(first) and start < len(second) and first[start] == second[start]:
+        start += 1
+    end = 0
+    while end < len(first) - start and end < len(second) - start and first[-1 - end] == second[-1 - end]:
+        end += 1
+    distance = edit_distance(first[start:len(first) - end], second[start:len(second) - end], MAX_NAME_DISTANCE)
+    if distance > MAX_NAME_DISTANCE:
+        return 0.0
+    return 1 - distance / length
+
+
+class DuplicateCluster:
+    """
+    Група контактів, які ймовірно описують одну людину.
+
+    :param names: Імена контактів у порядку книги; перше ім'я залишається при об'єднанні.
+    :param score: Найменша оцінка серед знайдених пар групи.
+    """
+    __slots__ = ('names', 'score')
+
+    def __init__(self, names, score):
+        self.names = names
+        self.score = score
+
+
+class _Candidate:
+    """Нормалізовані поля контакту, які порівнюються при пошуку дублікатів."""
+    __slots__ = ('name', 'key', 'swapped_key', 'phones', 'birthday')
+
+    def __init__(self, name, record):
+        self.name = name
+        self.key = name_key(name)
+        # 'Petrenko Ivan' і 'Ivan Petrenko': слова за алфавітом.
+        self.swapped_key = "".join(sorted(name.lower().split()))
+        self.phones = {phone[-PHONE_SUFFIX_LENGTH:] for phone in record.phone_numbers}
+        self.birthday = record.birthday_ordinal
+
+    def blocking_keys(self):
+        """
+        Повертає ключі блоків: нормалізоване ім'я (також зі словами за алфавітом),
+        закінчення кожного номера і дата народження з першою літерою імені.
+        """
+        keys = ["n" + self.key]
+        if self.swapped_key != self.key:
+            keys.append("n" + self.swapped_key)
+        keys.extend("p" + phone for phone in self.phones)
+        if self.birthday is not None:
+            keys.append(f"b{self.birthday}{self.key[:1]}")
+        return keys
+
+
+def score_pair(first, second):
+    """
+    Оцінює, наскільки ймовірно два контакти — одна людина.
+
+    Схожість імен має вагу NAME_WEIGHT, спільний номер — PHONE_WEIGHT, однакова
+    дата народження — BIRTHDAY_WEIGHT; різні дати народження зменшують оцінку.
+
+    :param first: _Candidate першого контакту.
+    :param second: _Candidate другого контакту.
+    :return: Оцінка від 0 до 1, округлена до двох знаків.
+    """
+    similarity = name_similarity(first.key, second.key)
+    if similarity < 1 and (first.swapped_key != first.key or second.swapped_key != second.key):
+        similarity = max(similarity, name_similarity(first.swapped_key, second.swapped_key))
+    score = NAME_WEIGHT * similarity
+    if not first.phones.isdisjoint(second.phones):
+        score += PHONE_WEIGHT
+    if first.birthday is not None and second.birthday is not None:
+        if first.birthday == second.birthday:
+            score += BIRTHDAY_WEIGHT
+        else:
+            score -= BIRTHDAY_CONFLICT_PENALTY
+    return round(max(score, 0.0), 2)
+
+
+def find_duplicates(records, threshold=DEFAULT_THRESHOLD):
+    """
+    Шукає групи ймовірних дублікатів.
+
+    Кожен контакт потрапляє в кілька блоків за ключами з _Candidate.blocking_keys,
+    і порівнюються лише пари всередині одного блоку. Блок впорядковується за
+    ім'ям, і кожен контакт порівнюється з WINDOW наступними, тому кількість
+    порівнянь лінійна за кількістю контактів. Пари з оцінкою не нижче порогу
+    об'єднуються в групи (транзитивно, через систему неперетинних множин).
+
+    :param records: Ітерований набір пар (ім'я, контакт) у порядку книги.
+    :param threshold: Мінімальна оцінка пари, від 0 до 1.
+    :return: Пара (список DuplicateCluster від найвищої оцінки, кількість порівнянь).
+    :raise ValueError: Якщо поріг поза межами від 0 до 1.
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"Invalid threshold: {threshold}. Use a number between 0 and 1")
+    candidates = []
+    blocks = defaultdict(list)
+    for position, (name, record) in enumerate(records):
+        candidate = _Candidate(name, record)
+        candidates.append(candidate)
+        for key in candidate.blocking_keys():
+            blocks[key].append(position)
+
+    parents = list(range(len(candidates)))
+    scores = {}
+
+    def root(position):
+        while parents[position] != position:
+            parents[position] = parents[parents[position]]
+            position = parents[position]
+        return position
+
+    compared = 0
+    for block in blocks.values():
+        if len(block) < 2:
+            continue
+        if len(block) > WINDOW + 1:
+            block.sort(key=lambda position: candidates[position].key)
+        for i, position in enumerate(block):
+            for other in block[i + 1:i + 1 + WINDOW]:
+                compared += 1
+                score = score_pair(candidates[position], candidates[other])
+                if score < threshold:
+                    continue
+                first, second = root(position), root(other)
+                if first != second:
+                    # Корінь групи — контакт, доданий першим.
+                    first, second = min(first, second), max(first, second)
+                    parents[second] = first
+                    score = min(score, scores.pop(second, 1.0))
+                scores[first] = min(score, scores.get(first, 1.0))
+
+    members = defaultdict(list)
+    for position in range(len(candidates)):
+        if parents[position] != position or position in scores:
+            members[root(position)].append(candidates[position].name)
+    clusters = [DuplicateCluster(names, scores[position]) for position, names in members.items()]
+    clusters.sort(key=lambda cluster: (-cluster.score, cluster.names[0]))
+    return clusters, compared
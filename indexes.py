@@ -0,0 +1,542 @@
+from array import array
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+
+FIELD_SEPARATOR = "\x00"
+
+
+class NGramIndex:
+    """
+    Інвертований n-грамний індекс для пошуку підрядків у контактах.
+
+    Кожен запис отримує числовий ідентифікатор у порядку додавання, тому
+    результати пошуку повертаються у тому ж порядку, що й у словнику книги.
+    Списки входжень зберігаються як масиви цілих чисел; застарілі входження
+    відкидаються під час перевірки кандидатів і періодично ущільнюються.
+
+    :param n: Максимальна довжина n-грами (за замовчуванням 3).
+    """
+    def __init__(self, n=3):
+        self.n = n
+        self._postings = defaultdict(lambda: array('I'))
+        self._ids = {}
+        self._keys = []
+        self._texts = []
+        self._live_entries = 0
+        self._stale_entries = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _grams(self, text):
+        """
+        Повертає множину n-грам довжиною від 1 до n для тексту.
+
+        :param text: Текст, нормалізований до нижнього регістру.
+        :return: Множина n-грам, що не перетинають межі полів.
+        """
+        grams = set()
+        for field in text.split(FIELD_SEPARATOR):
+            length = len(field)
+            for size in range(1, self.n + 1):
+                for i in range(length - size + 1):
+                    grams.add(field[i:i + size])
+        return grams
+
+    def add(self, key, fields):
+        """
+        Додає або оновлює запис в індексі.
+
+        :param key: Ключ запису (ім'я контакту).
+        :param fields: Ітерований набір текстових полів запису.
+        """
+        text = FIELD_SEPARATOR.join(str(field).lower() for field in fields)
+        new_grams = self._grams(text)
+        record_id = self._ids.get(key)
+
+        if record_id is None:
+            record_id = len(self._keys)
+            self._ids[key] = record_id
+            self._keys.append(key)
+            self._texts.append(text)
+            added = new_grams
+        else:
+            old_grams = self._grams(self._texts[record_id])
+            self._texts[record_id] = text
+            added = new_grams - old_grams
+            stale = len(old_grams - new_grams)
+            self._live_entries -= stale
+            self._stale_entries += stale
+
+        for gram in added:
+            self._postings[gram].append(record_id)
+        self._live_entries += len(added)
+        self._maybe_compact()
+
+    def discard(self, key):
+        """
+        Видаляє запис з індексу, якщо він там є.
+
+        :param key: Ключ запису.
+        """
+        record_id = self._ids.pop(key, None)
+        if record_id is None:
+            return
+        stale = len(self._grams(self._texts[record_id]))
+        self._texts[record_id] = None
+        self._keys[record_id] = None
+        self._live_entries -= stale
+        self._stale_entries += stale
+        self._maybe_compact()
+
+    def search(self, term):
+        """
+        Шукає ключі записів, у полях яких є вказаний підрядок.
+
+        :param term: Підрядок для пошуку (без урахування регістру).
+        :return: Список ключів у порядку додавання записів.
+        """
+        term = term.lower()
+        if not term:
+            return [key for key in self._keys if key is not None]
+
+        size = min(len(term), self.n)
+        grams = {term[i:i + size] for i in range(len(term) - size + 1)}
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        if not postings[0]:
+            return []
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if len(candidates) <= 64:
+                break
+            candidates.intersection_update(posting)
+
+        texts = self._texts
+        return [self._keys[record_id] for record_id in sorted(candidates)
+                if texts[record_id] is not None and term in texts[record_id]]
+
+    def estimate(self, term):
+        """
+        Оцінює кількість записів, що містять підрядок, не перевіряючи їх.
+
+        :param term: Підрядок для пошуку (без урахування регістру).
+        :return: Довжина найкоротшого списку входжень n-грам терміну (верхня межа).
+        """
+        term = term.lower()
+        if not term:
+            return len(self._ids)
+        size = min(len(term), self.n)
+        return min(len(self._postings.get(term[i:i + size], ())) for i in range(len(term) - size + 1))
+
+    def _maybe_compact(self):
+        """Перебудовує списки входжень, коли застарілих входжень більше, ніж живих."""
+        if self._stale_entries <= max(self._live_entries, 1024):
+            return
+        keys = [key for key in self._keys if key is not None]
+        texts = [self._texts[self._ids[key]] for key in keys]
+        self._postings.clear()
+        self._ids.clear()
+        self._keys = []
+        self._texts = []
+        self._live_entries = 0
+        self._stale_entries = 0
+        for key, text in zip(keys, texts):
+            self.add(key, text.split(FIELD_SEPARATOR))
+
+
+class PhoneIndex:
+    """
+    Зворотний індекс: нормалізований номер телефону -> контакти, яким він належить.
+    """
+    def __init__(self):
+        self._owners = defaultdict(dict)
+        self._phones = {}
+
+    def __len__(self):
+        return len(self._owners)
+
+    def add(self, key, phones):
+        """
+        Додає або оновлює телефони запису.
+
+        :param key: Ключ запису (ім'я контакту).
+        :param phones: Кортеж нормалізованих номерів телефонів.
+        """
+        phones = tuple(dict.fromkeys(phones))
+        old_phones = self._phones.get(key, ())
+        if phones == old_phones:
+            return
+        for phone in old_phones:
+            if phone not in phones:
+                self._remove_owner(phone, key)
+        for phone in phones:
+            self._owners[phone][key] = None
+        self._phones[key] = phones
+
+    def discard(self, key):
+        """
+        Видаляє запис з індексу, якщо він там є.
+
+        :param key: Ключ запису.
+        """
+        for phone in self._phones.pop(key, ()):
+            self._remove_owner(phone, key)
+
+    def _remove_owner(self, phone, key):
+        owners = self._owners[phone]
+        del owners[key]
+        if not owners:
+            del self._owners[phone]
+
+    def owners(self, phone):
+        """
+        Повертає ключі записів, яким належить номер.
+
+        :param phone: Нормалізований номер телефону.
+        :return: Список ключів.
+        """
+        owners = self._owners.get(phone)
+        return list(owners) if owners else []
+
+
+def edit_distance(source, target, max_distance):
+    """
+    Обчислює відстань Дамерау-Левенштейна (з транспозицією сусідніх символів).
+
+    Обчислення припиняється, щойно відстань гарантовано перевищує max_distance.
+
+    :param source: Перший рядок.
+    :param target: Другий рядок.
+    :param max_distance: Максимальна відстань, що цікавить.
+    :return: Відстань або max_distance + 1, якщо вона більша за max_distance.
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    previous_row = None
+    row = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        before, previous_row = previous_row, row
+        row = [i] + [0] * len(target)
+        source_char = source[i - 1]
+        for j in range(1, len(target) + 1):
+            cost = 0 if source_char == target[j - 1] else 1
+            value = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if (cost and i > 1 and j > 1 and source_char == target[j - 2]
+                    and source[i - 2] == target[j - 1]):
+                value = min(value, before[j - 2] + 1)
+            row[j] = value
+        if min(row) > max_distance:
+            return max_distance + 1
+    return row[-1] if row[-1] <= max_distance else max_distance + 1
+
+
+class DeletionIndex:
+    """
+    Індекс нечіткого пошуку за схемою SymSpell.
+
+    Для кожного ключа породжуються всі варіанти його префікса з вилученими
+    символами (до max_distance вилучень). Запит породжує такі ж варіанти, а
+    кандидати, що мають спільний варіант, перевіряються точною відстанню
+    Дамерау-Левенштейна, тому час запиту залежить від довжини терміну, а не
+    від розміру книги.
+
+    Варіанти не зберігаються як рядки: індекс — це хеш-таблиця з ланцюжками
+    у масивах цілих чисел (голови кошиків, посилання на наступний елемент і
+    номер ключа), по 8 байтів на варіант. Колізії хешів лише додають
+    кандидатів, які відсіює перевірка відстані. Видалені ключі позначаються
+    і прибираються під час періодичного перебудовування.
+
+    :param max_distance: Максимальна відстань редагування, яку підтримує індекс.
+    :param prefix_length: Довжина префікса, з якого породжуються варіанти.
+    :param capacity: Очікувана кількість ключів, щоб одразу виділити достатньо кошиків.
+    """
+    def __init__(self, max_distance=2, prefix_length=7, capacity=0):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._ids = {}
+        self._keys = []
+        self._words = []
+        self._stale_keys = 0
+        self._allocate(capacity * 32)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _allocate(self, entries):
+        """Створює порожню таблицю з кількістю кошиків — степенем двійки, не меншим за entries."""
+        buckets = 1024
+        while buckets < entries:
+            buckets *= 2
+        self._mask = buckets - 1
+        self._heads = array('i', [-1]) * buckets
+        self._next = array('i')
+        self._owners = array('I')
+
+    def _variants(self, word, max_distance):
+        """
+        Повертає множину варіантів префікса слова з вилученими символами.
+
+        :param word: Слово в нижньому регістрі.
+        :param max_distance: Максимальна кількість вилучених символів.
+        :return: Множина варіантів, включно з самим префіксом.
+        """
+        prefix = word[:self.prefix_length]
+        variants = {prefix}
+        level = [(prefix, 0)]
+        for _ in range(max_distance):
+            # Позиції вилучень неспадні, тому кожна комбінація породжується один раз.
+            level = [(variant[:i] + variant[i + 1:], i) for variant, start in level
+                     for i in range(start, len(variant))]
+            variants.update(variant for variant, _ in level)
+        return variants
+
+    def _insert(self, key_id, word):
+        heads, mask = self._heads, self._mask
+        buckets = [hash(variant) & mask for variant in self._variants(word, self.max_distance)]
+        entry = len(self._owners)
+        links = array('i', buckets)
+        for i, bucket in enumerate(buckets):
+            links[i] = heads[bucket]
+            heads[bucket] = entry + i
+        self._next.extend(links)
+        self._owners.extend(array('I', [key_id]) * len(buckets))
+
+    def add(self, key):
+        """
+        Додає ключ до індексу, якщо його там ще немає.
+
+        :param key: Ключ запису (ім'я контакту).
+        """
+        if key in self._ids:
+            return
+        if len(self._owners) > 2 * (self._mask + 1):
+            self._rebuild()
+        word = key.lower()
+        key_id = len(self._keys)
+        self._ids[key] = key_id
+        self._keys.append(key)
+        self._words.append(word)
+        self._insert(key_id, word)
+
+    def discard(self, key):
+        """
+        Видаляє ключ з індексу, якщо він там є.
+
+        :param key: Ключ запису.
+        """
+        key_id = self._ids.pop(key, None)
+        if key_id is None:
+            return
+        self._keys[key_id] = None
+        self._words[key_id] = None
+        self._stale_keys += 1
+        if self._stale_keys > max(len(self._ids), 1024):
+            self._rebuild()
+
+    def _rebuild(self):
+        """Перебудовує таблицю без видалених ключів і з кількістю кошиків під поточний розмір."""
+        keys = [key for key in self._keys if key is not None]
+        live_entries = len(self._owners) * len(keys) // max(len(self._keys), 1)
+        self._ids.clear()
+        self._keys = []
+        self._words = []
+        self._stale_keys = 0
+        self._allocate(2 * live_entries)
+        for key in keys:
+            self.add(key)
+
+    def search(self, term, max_distance=None):
+        """
+        Шукає ключі, відстань редагування до яких не перевищує max_distance.
+
+        :param term: Термін для пошуку (без урахування регістру).
+        :param max_distance: Максимальна відстань (за замовчуванням — відстань індексу).
+        :return: Список пар (відстань, ключ), впорядкований за відстанню, потім за ключем.
+        :raise ValueError: Якщо max_distance більша за відстань, з якою побудовано індекс.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if not 0 <= max_distance <= self.max_distance:
+            raise ValueError(f"Maximum distance must be between 0 and {self.max_distance}")
+        term = term.lower()
+        heads, next_entries, owners, mask = self._heads, self._next, self._owners, self._mask
+        candidates = set()
+        for variant in self._variants(term, max_distance):
+            entry = heads[hash(variant) & mask]
+            while entry >= 0:
+                candidates.add(owners[entry])
+                entry = next_entries[entry]
+
+        words = self._words
+        matches = []
+        for key_id in candidates:
+            word = words[key_id]
+            if word is None:
+                continue
+            distance = edit_distance(term, word, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, self._keys[key_id]))
+        matches.sort()
+        return matches
+
+
+def is_leap_year(year):
+    """Перевіряє, чи рік високосний (як calendar.isleap, без імпорту модуля calendar)."""
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def birthday_in_year(month, day, year):
+    """
+    Повертає дату дня народження у вказаному році.
+
+    У невисокосні роки день народження 29 лютого святкується 28 лютого.
+
+    :param month: Місяць народження.
+    :param day: День народження.
+    :param year: Рік.
+    :return: Об'єкт date.
+    """
+    if month == 2 and day == 29 and not is_leap_year(year):
+        return date(year, 2, 28)
+    return date(year, month, day)
+
+
+def days_until_birthday(birthday, today):
+    """
+    Обчислює кількість днів від today до найближчого дня народження.
+
+    :param birthday: Дата народження (date або datetime).
+    :param today: Поточна дата (date або datetime).
+    :return: 0, якщо день народження сьогодні, інакше кількість днів до наступного.
+    """
+    if isinstance(today, datetime):
+        today = today.date()
+    upcoming = birthday_in_year(birthday.month, birthday.day, today.year)
+    if upcoming < today:
+        upcoming = birthday_in_year(birthday.month, birthday.day, today.year + 1)
+    return (upcoming - today).days
+
+
+LEAP_YEAR_START = date(2000, 1, 1).toordinal()
+
+
+def calendar_slot(month, day):
+    """Номер дня у високосному році (0..365), який використовується як кошик календаря."""
+    return date(2000, month, day).toordinal() - LEAP_YEAR_START
+
+
+def upcoming_slots(today, days):
+    """
+    Перелічує кошики календаря для найближчих днів, кожен не більше одного разу.
+
+    У невисокосні роки 28 лютого також охоплює кошик 29 лютого.
+
+    :param today: Поточна дата (date або datetime).
+    :param days: Кількість днів уперед (включно з сьогодні).
+    :return: Генератор пар (днів від сьогодні, номер кошика).
+    """
+    if isinstance(today, datetime):
+        today = today.date()
+    seen = set()
+    for offset in range(min(days, 366) + 1):
+        current = today + timedelta(days=offset)
+        slots = [calendar_slot(current.month, current.day)]
+        if current.month == 2 and current.day == 28 and not is_leap_year(current.year):
+            slots.append(calendar_slot(2, 29))
+        for slot in slots:
+            if slot not in seen:
+                seen.add(slot)
+                yield offset, slot
+
+
+def birthday_countdown(today):
+    """
+    Повертає кількість днів від today до дня народження для кожного кошика календаря.
+
+    Таблиця обчислюється один раз для кожної дати, тому форматування
+    багатьох контактів за один день зводиться до звернення за індексом.
+
+    :param today: Поточна дата (date або datetime).
+    :return: Кортеж з 366 чисел; індекс — номер кошика calendar_slot().
+    """
+    if isinstance(today, datetime):
+        today = today.date()
+    return _birthday_countdown(today)
+
+
+@lru_cache(maxsize=8)
+def _birthday_countdown(today):
+    countdown = [0] * 366
+    for offset, slot in upcoming_slots(today, 366):
+        countdown[slot] = offset
+    return tuple(countdown)
+
+
+class BirthdayCalendar:
+    """
+    Календарний індекс днів народження: 366 кошиків за днем року.
+
+    Кожен кошик зберігає ключі контактів у порядку додавання, тому пошук
+    найближчих днів народження переглядає лише потрібні дні і знайдені записи.
+    """
+    def __init__(self):
+        self._buckets = [{} for _ in range(366)]
+        self._slots = {}
+
+    def __len__(self):
+        return len(self._slots)
+
+    def add(self, key, ordinal):
+        """
+        Додає або оновлює день народження запису.
+
+        :param key: Ключ запису (ім'я контакту).
+        :param ordinal: Дата народження як порядковий номер дня або None.
+        """
+        self.discard(key)
+        if ordinal is None:
+            return
+        birthday = date.fromordinal(ordinal)
+        slot = calendar_slot(birthday.month, birthday.day)
+        self._buckets[slot][key] = None
+        self._slots[key] = slot
+
+    def discard(self, key):
+        """
+        Видаляє запис з календаря, якщо він там є.
+
+        :param key: Ключ запису.
+        """
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            del self._buckets[slot][key]
+
+    def count(self, slots):
+        """
+        :param slots: Номери кошиків календаря.
+        :return: Кількість записів з днями народження в цих кошиках.
+        """
+        return sum(len(self._buckets[slot]) for slot in slots)
+
+    def keys(self, slots):
+        """
+        :param slots: Номери кошиків календаря.
+        :return: Список ключів записів з днями народження в цих кошиках.
+        """
+        return [key for slot in slots for key in self._buckets[slot]]
+
+    def upcoming(self, today, days):
+        """
+        Повертає записи з днями народження у найближчі days днів (включно з сьогодні).
+
+        :param today: Поточна дата (date або datetime).
+        :param days: Кількість днів уперед.
+        :return: Список пар (днів до дня народження, ключ), впорядкований за днями.
+        """
+        result = []
+        for offset, slot in upcoming_slots(today, days):
+            result.extend((offset, key) for key in self._buckets[slot])
+        return result
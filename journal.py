@@ -0,0 +1,135 @@
+import os
+import pickle
+import struct
+import time
+import zlib
+
+
+ENTRY_HEADER = struct.Struct("<II")
+
+PUT = "put"
+DELETE = "del"
+
+
+class Journal:
+    """
+    Журнал змін (write-ahead log) адресної книги з дописуванням у кінець файлу.
+
+    Кожен запис журналу має заголовок з довжиною та контрольною сумою CRC32,
+    за яким іде pickle-кортеж (операція, ім'я, контакт). Записи буферизуються
+    і скидаються на диск з fsync пакетами.
+
+    :param path: Шлях до файлу журналу.
+    :param batch_size: Кількість записів, після якої виконується fsync.
+    :param sync_interval: Максимальний час у секундах між fsync при активному записі.
+    """
+    def __init__(self, path, batch_size=64, sync_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.sync_interval = sync_interval
+        self.entries = 0
+        self._pending = []
+        self._last_sync = time.monotonic()
+        self._file = None
+
+    def replay(self, status_stream=None):
+        """
+        Послідовно читає записи журналу, зупиняючись на першому пошкодженому.
+
+        Пошкоджений або недописаний хвіст (наприклад, після аварійного завершення)
+        відрізається, щоб нові записи не опинились за ним.
+
+        :param status_stream: Потік для повідомлення про відрізаний хвіст.
+        :return: Генератор кортежів (операція, ім'я, контакт).
+        """
+        if not os.path.exists(self.path):
+            return
+        valid_size = 0
+        with open(self.path, 'rb') as file:
+            while True:
+                header = file.read(ENTRY_HEADER.size)
+                if len(header) < ENTRY_HEADER.size:
+                    break
+                length, checksum = ENTRY_HEADER.unpack(header)
+                payload = file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                valid_size = file.tell()
+                self.entries += 1
+                yield pickle.loads(payload)
+        if valid_size < os.path.getsize(self.path):
+            print(f"Journal {self.path} has a damaged tail, truncating to {valid_size} bytes",
+                  file=status_stream)
+            os.truncate(self.path, valid_size)
+
+    def lookup(self, name):
+        """
+        Шукає останню зміну одного контакту, не відтворюючи весь журнал.
+
+        Розпаковуються лише записи, байти яких містять ім'я контакту, а файл
+        журналу не змінюється (пошкоджений хвіст просто ігнорується).
+
+        :param name: Ім'я контакту.
+        :return: Пара (операція, контакт) останньої зміни або None, якщо змін не було.
+        """
+        if not os.path.exists(self.path):
+            return None
+        encoded_name = name.encode('utf-8')
+        change = None
+        with open(self.path, 'rb') as file:
+            while True:
+                header = file.read(ENTRY_HEADER.size)
+                if len(header) < ENTRY_HEADER.size:
+                    break
+                length, checksum = ENTRY_HEADER.unpack(header)
+                payload = file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                if encoded_name in payload:
+                    op, entry_name, record = pickle.loads(payload)
+                    if entry_name == name:
+                        change = op, record
+        return change
+
+    def append(self, op, name, record=None):
+        """
+        Додає запис про зміну до журналу.
+
+        :param op: Операція: PUT (додати або замінити контакт) чи DELETE.
+        :param name: Ім'я контакту.
+        :param record: Контакт для операції PUT.
+        """
+        payload = pickle.dumps((op, name, record), protocol=pickle.HIGHEST_PROTOCOL)
+        self._pending.append(ENTRY_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.entries += 1
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.flush()
+
+    def flush(self):
+        """Записує буферизовані записи у файл і виконує fsync."""
+        self._last_sync = time.monotonic()
+        if not self._pending:
+            return
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(b''.join(self._pending))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending.clear()
+
+    def truncate(self):
+        """Очищає журнал після того, як його зміни потрапили у знімок."""
+        self._pending.clear()
+        self.close()
+        with open(self.path, 'wb') as file:
+            os.fsync(file.fileno())
+        self.entries = 0
+
+    def close(self):
+        """Скидає буфер на диск і закриває файл журналу."""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
@@ -1,17 +1,45 @@
-from datetime import datetime
-from address_book import Birthday, Name, Phone, Record, AddressBook, is_valid_date
+from datetime import date
+from address_book import Birthday, Record, AddressBook, is_valid_date, write_lines
+from autosave import Autosaver
+from dedupe import DEFAULT_THRESHOLD
+from journal import DELETE, PUT, Journal
+from metrics import METRICS, measured
+from shards import MAX_SHARDS, ShardedRecords, manifest_path, open_shard_of, open_shards, write_shards
+from storage import MappedRecords, RecordsSnapshot, SQLiteRecords, VersionedRecords, open_snapshot, write_snapshot
+import argparse
+import os
 import pickle
+import sys
+import threading
+import time
+from collections import defaultdict
+from types import GeneratorType
+
+# Модулі parallel (multiprocessing), server (asyncio), bulk_io (csv, json) і
+# cProfile імпортуються там, де вони потрібні, щоб не сповільнювати запуск
+# консолі та одноразових команд.
+
+EXIT_COMMANDS = {"good bye", "close", "exit"}
 
 def input_error(func):
     """
     Декоратор для обробки помилок під час виклику методів класу AddressBookWithFileOps.
 
+    Якщо збір метрик увімкнено, також вимірює тривалість виклику (потоковий
+    результат вимірюється окремо під назвою '<команда>:stream').
+
     :param func: Декорована функція.
     :return: Обгортка для обробки помилок.
     """
     def wrapper(self, *args, **kwargs):
         try:
-            return func(self, *args, **kwargs)
+            if not METRICS.enabled:
+                return func(self, *args, **kwargs)
+            with METRICS.measure(func.__name__):
+                result = func(self, *args, **kwargs)
+            if isinstance(result, GeneratorType):
+                return METRICS.measure_iter(f"{func.__name__}:stream", result)
+            return result
         except KeyError as e:
             return f"Error: {e}"
         except ValueError as e:
@@ -22,17 +50,51 @@ def input_error(func):
     return wrapper
 
 class AddressBookWithFileOps(AddressBook):
+    compaction_threshold = 10000
+
     def __init__(self):
         """
         Ініціалізує об'єкт класу AddressBookWithFileOps.
         """
         super().__init__()
-        self.table = {
+        self.journal = None
+        self.snapshot_file = None
+        self.shards = 0
+        self.shard_workers = 1
+        self.parallel = None
+        self.status_stream = None
+        self.autosaver = None
+        self.lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._compacted = None
+        self.table = self._command_table()
+        self.enable_versions()
+
+    def _command_table(self):
+        """
+        Створює таблицю команд консолі.
+
+        :return: Словник з назвами команд та їх обробниками.
+        """
+        return {
             "add": self.add_contact,
             "change": self.change_contact,
             "get": self.get_contact,
             "show all": self.show_all,
+            "show page": self.show_page,
             "search": self.search_contacts,
+            "upcoming": self.upcoming,
+            "whois": self.whois,
+            "fuzzy": self.fuzzy,
+            "explain": self.explain_query,
+            "dedupe": self.dedupe,
+            "stats": self.stats,
+            "undo": self.undo_command,
+            "redo": self.redo_command,
+            "snapshot": self.snapshot_command,
+            "restore": self.restore_command,
+            "import": self.import_contacts,
+            "export": self.export_contacts,
             "hello": self.hello
         }
 
@@ -57,6 +119,13 @@ class AddressBookWithFileOps(AddressBook):
         """
         state = self.__dict__.copy()
         state.pop('wrapper', None)
+        state.pop('journal', None)
+        state.pop('parallel', None)
+        state.pop('status_stream', None)
+        state.pop('autosaver', None)
+        state.pop('lock', None)
+        state.pop('_save_lock', None)
+        state.pop('_compacted', None)
         return state
 
     def __setstate__(self, state):
@@ -66,14 +135,218 @@ class AddressBookWithFileOps(AddressBook):
         :param state: Стан об'єкту.
         """
         self.__dict__.update(state)
-        self.table = {
-            "add": self.add_contact,
-            "change": self.change_contact,
-            "get": self.get_contact,
-            "show all": self.show_all,
-            "search": self.search_contacts,
-            "hello": self.hello
-        }
+        self.journal = None
+        self.parallel = None
+        self.status_stream = None
+        self.autosaver = None
+        self.lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._compacted = None
+        self.table = self._command_table()
+
+    def enable_parallel(self, workers=None, threshold=50000):
+        """
+        Вмикає паралельний пошук і виведення контактів у пулі процесів.
+
+        У паралельному режимі пошук перебирає шарди книги у робочих процесах
+        замість побудови n-грамного індексу в пам'яті. Книги, менші за поріг,
+        обробляються послідовно.
+
+        :param workers: Кількість робочих процесів (за замовчуванням os.cpu_count()).
+        :param threshold: Мінімальна кількість контактів для паралельної обробки.
+        """
+        from parallel import ParallelExecutor
+
+        self.disable_parallel()
+        self.parallel = ParallelExecutor(workers, threshold)
+
+    def disable_parallel(self):
+        """Вимикає паралельний режим і зупиняє пул процесів."""
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+    def enable_shards(self, count, workers=None):
+        """
+        Вмикає збереження знімка у count файлах-шардах замість одного файлу.
+
+        Контакти розподіляються за хешем імені; шарди записуються і
+        перевіряються при завантаженні паралельно. Книга, вже розбита на
+        шарди, відкривається так само і без цього виклику (за маніфестом).
+
+        :param count: Кількість шардів.
+        :param workers: Кількість робочих процесів (за замовчуванням os.cpu_count()).
+        :raise ValueError: Якщо кількість шардів поза межами.
+        """
+        if not 1 <= count <= MAX_SHARDS:
+            raise ValueError(f"Invalid number of shards: {count}. Use 1 to {MAX_SHARDS}")
+        self.shards = count
+        self.shard_workers = workers or os.cpu_count() or 1
+
+    def _open_snapshot(self, filename):
+        """
+        Відкриває знімок: розбитий на шарди, якщо поруч є маніфест, інакше один файл.
+
+        :param filename: Ім'я файлу знімка.
+        :return: Словник контактів.
+        :raise FileNotFoundError: Якщо знімка немає.
+        """
+        if os.path.exists(manifest_path(filename)):
+            snapshot = open_shards(filename, self.shard_workers, self.status_stream)
+            self.shards = self.shards or len(snapshot.shards)
+            return snapshot
+        return open_snapshot(filename)
+
+    def _write_snapshot(self, filename, data):
+        """
+        Атомарно записує знімок в один файл або, якщо шарди ввімкнено, у файли-шарди.
+
+        Після першого запису шардів старий файл знімка видаляється, бо маніфест
+        має перевагу над ним при завантаженні.
+
+        :param filename: Ім'я файлу знімка.
+        :param data: Словник контактів для збереження.
+        """
+        if not self.shards:
+            write_snapshot(filename, data)
+            return
+        write_shards(filename, data, self.shards, self.shard_workers)
+        if os.path.exists(filename):
+            os.remove(filename)
+
+    def start_autosave(self, interval=5.0):
+        """
+        Запускає фонове збереження змінених контактів у журнал.
+
+        :param interval: Інтервал між збереженнями в секундах.
+        """
+        self.stop_autosave()
+        self.autosaver = Autosaver(self, interval)
+        self.autosaver.start()
+
+    def stop_autosave(self):
+        """Зупиняє фонове збереження; незбережені зміни лишаються позначеними."""
+        if self.autosaver is not None:
+            self.autosaver.stop()
+            self.autosaver = None
+
+    @measured
+    def write_changes(self):
+        """
+        Дописує в журнал контакти, змінені після попереднього збереження, і
+        атомарно перезаписує знімок, коли журнал надто виріс.
+
+        Блокування книги тримається лише на час збору змінених контактів і
+        фіксації версії для знімка; серіалізація, запис і fsync виконуються
+        без нього, тому метод можна викликати з фонового потоку. Новий знімок
+        підключається замість старого на початку наступної команди.
+
+        :return: Кількість записаних у журнал змін.
+        """
+        if self.journal is None:
+            return 0
+        with self._save_lock:
+            with self.lock:
+                changes = [(name, self.data.get(name)) for name in self.take_dirty()]
+                version = None
+                if (isinstance(self.data, VersionedRecords)
+                        and self.journal.entries + len(changes) > max(self.compaction_threshold, len(self.data))):
+                    version = self.data.current
+            try:
+                for name, record in changes:
+                    if record is None:
+                        self.journal.append(DELETE, name)
+                    else:
+                        self.journal.append(PUT, name, record)
+                self.journal.flush()
+            except BaseException:
+                # Незаписані зміни знову позначаються, щоб їх записало наступне збереження.
+                with self.lock:
+                    self.dirty = {**dict.fromkeys(name for name, _ in changes), **self.dirty}
+                raise
+            if version is not None:
+                self._write_snapshot(self.snapshot_file, RecordsSnapshot(version))
+                self.journal.truncate()
+                with self.lock:
+                    self._compacted = version
+        return len(changes)
+
+    @measured
+    def compact(self):
+        """
+        Згортає журнал у новий знімок: атомарно перезаписує файл знімка і очищає журнал.
+        """
+        if self.journal is None:
+            return
+        with self._save_lock, self.lock:
+            self.take_dirty()
+            version = self.data.current if isinstance(self.data, VersionedRecords) else None
+            self._write_snapshot(self.snapshot_file, self.data)
+            self.journal.truncate()
+            self._compacted = None
+            self._reopen_snapshot(version)
+
+    def _reopen_snapshot(self, version=None):
+        """
+        Після перезапису знімка відображає новий файл у пам'ять замість
+        накопичених у пам'яті змін. Якщо знімок записано з версії version,
+        пізніші зміни переносяться поверх нього, а історія версій і знімки
+        перевиражаються через новий файл.
+
+        Попередній файл явно не закривається: його ще можуть читати знімки,
+        які перебирають потокові 'show all' чи 'export', тож відображення
+        звільняється, коли зникає останнє посилання на нього.
+
+        :param version: Версія, з якої записано знімок; без неї історія починається заново.
+        """
+        snapshot = self._open_snapshot(self.snapshot_file)
+        if version is not None and isinstance(self.data, VersionedRecords):
+            self.rebase_versions(snapshot, version)
+        else:
+            self.data = snapshot
+            self.enable_versions()
+
+    @measured
+    def open_database(self, filename, migrate_from=None):
+        """
+        Підключає книгу до бази даних SQLite замість знімка з журналом.
+
+        Пошук, найближчі дні народження і пошук власника телефону виконуються
+        запитами до бази. Історія версій (undo, redo, snapshot) для бази
+        недоступна. Якщо база порожня, а файл migrate_from існує, контакти
+        спочатку переносяться зі знімка.
+
+        :param filename: Ім'я файлу бази даних.
+        :param migrate_from: Ім'я файлу знімка для перенесення контактів у нову базу.
+        """
+        database = SQLiteRecords(filename)
+        if not len(database) and migrate_from is not None:
+            try:
+                snapshot = self._open_snapshot(migrate_from)
+            except FileNotFoundError:
+                snapshot = None
+            if snapshot is not None:
+                for name, record in snapshot.items():
+                    database[name] = record
+                database.commit()
+                if isinstance(snapshot, (MappedRecords, ShardedRecords)):
+                    snapshot.close()
+                print(f"Migrated {len(database)} records from {migrate_from}", file=self.status_stream)
+        self.close()
+        self.data = database
+        self.disable_versions()
+        self.reset_indexes()
+        print(f"Database opened. Number of records: {len(self.data)}", file=self.status_stream)
+
+    def close(self):
+        """Скидає на диск журнал або зміни бази даних і звільняє ресурси сховища."""
+        self.stop_autosave()
+        self.disable_parallel()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if isinstance(self.data, (MappedRecords, SQLiteRecords, VersionedRecords)):
+            self.data.close()
 
     @input_error
     def add_contact(self, *args):
@@ -88,20 +361,21 @@ class AddressBookWithFileOps(AddressBook):
 
         name, phone, birthday = args[0], args[1], args[2] if len(args) == 3 else None
 
-        existing_contact = self.find(name)
+        existing_contact = self.edit(name)
 
         if existing_contact:
             if isinstance(existing_contact, Record):
                 if birthday and not is_valid_date(birthday, '%d-%m-%Y'):
                     raise ValueError("Invalid value format for 'birthday'. Use the format: DD-MM-YYYY")
 
-                existing_contact.birthday.value = birthday
+                if birthday:
+                    existing_contact.birthday = Birthday(birthday)
                 existing_contact.add_phone(phone)
-                return f"Birthday added to contact {name}. New phone: {existing_contact.phones[-1].value}"
+                return f"Birthday added to contact {name}. New phone: {existing_contact.phone_numbers[-1]}"
             else:
                 raise ValueError("Invalid contact type")
         else:
-            new_contact = Record(name, Birthday(birthday))
+            new_contact = Record(name, birthday)
             new_contact.add_phone(phone)
             self.add_record(new_contact)
             return f"Contact {name} added with phone {phone}" + (f" and birthday {birthday}" if birthday else "")
@@ -120,15 +394,15 @@ class AddressBookWithFileOps(AddressBook):
         name, phone, *birthday = args
         birthday = birthday[0] if birthday else None
 
-        if name in self.data:
-            existing_contact = self.data[name]
+        existing_contact = self.edit(name)
+        if existing_contact is not None:
+            if birthday is not None and not is_valid_date(birthday, '%d-%m-%Y'):
+                raise ValueError("Invalid value format for 'birthday'. Use the format: DD-MM-YYYY")
             if phone:
-                existing_contact.phones = [Phone(phone)]
+                existing_contact.phones = [phone]
             if birthday is not None:
-                if not is_valid_date(birthday, '%d-%m-%Y'):
-                    raise ValueError("Invalid value format for 'birthday'. Use the format: DD-MM-YYYY")
                 existing_contact.birthday = Birthday(birthday)
-            return f"Contact {existing_contact.name.value} changed. New phone: {existing_contact.phones[-1].value}, New birthday: {existing_contact.birthday.value}" if phone or birthday else "No changes made"
+            return f"Contact {existing_contact.name.value} changed. New phone: {existing_contact.phone_numbers[-1]}, New birthday: {existing_contact.birthday}" if phone or birthday else "No changes made"
         else:
             raise KeyError(f"Contact {name} not found")
 
@@ -147,7 +421,7 @@ class AddressBookWithFileOps(AddressBook):
         if name in self.data:
             contact = self.data[name]
             if isinstance(contact, Record):
-                phones_str = '; '.join(str(phone.value) for phone in contact.phones)
+                phones_str = '; '.join(contact.phone_numbers)
                 return f"Phone number for {contact.name.value}: {phones_str}"
             else:
                 raise ValueError("Invalid contact type")
@@ -157,49 +431,273 @@ class AddressBookWithFileOps(AddressBook):
     @input_error
     def show_all(self, today=None):
         """
-        Виводить усі контакти з адресної книги у вигляді рядка.
+        Виводить усі контакти з адресної книги.
 
         :param today: Поточна дата.
-        :return: Рядок з відформатованими контактами.
+        :return: Генератор відформатованих рядків або повідомлення про відсутність контактів.
         """
         if not self.data:
             return "No contacts found"
 
-        result = ""
-        for contact in self.data.values():
-            phones_str = '; '.join(str(phone['value']) for phone in contact.phones)
-            birthday_str = f", Birthday - {contact.birthday.value}" if contact.birthday else ""
-            days_until_birthday = contact.days_to_birthday(today) if contact.birthday else ""
+        if self.parallel is not None and self.parallel.should_run(self):
+            return self.parallel.render(self, today or date.today())
+        return self.iter_lines(self.snapshot().values(), today)
 
-            result += f"{contact.name.value}: Phone - {phones_str}{birthday_str}. Days until birthday: {days_until_birthday} days\n"
+    @input_error
+    def show_page(self, *args):
+        """
+        Виводить одну сторінку контактів.
 
-        return result
+        :param args: Аргументи команди 'show page': [номер сторінки] [розмір сторінки].
+        :return: Рядок з відформатованими контактами сторінки або повідомлення про помилку.
+        """
+        if len(args) < 1 or len(args) > 2:
+            raise ValueError("Invalid number of arguments for 'show page' command. Usage: show page [number] [size]")
 
+        number = int(args[0])
+        size = int(args[1]) if len(args) == 2 else 10
+        if number < 1 or size < 1:
+            raise ValueError("Page number and size must be positive")
+        contacts = self.page(number, size)
+        if not contacts:
+            return f"Page {number} is empty"
+        return self.format_contacts(contacts)
 
     @input_error
     def search_contacts(self, search_term):
         """
         Шукає контакти за вказаним терміном.
 
+        Термін з 'поле:шаблон' (name, phone, born) виконується як структурований
+        запит, наприклад 'search name:^iv phone:067* born:03'.
+
         :param search_term: Термін для пошуку.
         :return: Рядок з відформатованими контактами або повідомлення про їх відсутність.
         """
-        matching_contacts = []
-        for name, contact in self.data.items():
-            phone_value = str(contact.phones[0]['value']) if contact.phones else ""
-            birthday_value = str(contact.birthday) if contact.birthday else ""
-
-            if (
-                search_term.lower() in name.lower() or
-                any(search_term.lower() in field_value.lower() for field_value in [phone_value, birthday_value])
-            ):
-                matching_contacts.append(contact)
+        if ":" in search_term:
+            matching_contacts = self.query(search_term)
+        elif self.parallel is not None and self.parallel.should_run(self):
+            matching_contacts = self.parallel.search(self, search_term)
+        else:
+            matching_contacts = self.search(search_term)
 
         if matching_contacts:
             return self.format_contacts(matching_contacts)
         else:
             return "No matching contacts found"
 
+    @input_error
+    def upcoming(self, *args):
+        """
+        Виводить контакти, день народження яких настає протягом найближчих днів.
+
+        :param args: Аргументи команди 'upcoming': [days] (за замовчуванням 7).
+        :return: Рядок з відформатованими контактами або повідомлення про їх відсутність.
+        """
+        if len(args) > 1:
+            raise ValueError("Invalid number of arguments for 'upcoming' command. Usage: upcoming [days]")
+
+        days = int(args[0]) if args else 7
+        if days < 0:
+            raise ValueError("Number of days must not be negative")
+        today = date.today()
+        contacts = self.upcoming_birthdays(days, today)
+        if contacts:
+            return self.format_contacts(contacts, today)
+        return f"No birthdays in the next {days} days"
+
+    @input_error
+    def whois(self, *args):
+        """
+        Шукає власників номера телефону.
+
+        :param args: Аргументи команди 'whois': [phone].
+        :return: Рядок з відформатованими контактами або повідомлення про їх відсутність.
+        """
+        if len(args) != 1:
+            raise ValueError("Invalid number of arguments for 'whois' command. Usage: whois [phone]")
+
+        contacts = self.phone_owners(args[0])
+        if contacts:
+            return self.format_contacts(contacts)
+        return f"No contacts with phone {args[0]}"
+
+    @input_error
+    def fuzzy(self, *args):
+        """
+        Шукає контакти за іменем з урахуванням можливих помилок.
+
+        :param args: Аргументи команди 'fuzzy': [term] [maxdist] (за замовчуванням 2).
+        :return: Рядок з відформатованими контактами, найближчі першими, або повідомлення про їх відсутність.
+        """
+        if len(args) not in (1, 2):
+            raise ValueError("Invalid number of arguments for 'fuzzy' command. Usage: fuzzy [term] [maxdist]")
+
+        max_distance = None
+        if len(args) == 2:
+            if not args[1].isdigit():
+                raise ValueError(f"Invalid maximum distance: {args[1]}")
+            max_distance = int(args[1])
+
+        matches = self.fuzzy_search(args[0], max_distance)
+        if matches:
+            return self.format_contacts([record for _, record in matches])
+        return "No matching contacts found"
+
+    @input_error
+    def explain_query(self, *args):
+        """
+        Показує план структурованого запиту пошуку і кількість кандидатів.
+
+        :param args: Аргументи команди 'explain': запит, як для 'search'.
+        :return: Опис плану.
+        """
+        if not args:
+            raise ValueError("Invalid number of arguments for 'explain' command. Usage: explain [query]")
+        return self.explain(" ".join(args))
+
+    @input_error
+    def dedupe(self, *args):
+        """
+        Шукає ймовірні дублікати контактів і за потреби об'єднує їх.
+
+        :param args: Аргументи команди 'dedupe': [merge] [threshold] (поріг від 0 до 1, за замовчуванням 0.6).
+        :return: Список груп дублікатів з оцінками і результат об'єднання.
+        """
+        merge = bool(args) and args[0] == "merge"
+        if merge:
+            args = args[1:]
+        if len(args) > 1:
+            raise ValueError("Invalid number of arguments for 'dedupe' command. Usage: dedupe [merge] [threshold]")
+
+        threshold = DEFAULT_THRESHOLD
+        if args:
+            try:
+                threshold = float(args[0])
+            except ValueError:
+                raise ValueError(f"Invalid threshold: {args[0]}") from None
+
+        clusters, compared = self.find_duplicates(threshold)
+        if not clusters:
+            return f"No duplicates found ({compared} pairs compared)"
+        lines = [f"Found {len(clusters)} duplicate clusters ({compared} pairs compared):"]
+        for number, cluster in enumerate(clusters, 1):
+            lines.append(f"Cluster {number}, score {cluster.score:.2f}:")
+            lines.extend("  " + self.data[name].get_info() for name in cluster.names)
+        if merge:
+            removed = self.merge_duplicates(clusters)
+            lines.append(f"Merged {len(clusters)} clusters, removed {removed} contacts")
+        return "\n".join(lines)
+
+    @input_error
+    def import_contacts(self, *args):
+        """
+        Імпортує контакти з файлу CSV (name,phones,birthday) або JSON Lines.
+
+        :param args: Аргументи команди 'import': [file].
+        :return: Підсумок імпорту з кількістю доданих, об'єднаних і пропущених рядків.
+        """
+        if len(args) != 1:
+            raise ValueError("Invalid number of arguments for 'import' command. Usage: import [file]")
+
+        from bulk_io import BulkValidator, read_chunks
+
+        validator = BulkValidator()
+        added = merged = 0
+        try:
+            for chunk in read_chunks(args[0]):
+                chunk_added, chunk_merged = self.add_records(validator.records(chunk))
+                added += chunk_added
+                merged += chunk_merged
+        except FileNotFoundError:
+            raise KeyError(f"File {args[0]} not found")
+        except OSError as e:
+            raise ValueError(f"Cannot read {args[0]}: {e.strerror}")
+
+        report = f"Imported {added} new contacts, merged {merged}, skipped {len(validator.errors)} invalid rows"
+        return "\n".join([report] + validator.errors[:10])
+
+    @input_error
+    def export_contacts(self, *args):
+        """
+        Експортує всі контакти у файл CSV або JSON Lines.
+
+        :param args: Аргументи команди 'export': [file].
+        :return: Повідомлення з кількістю експортованих контактів.
+        """
+        if len(args) != 1:
+            raise ValueError("Invalid number of arguments for 'export' command. Usage: export [file]")
+
+        from bulk_io import export_records
+
+        try:
+            count = export_records(self.snapshot().values(), args[0])
+        except OSError as e:
+            raise ValueError(f"Cannot write {args[0]}: {e.strerror}")
+        return f"Exported {count} contacts to {args[0]}"
+
+    @input_error
+    def stats(self, *args):
+        """
+        Виводить зібрані метрики команд і операцій з файлами або зведення по книзі.
+
+        :param args: Аргументи команди 'stats': [book].
+        :return: Таблиця метрик, повідомлення, що збір вимкнено, або зведення по книзі.
+        """
+        if args and args[0] == "book":
+            if not self.data:
+                return "No contacts found"
+            return self.columns.report()
+        return METRICS.report()
+
+    @input_error
+    def undo_command(self, *args):
+        """
+        Скасовує останню команду, що змінила книгу.
+
+        :param args: Додаткові аргументи (ігноруються).
+        :return: Повідомлення з кількістю змінених контактів.
+        """
+        return f"Undone. Contacts changed: {self.undo()}"
+
+    @input_error
+    def redo_command(self, *args):
+        """
+        Повторює скасовану команду.
+
+        :param args: Додаткові аргументи (ігноруються).
+        :return: Повідомлення з кількістю змінених контактів.
+        """
+        return f"Redone. Contacts changed: {self.redo()}"
+
+    @input_error
+    def snapshot_command(self, *args):
+        """
+        Зберігає поточний стан книги під назвою або виводить назви збережених знімків.
+
+        :param args: Аргументи команди 'snapshot': [tag].
+        :return: Повідомлення про збереження або список знімків.
+        """
+        if len(args) > 1:
+            raise ValueError("Invalid number of arguments for 'snapshot' command. Usage: snapshot [tag]")
+        if not args:
+            self._require_versions()
+            return "Snapshots: " + ", ".join(self.tags) if self.tags else "No snapshots saved"
+        self.tag_version(args[0])
+        return f"Snapshot {args[0]} saved. Number of records: {len(self.data)}"
+
+    @input_error
+    def restore_command(self, *args):
+        """
+        Повертає книгу до збереженого знімка (це можна скасувати командою 'undo').
+
+        :param args: Аргументи команди 'restore': [tag].
+        :return: Повідомлення з кількістю змінених контактів.
+        """
+        if len(args) != 1:
+            raise ValueError("Invalid number of arguments for 'restore' command. Usage: restore [tag]")
+        return f"Snapshot {args[0]} restored. Contacts changed: {self.restore_version(args[0])}"
+
     @input_error
     def hello(self, *args):
         """
@@ -210,71 +708,336 @@ class AddressBookWithFileOps(AddressBook):
         """
         return "How can I help you?"
 
+    def execute(self, raw_input):
+        """
+        Виконує один рядок команди консолі.
+
+        Зміни, зроблені командою, закріплюються як одна версія книги, яку
+        можна скасувати командою 'undo'.
+
+        :param raw_input: Рядок команди без символу нового рядка.
+        :return: Рядок або ітерований набір рядків з результатом команди.
+        """
+        with self.lock:
+            if self._compacted is not None:
+                self._reopen_snapshot(self._compacted)
+                self._compacted = None
+            result = self._dispatch(raw_input)
+            self.commit_version()
+        return result
+
+    def _dispatch(self, raw_input):
+        """Викликає обробник команди."""
+        user_input = raw_input.strip().lower()
+
+        if not user_input:
+            return "No command entered"
+        if user_input == "hello":
+            return self.hello()
+        if user_input.startswith("search"):
+            return self.search_contacts(user_input[len("search"):].strip())
+
+        command, *args = user_input.split()
+        if command == "show" and args and args[0] == "all":
+            return self.show_all()
+        if command == "show" and args and args[0] == "page":
+            return self.show_page(*args[1:])
+        if command in {"import", "export", "snapshot", "restore"}:
+            return self.table[command](*raw_input.split()[1:])
+        if command in self.table:
+            return self.table[command](*args)
+        return "No such command"
+
     @input_error
     def run_interactive_console(self):
         """
         Запускає інтерактивну консоль для взаємодії з користувачем.
         """
         while True:
-            user_input = input(">>> ").strip().lower()
-
-            if not user_input:
-                print("No command entered")
-                continue
+            try:
+                raw_input = input(">>> ").strip()
+            except EOFError:
+                raw_input = "exit"
 
-            if user_input in {"good bye", "close", "exit"}:
-                self.save_to_file("address_book_data.pkl")
+            if raw_input.lower() in EXIT_COMMANDS:
                 print("Good bye!")
                 break
-            elif user_input == "hello":
-                print(self.hello())
-            elif user_input.startswith("search"):
-                search_term = user_input[len("search"):].strip()
-                matching_contacts = self.search_contacts(search_term)
-                print(matching_contacts)
-            else:
-                command, *args = user_input.split()
+            self._print_result(self.execute(raw_input))
+
+    def run_batch(self, lines, output=None, timings=None):
+        """
+        Виконує команди зі скрипту без запрошення і з буферизованим виведенням.
 
-                if command == "show" and args and args[0] == "all":
-                    print(self.show_all())
-                elif command in {"add", "change", "get", "show all", "search", "hello"}:
-                    print(self.table.get(command, lambda *args: "Invalid command")(*args))
+        Порожні рядки та рядки, що починаються з '#', пропускаються; команда
+        виходу завершує скрипт.
+
+        :param lines: Ітерований набір рядків команд (файл або sys.stdin).
+        :param output: Потік для результатів (за замовчуванням sys.stdout).
+        :param timings: Словник, у який для кожної команди додаються тривалості виконання в секундах.
+        :return: Кількість виконаних команд.
+        """
+        executed = 0
+
+        def results():
+            nonlocal executed
+            for line in lines:
+                raw_input = line.strip()
+                if not raw_input or raw_input.startswith("#"):
+                    continue
+                if raw_input.lower() in EXIT_COMMANDS:
+                    break
+                start = time.perf_counter()
+                result = self.execute(raw_input)
+                if isinstance(result, str):
+                    yield result + "\n"
                 else:
-                    print("No such command")
+                    yield from result
+                executed += 1
+                if timings is not None:
+                    timings[_command_name(raw_input)].append(time.perf_counter() - start)
+
+        write_lines(results(), output, chunk_size=1024 * 1024)
+        return executed
+
+    @staticmethod
+    def _print_result(result):
+        """
+        Виводить результат команди: рядок одразу, а генератор рядків — буферизованими блоками.
 
+        :param result: Рядок або ітерований набір рядків.
+        """
+        if isinstance(result, str):
+            print(result)
+        else:
+            write_lines(result)
+
+    @measured
     def load_from_file(self, filename):
         """
-        Завантажує дані з файлу у форматі pickle та оновлює об'єкт AddressBookWithFileOps.
+        Відкриває знімок, відтворює поверх нього журнал змін і підключає журнал
+        для подальших змін. Знімок відображається у пам'ять, тому контакти
+        розпаковуються лише при зверненні до них. Якщо поруч зі знімком є
+        маніфест шардів ('.shards'), відкриваються шарди; якщо шарди ввімкнено,
+        а знімок записано інакше, він одразу переписується у шарди. Старий
+        знімок у вигляді pickle-словника одразу переписується у формат
+        MappedRecords, щоб наступні запуски не розпаковували всю книгу.
 
-        :param filename: Ім'я файлу для завантаження даних.
+        :param filename: Ім'я файлу знімка. Журнал зберігається поруч з суфіксом '.journal'.
         """
+        legacy = False
         try:
-            with open(filename, 'rb') as file:
-                loaded_data = pickle.load(file)
-                self.data = loaded_data
-                print(f"Data loaded successfully. Number of records: {len(self.data)}")
+            self.data = self._open_snapshot(filename)
+            legacy = not isinstance(self.data, (MappedRecords, ShardedRecords))
         except FileNotFoundError:
-            print(f"File {filename} not found. A new AddressBook object is created.")
+            print(f"File {filename} not found. A new AddressBook object is created.", file=self.status_stream)
         except pickle.UnpicklingError as e:
-            print(f"Error loading data from file: {e}")
+            print(f"Error loading data from file: {e}", file=self.status_stream)
+            return
+
+        if isinstance(self.data, ShardedRecords):
+            # Шарди доступні лише для читання: зміни з журналу лягають у версії поверх них.
+            self.data = VersionedRecords(self.data)
+        journal = Journal(f"{filename}.journal")
+        for op, name, record in journal.replay(self.status_stream):
+            if op == PUT:
+                self.data[name] = record
+            else:
+                self.data.pop(name, None)
+        self.enable_versions()
+        self.reset_indexes()
+        self.take_dirty()
+        self.journal = journal
+        self.snapshot_file = filename
+        print(f"Data loaded successfully. Number of records: {len(self.data)}", file=self.status_stream)
+        if journal.entries:
+            print(f"Replayed {journal.entries} journal entries", file=self.status_stream)
+        base = self.data.base
+        if self.shards and self.data and (not isinstance(base, ShardedRecords) or len(base.shards) != self.shards):
+            self.compact()
+            print(f"Snapshot split into {self.shards} shards", file=self.status_stream)
+        elif legacy:
+            self.compact()
+            print(f"Snapshot {filename} converted to the memory-mapped format", file=self.status_stream)
+
+    def load_single(self, name, filename, database=False):
+        """
+        Відкриває книгу лише для читання одного контакту.
+
+        Зі знімка у форматі MappedRecords ім'я шукається бінарним пошуком у
+        відображеній у пам'ять таблиці імен, а в журналі — лише записи з цим
+        ім'ям, тому час не залежить від розміру книги. Журнал не
+        підключається, тож таку книгу не можна зберігати.
 
+        :param name: Ім'я контакту.
+        :param filename: Ім'я файлу знімка або бази даних SQLite.
+        :param database: Чи є filename базою даних SQLite.
+        """
+        if database:
+            self.data = SQLiteRecords(filename)
+            self.disable_versions()
+            return
+        try:
+            if os.path.exists(manifest_path(filename)):
+                snapshot = open_shard_of(filename, name)
+            else:
+                snapshot = open_snapshot(filename)
+        except FileNotFoundError:
+            snapshot = {}
+        record = snapshot.get(name)
+        if isinstance(snapshot, MappedRecords):
+            snapshot.close()
+        change = Journal(f"{filename}.journal").lookup(name)
+        if change is not None:
+            record = change[1] if change[0] == PUT else None
+        self.data = {} if record is None else {name: record}
+        self.enable_versions()
+        self.reset_indexes()
+
+    @measured
     def save_to_file(self, filename):
         """
-        Зберігає дані у файл у форматі pickle.
+        Зберігає дані. Якщо книга працює з базою SQLite, фіксуються зміни бази;
+        якщо файл є знімком із підключеним журналом, у журнал дописуються лише
+        змінені контакти; інакше файл повністю перезаписується. Якщо з
+        попереднього збереження нічого не змінилось, запис пропускається.
 
         :param filename: Ім'я файлу для збереження даних.
         """
-        with open(filename, 'wb') as file:
-            pickle.dump(self.data, file)
-            print(f"Data saved successfully. Number of records: {len(self.data)}")
+        if isinstance(self.data, SQLiteRecords):
+            if not self.take_dirty():
+                print("No changes to save", file=self.status_stream)
+                return
+            self.data.commit()
+        elif self.journal is not None and filename == self.snapshot_file:
+            if not self.write_changes():
+                print("No changes to save", file=self.status_stream)
+                return
+        else:
+            self._write_snapshot(filename, self.data)
+        print(f"Data saved successfully. Number of records: {len(self.data)}", file=self.status_stream)
+
+
+def _command_name(raw_input):
+    """Повертає назву команди для статистики: перше слово або 'show all'/'show page'."""
+    words = raw_input.lower().split()
+    if words[0] == "show" and len(words) > 1:
+        return " ".join(words[:2])
+    return words[0]
+
+
+def format_timings(timings, elapsed):
+    """
+    Форматує звіт про тривалість виконання команд пакетного режиму.
+
+    :param timings: Словник {команда: список тривалостей у секундах}.
+    :param elapsed: Загальний час виконання скрипту в секундах.
+    :return: Рядок звіту.
+    """
+    total = sum(len(values) for values in timings.values())
+    lines = [f"{'command':<12} {'count':>8} {'mean ms':>10} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}"]
+    for command, values in sorted(timings.items()):
+        values = sorted(values)
+        p50 = values[len(values) // 2]
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        lines.append(f"{command:<12} {len(values):>8} {sum(values) / len(values) * 1000:>10.3f} "
+                     f"{p50 * 1000:>10.3f} {p99 * 1000:>10.3f} {values[-1] * 1000:>10.3f}")
+    throughput = total / elapsed if elapsed else 0
+    lines.append(f"{total} commands in {elapsed:.3f} s ({throughput:.0f} commands/s)")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """
+    Розбирає аргументи командного рядка.
+
+    :param argv: Список аргументів (за замовчуванням sys.argv[1:]).
+    :return: Простір імен з налаштуваннями запуску.
+    """
+    parser = argparse.ArgumentParser(description="Address book console")
+    parser.add_argument("command", nargs="*",
+                        help="run a single command and exit, e.g. 'get Alice'; "
+                             "'get' reads only the requested contact")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="run search and 'show all' in a pool of N processes")
+    parser.add_argument("--parallel-threshold", type=int, default=50000,
+                        help="minimum number of contacts for parallel execution")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="run commands from FILE (or stdin) without prompts and save once at the end")
+    parser.add_argument("--timings", action="store_true",
+                        help="in batch mode, report per-command latency and throughput to stderr")
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8765", metavar="ADDRESS",
+                        help="serve commands to concurrent clients on HOST:PORT or a Unix socket path")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="collect per-command metrics and dump them at exit: "
+                             "JSON for FILE.json, cProfile statistics for FILE.prof")
+    parser.add_argument("--trace-allocations", action="store_true",
+                        help="with --metrics, also count memory allocated by each command via tracemalloc")
+    parser.add_argument("--autosave", type=float, default=5.0, metavar="SECONDS",
+                        help="save changed contacts in the background every SECONDS (0 disables autosave)")
+    parser.add_argument("--shards", type=int, default=0, metavar="N",
+                        help="save the snapshot as N files partitioned by name hash, "
+                             "written and verified in parallel")
+    parser.add_argument("--db", metavar="PATH",
+                        help="store contacts in the SQLite database PATH instead of the pickle snapshot")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
+    options = parse_args()
+    profiler = None
+    if options.metrics:
+        METRICS.enable(options.trace_allocations)
+        if options.metrics.endswith(".prof"):
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
     book = AddressBookWithFileOps()
-    book.load_from_file("address_book_data.pkl")
-    today = datetime.now().date()
-    book.run_interactive_console()
-    book.save_to_file("address_book_data.pkl")
-    search_result = book.search_contacts("r")
-    for contact in search_result:
-        print(book.get_info(contact.name.value))
+    one_shot = " ".join(options.command)
+    read_only = len(options.command) == 2 and options.command[0].lower() == "get"
+    if options.batch or options.serve or one_shot:
+        book.status_stream = sys.stderr
+    if options.shards:
+        book.enable_shards(options.shards, options.workers or None)
+    if read_only:
+        book.load_single(options.command[1].lower(), options.db or "address_book_data.pkl", bool(options.db))
+    elif options.db:
+        book.open_database(options.db, migrate_from="address_book_data.pkl")
+    else:
+        book.load_from_file("address_book_data.pkl")
+    if options.workers > 1:
+        book.enable_parallel(options.workers, options.parallel_threshold)
+    if options.autosave > 0 and book.journal is not None and not one_shot:
+        book.start_autosave(options.autosave)
+    # Книга зберігається і тоді, коли команда завершилась непередбаченим
+    # винятком: інакше всі зміни сесії були б втрачені.
+    try:
+        if one_shot:
+            book._print_result(book.execute(one_shot))
+        elif options.serve:
+            import asyncio
+            from server import serve
+
+            asyncio.run(serve(book, options.serve, EXIT_COMMANDS, sys.stderr))
+        elif options.batch:
+            timings = defaultdict(list) if options.timings else None
+            start = time.perf_counter()
+            if options.batch == "-":
+                book.run_batch(sys.stdin, timings=timings)
+            else:
+                with open(options.batch, encoding="utf-8") as script:
+                    book.run_batch(script, timings=timings)
+            if timings is not None:
+                print(format_timings(timings, time.perf_counter() - start), file=sys.stderr)
+        else:
+            book.run_interactive_console()
+    finally:
+        book.stop_autosave()
+        if not read_only:
+            book.save_to_file("address_book_data.pkl")
+        book.close()
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(options.metrics)
+    elif options.metrics:
+        METRICS.dump_json(options.metrics)
@@ -0,0 +1,198 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+
+HISTOGRAM_BUCKETS = 32
+
+
+class CommandStats:
+    """
+    Статистика викликів однієї команди.
+
+    Затримки зберігаються в логарифмічній гістограмі: кошик i містить виклики
+    тривалістю від 2**(i - 1) до 2**i мікросекунд, тому пам'ять не залежить
+    від кількості викликів.
+    """
+    __slots__ = ('calls', 'errors', 'total', 'max', 'histogram', 'allocated')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+        self.allocated = 0
+
+    def add(self, seconds, allocated=0, error=False):
+        microseconds = int(seconds * 1_000_000)
+        self.calls += 1
+        self.errors += error
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.histogram[min(microseconds.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        self.allocated += allocated
+
+    def percentile(self, fraction):
+        """
+        Оцінює перцентиль затримки за гістограмою.
+
+        :param fraction: Частка від 0 до 1 (наприклад, 0.99).
+        :return: Верхня межа кошика в секундах.
+        """
+        rank = max(1, round(self.calls * fraction))
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank:
+                return min(2 ** bucket / 1_000_000, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.calls * 1000 if self.calls else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+            "allocated_bytes": self.allocated,
+            "histogram_us": {f"<{2 ** bucket}": count for bucket, count in enumerate(self.histogram) if count},
+        }
+
+
+class Metrics:
+    """
+    Необов'язковий збір метрик команд консолі та операцій з файлами.
+
+    Поки збір вимкнено, measure() лише перевіряє прапорець, тому
+    інструментування майже нічого не коштує. Облік пам'яті через tracemalloc
+    вмикається окремо, бо помітно сповільнює виконання; для кожного виклику
+    рахується приріст відстежуваної пам'яті.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.trace_allocations = False
+        self.stats = {}
+
+    def enable(self, trace_allocations=False):
+        """
+        Вмикає збір метрик.
+
+        :param trace_allocations: Чи рахувати виділену пам'ять через tracemalloc.
+        """
+        self.enabled = True
+        self.trace_allocations = trace_allocations
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        """Вимикає збір метрик і зупиняє tracemalloc."""
+        self.enabled = False
+        if self.trace_allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_allocations = False
+
+    def record(self, name, seconds, allocated=0, error=False):
+        """
+        Додає один вимір.
+
+        :param name: Назва команди або операції.
+        :param seconds: Тривалість у секундах.
+        :param allocated: Приріст пам'яті в байтах.
+        :param error: Чи завершилась команда помилкою.
+        """
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = CommandStats()
+        stats.add(seconds, allocated, error)
+
+    @contextmanager
+    def measure(self, name):
+        """
+        Вимірює тривалість і приріст пам'яті блоку коду.
+
+        :param name: Назва команди або операції.
+        """
+        if not self.enabled:
+            yield
+            return
+        tracing = self.trace_allocations and tracemalloc.is_tracing()
+        memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start = time.perf_counter()
+        error = True
+        try:
+            yield
+            error = False
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[0] - memory_before if tracing else 0
+            self.record(name, elapsed, max(allocated, 0), error)
+
+    def measure_iter(self, name, lines):
+        """
+        Вимірює потоковий результат команди разом з часом його споживання.
+
+        :param name: Назва команди.
+        :param lines: Ітерований набір рядків.
+        :return: Генератор тих самих рядків.
+        """
+        with self.measure(name):
+            yield from lines
+
+    def as_dict(self):
+        """:return: Метрики у вигляді словника, придатного для JSON."""
+        return {name: stats.as_dict() for name, stats in sorted(self.stats.items())}
+
+    def report(self):
+        """
+        Форматує метрики у таблицю.
+
+        :return: Рядок звіту або повідомлення, що метрик немає.
+        """
+        if not self.enabled:
+            return "Metrics are disabled. Start with --metrics FILE to collect them"
+        if not self.stats:
+            return "No metrics collected yet"
+        lines = [f"{'command':<22} {'calls':>8} {'errors':>7} {'mean ms':>10} {'p50 ms':>10} "
+                 f"{'p99 ms':>10} {'max ms':>10} {'alloc KB':>10}"]
+        for name, stats in sorted(self.stats.items()):
+            values = stats.as_dict()
+            lines.append(f"{name:<22} {values['calls']:>8} {values['errors']:>7} {values['mean_ms']:>10.3f} "
+                         f"{values['p50_ms']:>10.3f} {values['p99_ms']:>10.3f} {values['max_ms']:>10.3f} "
+                         f"{values['allocated_bytes'] / 1024:>10.1f}")
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"traced memory: {current / 1024:.1f} KB, peak {peak / 1024:.1f} KB")
+        return "\n".join(lines)
+
+    def dump_json(self, filename):
+        """
+        Записує метрики у файл JSON.
+
+        :param filename: Ім'я файлу.
+        """
+        import json
+
+        with open(filename, 'w', encoding='utf-8') as file:
+            json.dump(self.as_dict(), file, indent=2)
+
+
+METRICS = Metrics()
+
+
+def measured(func):
+    """
+    Декоратор, що вимірює тривалість виклику функції, якщо збір метрик увімкнено.
+
+    :param func: Декорована функція; метрика називається її іменем.
+    :return: Обгортка з вимірюванням.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with METRICS.measure(func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+_records = None
+_names = None
+
+
+def _init_worker(records, names):
+    """Зберігає знімок контактів і порядок їхніх імен у робочому процесі."""
+    global _records, _names
+    _records = records
+    _names = names
+
+
+def _match_shard(start, stop, term):
+    """
+    Шукає підрядок у контактах шарда.
+
+    :return: Номери знайдених контактів у знімку.
+    """
+    return [number for number in range(start, stop)
+            if any(term in field.lower() for field in _records[_names[number]].search_fields())]
+
+
+def _render_shard(start, stop, today):
+    """
+    Форматує контакти шарда.
+
+    :return: Рядки шарда, об'єднані в один рядок.
+    """
+    return ''.join(_records[name].format_line(today) for name in _names[start:stop])
+
+
+def _context():
+    """Повертає контекст fork, якщо він доступний, щоб не серіалізувати знімок книги."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+class ParallelExecutor:
+    """
+    Паралельне виконання пошуку та форматування у пулі процесів.
+
+    Контакти книги діляться на послідовні шарди, які обробляються у робочих
+    процесах; результати збираються у порядку шардів, тобто в порядку додавання
+    контактів. Робочі процеси отримують незмінний знімок книги під час
+    створення пулу (на Linux — через fork, без серіалізації) і самі
+    розпаковують контакти своїх шардів; батьківський процес перебирає лише
+    імена. Пул прив'язаний до версії знімка і створюється заново лише тоді,
+    коли книга змінилась.
+
+    :param workers: Кількість робочих процесів (за замовчуванням os.cpu_count()).
+    :param threshold: Мінімальний розмір книги, з якого використовується пул.
+    """
+    def __init__(self, workers=None, threshold=50000):
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self._pool = None
+        self._pool_version = None
+        self._records = None
+        self._names = None
+
+    def should_run(self, book):
+        """
+        Перевіряє, чи варто обробляти книгу паралельно.
+
+        :param book: Адресна книга.
+        :return: True, якщо книга не менша за поріг і є більше одного процесу.
+        """
+        return self.workers > 1 and len(book.data) >= self.threshold
+
+    def _snapshot(self, book):
+        """
+        Повертає знімок контактів, їхні імена в порядку додавання і пул процесів,
+        актуальні для поточної версії книги.
+        """
+        # Версія VersionedRecords незмінна, тож пул лишається дійсним, поки вона поточна.
+        version = book.data.current if book.versions_enabled else book.version
+        if self._pool is None or self._pool_version != version:
+            self.close()
+            context = _context()
+            records = book.snapshot()
+            if not book.versions_enabled or context.get_start_method() != "fork":
+                # Сховище без версій змінюється на місці, а без fork знімок серіалізується.
+                records = dict(records.items())
+            self._records = records
+            self._names = list(records)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                             initializer=_init_worker, initargs=(records, self._names))
+            self._pool_version = version
+        return self._records, self._names, self._pool
+
+    def _shards(self, count):
+        size = max(1000, -(-count // (self.workers * 4)))
+        return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+    def search(self, book, search_term):
+        """
+        Шукає контакти, в імені, телефонах або даті народження яких є підрядок.
+
+        :param book: Адресна книга.
+        :param search_term: Термін для пошуку (без урахування регістру).
+        :return: Список знайдених контактів у порядку додавання.
+        """
+        records, names, pool = self._snapshot(book)
+        term = search_term.lower()
+        futures = [pool.submit(_match_shard, start, stop, term)
+                   for start, stop in self._shards(len(names))]
+        return [records[names[number]] for future in futures for number in future.result()]
+
+    def render(self, book, today):
+        """
+        Форматує всі контакти книги.
+
+        Одночасно в роботі тримається обмежена кількість шардів, тому результати
+        можна виводити, не чекаючи на всю книгу.
+
+        :param book: Адресна книга.
+        :param today: Поточна дата.
+        :return: Генератор рядків з відформатованими шардами у порядку додавання.
+        """
+        _, names, pool = self._snapshot(book)
+        shards = iter(self._shards(len(names)))
+        pending = deque()
+        for start, stop in shards:
+            pending.append(pool.submit(_render_shard, start, stop, today))
+            if len(pending) >= self.workers * 2:
+                break
+        while pending:
+            yield pending.popleft().result()
+            for start, stop in shards:
+                pending.append(pool.submit(_render_shard, start, stop, today))
+                break
+
+    def close(self):
+        """Зупиняє пул процесів."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._records = None
+            self._names = None
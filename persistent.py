@@ -0,0 +1,236 @@
+class _Node:
+    """
+    Вузол HAMT: бітова маска зайнятих позицій і кортеж елементів.
+
+    Елемент — це або дочірній вузол, або пара (ключ, значення).
+    """
+    __slots__ = ('bitmap', 'items')
+
+    def __init__(self, bitmap, items):
+        self.bitmap = bitmap
+        self.items = items
+
+
+class _Collision:
+    """Листок для ключів, хеші яких збігаються в усіх використаних бітах."""
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items
+
+
+HASH_BITS = 64
+_EMPTY_NODE = _Node(0, ())
+_MISSING = object()
+
+
+def _set(node, shift, key_hash, key, value):
+    """
+    Повертає копію шляху вузла з новим значенням ключа.
+
+    :return: Пара (новий вузол, True якщо ключ додано, а не замінено).
+    """
+    if isinstance(node, _Collision):
+        for i, (item_key, _) in enumerate(node.items):
+            if item_key == key:
+                return _Collision(node.items[:i] + ((key, value),) + node.items[i + 1:]), False
+        return _Collision(node.items + ((key, value),)), True
+
+    bit = 1 << ((key_hash >> shift) & 31)
+    index = (node.bitmap & (bit - 1)).bit_count()
+    items = node.items
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, items[:index] + ((key, value),) + items[index:]), True
+
+    item = items[index]
+    if isinstance(item, (_Node, _Collision)):
+        child, added = _set(item, shift + 5, key_hash, key, value)
+    elif item[0] == key:
+        if item[1] is value:
+            return node, False
+        child, added = (key, value), False
+    else:
+        child, added = _split(item, shift + 5, key_hash, key, value), True
+    return _Node(node.bitmap, items[:index] + (child,) + items[index + 1:]), added
+
+
+def _split(item, shift, key_hash, key, value):
+    """Створює піддерево для двох різних ключів, що потрапили в одну позицію."""
+    if shift >= HASH_BITS:
+        return _Collision((item, (key, value)))
+    node, _ = _set(_EMPTY_NODE, shift, hash(item[0]) & (2 ** HASH_BITS - 1), item[0], item[1])
+    node, _ = _set(node, shift, key_hash, key, value)
+    return node
+
+
+def _delete(node, shift, key_hash, key):
+    """
+    Повертає копію шляху вузла без ключа.
+
+    :return: Новий вузол (None, якщо вузол спорожнів) або той самий вузол, якщо ключа немає.
+    """
+    if isinstance(node, _Collision):
+        items = tuple(item for item in node.items if item[0] != key)
+        if len(items) == len(node.items):
+            return node
+        if len(items) > 1:
+            return _Collision(items)
+        return items[0] if items else None
+
+    bit = 1 << ((key_hash >> shift) & 31)
+    if not node.bitmap & bit:
+        return node
+    index = (node.bitmap & (bit - 1)).bit_count()
+    items = node.items
+    item = items[index]
+    if isinstance(item, (_Node, _Collision)):
+        child = _delete(item, shift + 5, key_hash, key)
+        if child is item:
+            return node
+        if isinstance(child, _Node) and len(child.items) == 1 \
+                and not isinstance(child.items[0], (_Node, _Collision)):
+            # Піддерево з одного ключа згортається назад у пару.
+            child = child.items[0]
+    elif item[0] == key:
+        child = None
+    else:
+        return node
+
+    if child is None:
+        if node.bitmap == bit:
+            return None
+        return _Node(node.bitmap & ~bit, items[:index] + items[index + 1:])
+    return _Node(node.bitmap, items[:index] + (child,) + items[index + 1:])
+
+
+def _iter_items(node):
+    for item in node.items:
+        if isinstance(item, (_Node, _Collision)):
+            yield from _iter_items(item)
+        else:
+            yield item
+
+
+def _diff(old, new, changed):
+    """Додає до changed ключі, значення яких відрізняються, пропускаючи спільні піддерева."""
+    if old is new:
+        return
+    if isinstance(old, _Node) and isinstance(new, _Node):
+        old_items = {}
+        bitmap = old.bitmap
+        for item in old.items:
+            position = (bitmap & -bitmap).bit_length()
+            old_items[position] = item
+            bitmap &= bitmap - 1
+        bitmap = new.bitmap
+        for item in new.items:
+            position = (bitmap & -bitmap).bit_length()
+            bitmap &= bitmap - 1
+            _diff_items(old_items.pop(position, None), item, changed)
+        for item in old_items.values():
+            _diff_items(item, None, changed)
+        return
+    _diff_items(old, new, changed)
+
+
+def _diff_items(old, new, changed):
+    if old is new:
+        return
+    if isinstance(old, _Node) and isinstance(new, _Node):
+        _diff(old, new, changed)
+        return
+    old_values = dict(_iter_items(old) if isinstance(old, (_Node, _Collision)) else [old] if old else [])
+    new_values = dict(_iter_items(new) if isinstance(new, (_Node, _Collision)) else [new] if new else [])
+    for key in old_values.keys() | new_values.keys():
+        if old_values.get(key, _MISSING) is not new_values.get(key, _MISSING):
+            changed.add(key)
+
+
+class PersistentMap:
+    """
+    Незмінний словник зі структурним спільним використанням (HAMT).
+
+    Операції set і delete повертають новий словник, копіюючи лише шлях від
+    кореня до зміненого ключа (O(log32 n) вузлів), тому старі версії
+    лишаються доступними майже без додаткової пам'яті. Порівняння версій
+    через changed_keys() пропускає спільні піддерева.
+    """
+    __slots__ = ('_root', '_count')
+
+    def __init__(self, root=_EMPTY_NODE, count=0):
+        self._root = root
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for key, _ in _iter_items(self._root):
+            yield key
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def items(self):
+        """:return: Генератор пар (ключ, значення) у порядку хешів."""
+        return _iter_items(self._root)
+
+    def get(self, key, default=None):
+        """
+        Повертає значення ключа.
+
+        :param key: Ключ.
+        :param default: Значення, якщо ключа немає.
+        """
+        key_hash = hash(key) & (2 ** HASH_BITS - 1)
+        node = self._root
+        shift = 0
+        while True:
+            if isinstance(node, _Collision):
+                for item_key, value in node.items:
+                    if item_key == key:
+                        return value
+                return default
+            bit = 1 << ((key_hash >> shift) & 31)
+            if not node.bitmap & bit:
+                return default
+            item = node.items[(node.bitmap & (bit - 1)).bit_count()]
+            if isinstance(item, (_Node, _Collision)):
+                node = item
+                shift += 5
+            elif item[0] == key:
+                return item[1]
+            else:
+                return default
+
+    def set(self, key, value):
+        """
+        :return: Новий словник, у якому ключ має вказане значення.
+        """
+        root, added = _set(self._root, 0, hash(key) & (2 ** HASH_BITS - 1), key, value)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._count + added)
+
+    def delete(self, key):
+        """
+        :return: Новий словник без ключа (або той самий, якщо ключа немає).
+        """
+        root = _delete(self._root, 0, hash(key) & (2 ** HASH_BITS - 1), key)
+        if root is self._root:
+            return self
+        return PersistentMap(root if root is not None else _EMPTY_NODE, self._count - 1)
+
+    def changed_keys(self, other):
+        """
+        Повертає ключі, значення яких у двох словниках відрізняються (за тотожністю).
+
+        Спільні піддерева пропускаються, тому для близьких версій робота
+        пропорційна кількості змін, а не розміру словника.
+
+        :param other: Інший PersistentMap.
+        :return: Множина ключів.
+        """
+        changed = set()
+        _diff(self._root, other._root, changed)
+        return changed
@@ -0,0 +1,268 @@
+import re
+from datetime import date
+
+from indexes import calendar_slot
+from storage import QueryableStorage
+
+
+FIELDS = ("name", "phone", "born")
+PHONE_SEPARATORS = str.maketrans('', '', ' ()-.+')
+# Після звуження до такої кількості кандидатів решту умов дешевше перевірити фільтром.
+INTERSECT_LIMIT = 64
+DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+class AccessPath:
+    """
+    Спосіб отримати кандидатів для умови через індекс.
+
+    :param description: Опис для команди explain.
+    :param estimate: Оцінка кількості кандидатів.
+    :param fetch: Функція без аргументів, що повертає ітерований набір імен.
+    """
+    __slots__ = ('description', 'estimate', 'fetch')
+
+    def __init__(self, description, estimate, fetch):
+        self.description = description
+        self.estimate = estimate
+        self.fetch = fetch
+
+
+class TextPredicate:
+    """
+    Умова на ім'я, телефони або будь-яке поле контакту.
+
+    Шаблон без спеціальних символів шукається як підрядок; '^' прив'язує його
+    до початку, '$' — до кінця значення. Шаблон з '*' (будь-які символи)
+    порівнюється з усім значенням, як у glob.
+    Для телефонів умова виконується, якщо під шаблон підходить хоча б один номер.
+
+    :param field: 'name', 'phone' або 'any' (слово без назви поля).
+    :param pattern: Шаблон (без урахування регістру).
+    :raise ValueError: Якщо шаблон порожній.
+    """
+    def __init__(self, field, pattern):
+        pattern = pattern.lower()
+        if field == "phone":
+            pattern = pattern.translate(PHONE_SEPARATORS)
+        body = pattern.removeprefix("^").removesuffix("$")
+        if not body:
+            raise ValueError(f"Empty pattern for '{field}'")
+        parts = body.split("*")
+        self.field = field
+        self.pattern = pattern
+        self.literal = max(parts, key=len)
+        self.exact = pattern.startswith("^") and pattern.endswith("$") and len(parts) == 1
+        regex = ".*".join(re.escape(part) for part in parts)
+        # Шаблон із '*' має збігтися з усім значенням, як у glob: '067*' — префікс, '*67' — суфікс.
+        if len(parts) > 1 or pattern.startswith("^"):
+            regex = "^" + regex
+        if len(parts) > 1 or pattern.endswith("$"):
+            regex += "$"
+        self._regex = re.compile(regex)
+
+    def __str__(self):
+        return self.pattern if self.field == "any" else f"{self.field}:{self.pattern}"
+
+    def _values(self, record):
+        if self.field == "name":
+            return (record.name.value.lower(),)
+        if self.field == "phone":
+            return record.phone_numbers
+        return [field.lower() for field in record.search_fields()]
+
+    def matches(self, record):
+        """:return: True, якщо контакт задовольняє умову."""
+        search = self._regex.search
+        return any(search(value) for value in self._values(record))
+
+    def access_path(self, book):
+        """
+        Підбирає індекс для умови.
+
+        :param book: Адресна книга.
+        :return: AccessPath або None, якщо індекс не допоможе.
+        """
+        storage = book.data if isinstance(book.data, QueryableStorage) else None
+        if self.field == "phone" and self.exact:
+            phone = self.literal
+            if storage is not None:
+                return AccessPath(f"phone = {phone} via phone table", 1, lambda: storage.phone_keys(phone))
+            owners = book.phone_index.owners(phone)
+            return AccessPath(f"phone = {phone} via phone index", len(owners), lambda: owners)
+        literal = self.literal
+        if not literal:
+            return None
+        if storage is not None:
+            return AccessPath(f"substring '{literal}' via full-text search", len(storage),
+                              lambda: storage.search_keys(literal))
+        index = book.search_index
+        return AccessPath(f"substring '{literal}' via n-gram index", index.estimate(literal),
+                          lambda: index.search(literal))
+
+
+class BirthdayPredicate:
+    """
+    Умова на дату народження: 'MM' (місяць), 'DD-MM' (день), 'YYYY' (рік) або 'DD-MM-YYYY'.
+
+    :param pattern: Шаблон дати.
+    :raise ValueError: Якщо шаблон не відповідає жодному з форматів або дата невірна.
+    """
+    def __init__(self, pattern):
+        parts = pattern.split("-")
+        if not all(part.isdigit() for part in parts) or len(parts) > 3:
+            raise ValueError(f"Invalid birthday filter: {pattern}. Use MM, DD-MM, YYYY or DD-MM-YYYY")
+        self.pattern = pattern
+        self.day = self.month = self.year = None
+        if len(parts) == 1 and len(parts[0]) == 4:
+            self.year = int(parts[0])
+        elif len(parts) == 1:
+            self.month = int(parts[0])
+        else:
+            self.day, self.month = int(parts[0]), int(parts[1])
+            if len(parts) == 3:
+                self.year = int(parts[2])
+        if self.month is not None and not (
+                1 <= self.month <= 12 and 1 <= (self.day or 1) <= DAYS_IN_MONTH[self.month - 1]):
+            raise ValueError(f"Invalid birthday filter: {pattern}")
+
+    def __str__(self):
+        return f"born:{self.pattern}"
+
+    def matches(self, record):
+        """:return: True, якщо контакт задовольняє умову."""
+        ordinal = record.birthday_ordinal
+        if ordinal is None:
+            return False
+        birthday = date.fromordinal(ordinal)
+        return ((self.year is None or birthday.year == self.year)
+                and (self.month is None or birthday.month == self.month)
+                and (self.day is None or birthday.day == self.day))
+
+    def _slots(self):
+        if self.day is not None:
+            return [calendar_slot(self.month, self.day)]
+        return [calendar_slot(self.month, day) for day in range(1, DAYS_IN_MONTH[self.month - 1] + 1)]
+
+    def access_path(self, book):
+        """
+        Підбирає індекс для умови.
+
+        :param book: Адресна книга.
+        :return: AccessPath або None, якщо індекс не допоможе.
+        """
+        if self.month is None and isinstance(book.data, QueryableStorage):
+            return None
+        if self.month is None:
+            # Рік є в тексті дати 'DD-MM-YYYY', тому його знаходить n-грамний індекс.
+            index, literal = book.search_index, f"-{self.year}"
+            return AccessPath(f"birthday year {self.year} via n-gram index", index.estimate(literal),
+                              lambda: index.search(literal))
+        what = f"birthday month {self.month:02d}" if self.day is None else f"birthday {self.day:02d}-{self.month:02d}"
+        if isinstance(book.data, QueryableStorage):
+            storage, slots = book.data, self._slots()
+            return AccessPath(f"{what} via birthday column", len(storage), lambda: storage.birthday_keys(slots))
+        index, slots = book.birthday_index, self._slots()
+        return AccessPath(f"{what} via birthday calendar", index.count(slots), lambda: index.keys(slots))
+
+
+def parse_query(text):
+    """
+    Розбирає структурований запит пошуку.
+
+    Запит складається зі слів 'поле:шаблон' (поля name, phone, born) та
+    слів без поля, які шукаються в усіх полях; контакт має задовольняти всі умови.
+
+    :param text: Текст запиту, наприклад 'name:^iv phone:067* born:03'.
+    :return: Список умов.
+    :raise ValueError: Якщо поле невідоме або шаблон невірний.
+    """
+    predicates = []
+    for word in text.split():
+        field, separator, pattern = word.partition(":")
+        if not separator:
+            predicates.append(TextPredicate("any", word))
+        elif field == "born":
+            predicates.append(BirthdayPredicate(pattern))
+        elif field in FIELDS:
+            predicates.append(TextPredicate(field, pattern))
+        else:
+            raise ValueError(f"Unknown search field: {field}. Use one of: {', '.join(FIELDS)}")
+    if not predicates:
+        raise ValueError("Empty search query")
+    return predicates
+
+
+class QueryPlan:
+    """
+    План виконання структурованого запиту.
+
+    Умови з індексами впорядковуються за оцінкою кількості кандидатів.
+    Найвибірковіший індекс дає початкову множину кандидатів, яка
+    перетинається з кандидатами наступних індексів, доки їх більше за
+    INTERSECT_LIMIT. Решта умов перевіряється фільтром лише на кандидатах;
+    якщо жодна умова не має індексу, перебираються всі контакти.
+
+    :param book: Адресна книга.
+    :param predicates: Умови запиту.
+    """
+    def __init__(self, book, predicates):
+        self.book = book
+        self.predicates = predicates
+        paths = ((path, predicate) for predicate in predicates
+                 if (path := predicate.access_path(book)) is not None)
+        self.paths = sorted(paths, key=lambda item: item[0].estimate)
+        self.steps = []
+
+    def candidates(self):
+        """
+        Обчислює множину кандидатів і записує кроки плану в steps.
+
+        :return: Множина імен кандидатів або None для повного перебору.
+        """
+        self.steps = []
+        candidates = None
+        for path, predicate in self.paths:
+            if candidates is None:
+                candidates = set(path.fetch())
+                self.steps.append(f"scan {path.description}: {len(candidates)} candidates")
+            elif len(candidates) > INTERSECT_LIMIT:
+                before = len(candidates)
+                candidates.intersection_update(path.fetch())
+                self.steps.append(f"intersect {path.description}: {before} -> {len(candidates)} candidates")
+            else:
+                self.steps.append(f"skip {path.description} (~{path.estimate} entries): checked by filter")
+        if candidates is None:
+            self.steps.append(f"full scan: {len(self.book.data)} contacts")
+        return candidates
+
+    def execute(self):
+        """
+        Виконує запит.
+
+        :return: Список знайдених контактів, впорядкований за ім'ям.
+        """
+        candidates = self.candidates()
+        if candidates is None:
+            records = self.book.data.values()
+        else:
+            data = self.book.data
+            records = (data[name] for name in candidates if name in data)
+        predicates = self.predicates
+        found = [record for record in records if all(predicate.matches(record) for predicate in predicates)]
+        found.sort(key=lambda record: record.name.value)
+        return found
+
+    def explain(self):
+        """
+        Описує план запиту і кількість кандидатів на кожному кроці.
+
+        :return: Рядок з описом плану.
+        """
+        candidates = self.candidates()
+        checked = len(self.book.data) if candidates is None else len(candidates)
+        lines = ["Query: " + " ".join(str(predicate) for predicate in self.predicates), "Plan:"]
+        lines.extend(f"  {number}. {step}" for number, step in enumerate(self.steps, 1))
+        lines.append(f"  {len(self.steps) + 1}. filter {checked} candidates by: "
+                     + ", ".join(str(predicate) for predicate in self.predicates))
+        return "\n".join(lines)
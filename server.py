@@ -0,0 +1,311 @@
+import asyncio
+import signal
+from contextlib import suppress
+from itertools import chain
+
+
+WRITE_COMMANDS = frozenset({"add", "change", "import", "undo", "redo", "snapshot", "restore", "dedupe"})
+RESPONSE_END = b".\n"
+
+
+def parse_address(address):
+    """
+    Розбирає адресу сервера.
+
+    :param address: 'host:port' для TCP або шлях до Unix-сокета.
+    :return: Пара ('tcp', (host, port)) або ('unix', path).
+    :raise ValueError: Якщо порт не є числом.
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and "/" not in address:
+        if not port.isdigit():
+            raise ValueError(f"Invalid port in address: {address}")
+        return "tcp", (host or "127.0.0.1", int(port))
+    return "unix", address
+
+
+async def open_connection(address, limit=2 ** 20):
+    """
+    Підключається до сервера адресної книги.
+
+    :param address: Адреса у форматі parse_address.
+    :param limit: Розмір буфера читання.
+    :return: Пара (StreamReader, StreamWriter).
+    """
+    kind, target = parse_address(address)
+    if kind == "tcp":
+        return await asyncio.open_connection(*target, limit=limit)
+    return await asyncio.open_unix_connection(target, limit=limit)
+
+
+def _stuff(text):
+    """Екранує рядки, що починаються з крапки, щоб їх не сплутали з кінцем відповіді."""
+    if text.startswith("."):
+        text = "." + text
+    return text.replace("\n.", "\n..")
+
+
+async def read_response(reader):
+    """
+    Читає одну відповідь сервера.
+
+    :param reader: StreamReader з'єднання.
+    :return: Текст відповіді.
+    :raise ConnectionError: Якщо з'єднання закрилось посеред відповіді.
+    """
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed before the end of response")
+        if line == RESPONSE_END:
+            return b"".join(lines).decode("utf-8")
+        lines.append(line[1:] if line.startswith(b"..") else line)
+
+
+class ReadWriteGate:
+    """
+    Асинхронне блокування «багато читачів або один записувач» з пріоритетом запису.
+
+    Читачі, що прийшли, поки записувач чекає, пропускають його вперед,
+    тому потік читань не може безкінечно відкладати зміни.
+    """
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    async def acquire_read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writing and not self._writers_waiting)
+            self._readers += 1
+
+    async def release_read(self):
+        async with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    async def acquire_write(self):
+        async with self._condition:
+            self._writers_waiting += 1
+            await self._condition.wait_for(lambda: not self._writing and not self._readers)
+            self._writers_waiting -= 1
+            self._writing = True
+
+    async def release_write(self):
+        async with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+
+class CommandServer:
+    """
+    Асинхронний сервер, що виконує команди консолі для багатьох клієнтів.
+
+    Протокол рядковий: клієнт надсилає по одній команді в рядку і може
+    надсилати наступні, не чекаючи відповіді (конвеєр). Відповіді приходять
+    у порядку команд; кожна відповідь закінчується рядком '.', а рядки
+    відповіді, що починаються з крапки, подвоюють її.
+
+    Команди виконуються в пулі потоків, тож цикл подій і далі обслуговує
+    інших клієнтів, поки триває довга команда. Команди читання виконуються
+    одночасно під спільним блокуванням, яке знімається до першого
+    очікування клієнта: потоковий 'show all' читає стабільний знімок книги,
+    а його блоки теж збираються в пулі, тому повільний клієнт не затримує
+    ні записувача, ні інших читачів. Команди зміни проходять через обмежену
+    чергу єдиного записувача, який виконує їх по одній у власному потоці,
+    коли немає активних читачів. Зворотний тиск забезпечують обмежена черга
+    записів, очікування drain() після кожного блоку відповіді та обмеження
+    кількості з'єднань.
+
+    :param book: Адресна книга з методом execute (AddressBookWithFileOps).
+    :param exit_commands: Команди, що закривають з'єднання.
+    :param max_connections: Максимальна кількість одночасних клієнтів.
+    :param queue_size: Місткість черги команд зміни.
+    :param chunk_size: Приблизний розмір блоку відповіді в символах.
+    """
+    def __init__(self, book, exit_commands=frozenset(), max_connections=1024, queue_size=1024,
+                 chunk_size=64 * 1024):
+        self.book = book
+        self.exit_commands = exit_commands
+        self.chunk_size = chunk_size
+        self.requests = 0
+        self._gate = ReadWriteGate()
+        self._writes = asyncio.Queue(maxsize=queue_size)
+        self._connections = asyncio.Semaphore(max_connections)
+        self._server = None
+        self._writer_task = None
+        self._clients = set()
+
+    async def start(self, address):
+        """
+        Починає приймати з'єднання.
+
+        :param address: 'host:port' для TCP або шлях до Unix-сокета.
+        """
+        self._writer_task = asyncio.create_task(self._write_loop())
+        kind, target = parse_address(address)
+        if kind == "tcp":
+            self._server = await asyncio.start_server(self._serve_client, *target)
+        else:
+            self._server = await asyncio.start_unix_server(self._serve_client, target)
+
+    async def stop(self):
+        """Припиняє приймати з'єднання, дочікується виконання черги змін і відключає клієнтів."""
+        if self._server is not None:
+            self._server.close()
+        await self._writes.join()
+        for task in list(self._clients):
+            task.cancel()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._writer_task
+
+    async def _write_loop(self):
+        """Єдиний записувач: по черзі виконує команди зміни без активних читачів."""
+        while True:
+            raw_input, future = await self._writes.get()
+            await self._gate.acquire_write()
+            try:
+                result = await asyncio.to_thread(self.book.execute, raw_input)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                await self._gate.release_write()
+                self._writes.task_done()
+
+    async def _serve_client(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients.add(task)
+        async with self._connections:
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    raw_input = line.decode("utf-8").strip()
+                    if not raw_input:
+                        continue
+                    if raw_input.lower() in self.exit_commands:
+                        break
+                    await self._respond(raw_input, writer)
+            except (ConnectionError, UnicodeDecodeError, asyncio.CancelledError):
+                pass
+            finally:
+                self._clients.discard(task)
+                writer.close()
+                with suppress(ConnectionError):
+                    await writer.wait_closed()
+
+    async def _respond(self, raw_input, writer):
+        """Виконує команду і надсилає відповідь блоками з урахуванням зворотного тиску."""
+        self.requests += 1
+        command = raw_input.split(maxsplit=1)[0].lower()
+        if command in WRITE_COMMANDS:
+            future = asyncio.get_running_loop().create_future()
+            await self._writes.put((raw_input, future))
+            result = await future
+            writer.write(self._encode(result))
+        else:
+            await self._gate.acquire_read()
+            try:
+                result = await asyncio.to_thread(self._read, raw_input)
+            finally:
+                await self._gate.release_read()
+            if isinstance(result, str):
+                writer.write(self._encode(result))
+            else:
+                await self._stream(result, writer)
+        writer.write(RESPONSE_END)
+        await writer.drain()
+
+    def _read(self, raw_input):
+        """
+        Виконує команду читання під блокуванням читача, не очікуючи клієнта.
+        Викликається в потоці пулу.
+
+        Потоковий результат над стабільним знімком книги повертається як є,
+        лише з уже обчисленим першим блоком, щоб генератори, які беруть знімок
+        при першому кроці, взяли його під блокуванням книги. Без версій
+        (сховище SQLite) знімок не стабільний, тому відповідь збирається
+        повністю, не відпускаючи блокування книги.
+
+        :param raw_input: Рядок команди.
+        :return: Рядок або ітератор блоків відповіді.
+        """
+        with self.book.lock:
+            result = self.book.execute(raw_input)
+            if isinstance(result, str):
+                return result
+            if not self.book.versions_enabled:
+                return list(result)
+            chunks = iter(result)
+            first = next(chunks, None)
+        if first is None:
+            return ()
+        return chain((first,), chunks)
+
+    @staticmethod
+    def _encode(text):
+        text = _stuff(text)
+        if not text.endswith("\n"):
+            text += "\n"
+        return text.encode("utf-8")
+
+    def _next_block(self, chunks):
+        """
+        Збирає з потокового результату наступний блок відповіді. Викликається в потоці пулу.
+
+        :param chunks: Ітератор рядків відповіді.
+        :return: Пара (текст блоку, чи вичерпано результат).
+        """
+        buffer = []
+        buffered = 0
+        for chunk in chunks:
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= self.chunk_size:
+                return ''.join(buffer), False
+        return ''.join(buffer), True
+
+    async def _stream(self, chunks, writer):
+        """Надсилає потоковий результат, чекаючи на клієнта після кожного блоку."""
+        chunks = iter(chunks)
+        while True:
+            block, done = await asyncio.to_thread(self._next_block, chunks)
+            if done:
+                if block:
+                    writer.write(self._encode(block))
+                return
+            writer.write(_stuff(block).encode("utf-8"))
+            await writer.drain()
+
+
+async def serve(book, address, exit_commands=frozenset(), status_stream=None):
+    """
+    Запускає сервер і працює до SIGINT або SIGTERM.
+
+    :param book: Адресна книга.
+    :param address: 'host:port' для TCP або шлях до Unix-сокета.
+    :param exit_commands: Команди, що закривають з'єднання клієнта.
+    :param status_stream: Потік для повідомлень про стан.
+    """
+    server = CommandServer(book, exit_commands)
+    await server.start(address)
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(signal_number, stopped.set)
+    print(f"Serving on {address}", file=status_stream, flush=True)
+    await stopped.wait()
+    await server.stop()
+    print(f"Server stopped after {server.requests} requests", file=status_stream)
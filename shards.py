@@ -0,0 +1,279 @@
+import os
+import pickle
+import struct
+import zlib
+from array import array
+from collections.abc import Mapping
+
+from storage import HEADER, MAGIC, MappedRecords, _MappedItems, _MappedValues, encode_items, write_encoded_snapshot
+
+
+MANIFEST_SUFFIX = ".shards"
+# Номер шарда кожного контакту в порядку книги зберігається одним байтом.
+MAX_SHARDS = 256
+CHECKSUM_CHUNK = 1024 * 1024
+
+
+def manifest_path(filename):
+    """Повертає шлях до маніфесту шардів для файлу знімка."""
+    return filename + MANIFEST_SUFFIX
+
+
+def shard_of(name, count):
+    """
+    Повертає номер шарда для імені контакту.
+
+    Вбудований hash() рядків змінюється між запусками, тому використовується CRC32.
+
+    :param name: Ім'я контакту.
+    :param count: Кількість шардів.
+    :return: Номер шарда від 0 до count - 1.
+    """
+    return zlib.crc32(name.encode('utf-8')) % count
+
+
+def file_checksum(filename):
+    """:return: CRC32 вмісту файлу."""
+    checksum = 0
+    with open(filename, 'rb') as file:
+        while chunk := file.read(CHECKSUM_CHUNK):
+            checksum = zlib.crc32(chunk, checksum)
+    return checksum
+
+
+_data = None
+
+
+def _write_shard(filename, number, count):
+    """
+    Записує один шард з контактів, які робочий процес успадкував від батьківського.
+
+    Серіалізуються лише контакти цього шарда.
+
+    :return: Пара (кількість контактів, CRC32 файлу).
+    """
+    items = encode_items(_data, lambda name: shard_of(name, count) == number)
+    return write_encoded_snapshot(filename, items), file_checksum(filename)
+
+
+def _verify_shard(filename, count, checksum):
+    """
+    Перевіряє контрольну суму і кількість контактів шарда (у робочому процесі).
+
+    :return: Опис пошкодження або None, якщо шард цілий.
+    """
+    try:
+        if file_checksum(filename) != checksum:
+            return "checksum mismatch"
+        with open(filename, 'rb') as file:
+            magic, stored, _, _ = HEADER.unpack(file.read(HEADER.size))
+    except (OSError, struct.error) as e:
+        return str(e)
+    if magic != MAGIC or stored != count:
+        return f"expected {count} records, found {stored}"
+    return None
+
+
+def _run(function, tasks, workers):
+    """
+    Виконує завдання у пулі процесів або послідовно, якщо робочий процес один.
+
+    :param function: Функція рівня модуля.
+    :param tasks: Список кортежів аргументів.
+    :param workers: Максимальна кількість робочих процесів.
+    :return: Список результатів у порядку завдань.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        return [function(*task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+
+    from parallel import _context
+
+    with ProcessPoolExecutor(min(workers, len(tasks)), mp_context=_context()) as pool:
+        return list(pool.map(function, *zip(*tasks)))
+
+
+def read_manifest(filename):
+    """
+    Читає маніфест шардів.
+
+    :param filename: Ім'я файлу знімка (маніфест лежить поруч з суфіксом '.shards').
+    :return: Словник з поколінням, списком шардів (файл, кількість, CRC32) і порядком контактів.
+    :raise FileNotFoundError: Якщо маніфесту немає.
+    """
+    with open(manifest_path(filename), 'rb') as file:
+        return pickle.load(file)
+
+
+def write_shards(filename, data, count, workers=1):
+    """
+    Розбиває контакти за хешем імені на count файлів і атомарно записує їх.
+
+    Шарди записуються паралельно у файли нового покоління: кожен робочий
+    процес успадковує data через fork і сам серіалізує лише контакти свого
+    шарда, тож батьківський процес не тримає серіалізованих контактів (без
+    fork шарди записуються по черзі). Після цього атомарно замінюється
+    маніфест з кількістю контактів і CRC32 кожного шарда та номером шарда
+    для кожного контакту в порядку книги. Файли
+    попереднього покоління видаляються лише після заміни маніфесту, тому
+    збій під час запису не зачіпає збережених даних.
+
+    :param filename: Ім'я файлу знімка.
+    :param data: Словник контактів, який не змінюється під час запису.
+    :param count: Кількість шардів, від 1 до MAX_SHARDS.
+    :param workers: Кількість робочих процесів.
+    :return: Кількість записаних контактів.
+    :raise ValueError: Якщо кількість шардів поза межами.
+    """
+    if not 1 <= count <= MAX_SHARDS:
+        raise ValueError(f"Invalid number of shards: {count}. Use 1 to {MAX_SHARDS}")
+    try:
+        previous = read_manifest(filename)
+    except FileNotFoundError:
+        previous = None
+    generation = previous["generation"] + 1 if previous else 1
+
+    global _data
+    order = array('B', (shard_of(name, count) for name in data))
+    directory = os.path.dirname(filename)
+    names = [f"{os.path.basename(filename)}.{generation}.shard{number}" for number in range(count)]
+    tasks = [(os.path.join(directory, name), number, count) for number, name in enumerate(names)]
+    from parallel import _context
+
+    if _context().get_start_method() != "fork":
+        workers = 1
+    _data = data
+    try:
+        results = _run(_write_shard, tasks, workers)
+    finally:
+        _data = None
+
+    manifest = {
+        "generation": generation,
+        "shards": [(name, records, checksum) for name, (records, checksum) in zip(names, results)],
+        "order": order.tobytes(),
+    }
+    tmp_filename = f"{manifest_path(filename)}.tmp"
+    with open(tmp_filename, 'wb') as file:
+        pickle.dump(manifest, file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_filename, manifest_path(filename))
+
+    if previous:
+        for name, _, _ in previous["shards"]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+    return len(order)
+
+
+def open_shards(filename, workers=1, status_stream=None):
+    """
+    Відкриває книгу, розбиту на шарди.
+
+    Контрольні суми і кількості контактів шардів перевіряються паралельно.
+    Пошкоджений шард не зупиняє завантаження: його контакти пропускаються,
+    а файл перейменовується з суфіксом '.corrupt', щоб наступне збереження
+    його не видалило і дані можна було відновити вручну.
+
+    :param filename: Ім'я файлу знімка.
+    :param workers: Кількість робочих процесів для перевірки.
+    :param status_stream: Потік для повідомлень про пошкоджені шарди.
+    :return: ShardedRecords.
+    :raise FileNotFoundError: Якщо маніфесту немає.
+    """
+    manifest = read_manifest(filename)
+    directory = os.path.dirname(filename)
+    paths = [os.path.join(directory, name) for name, _, _ in manifest["shards"]]
+    errors = _run(_verify_shard, [(path, records, checksum) for path, (_, records, checksum)
+                                  in zip(paths, manifest["shards"])], workers)
+    shards = []
+    for path, error in zip(paths, errors):
+        if error is None:
+            shards.append(MappedRecords(path))
+            continue
+        if os.path.exists(path):
+            os.replace(path, f"{path}.corrupt")
+        print(f"Shard {path} is damaged ({error}), its contacts are skipped. "
+              f"The file is kept as {path}.corrupt", file=status_stream)
+        shards.append({})
+    return ShardedRecords(shards, array('B', manifest["order"]))
+
+
+def open_shard_of(filename, name):
+    """
+    Відкриває лише шард, у якому має бути контакт, без перевірки контрольної суми.
+
+    :param filename: Ім'я файлу знімка.
+    :param name: Ім'я контакту.
+    :return: MappedRecords шарда.
+    :raise FileNotFoundError: Якщо маніфесту або шарда немає.
+    """
+    shards = read_manifest(filename)["shards"]
+    shard_name, _, _ = shards[shard_of(name, len(shards))]
+    return MappedRecords(os.path.join(os.path.dirname(filename), shard_name))
+
+
+class ShardedRecords(Mapping):
+    """
+    Одна логічна книга поверх кількох шардів.
+
+    Контакт шукається лише у своєму шарді; перебір іде в порядку книги на
+    момент запису завдяки збереженому номеру шарда для кожного контакту.
+    Зміни зберігає VersionedRecords поверх цього подання.
+
+    :param shards: Список словників контактів (MappedRecords або {} для пошкодженого шарда).
+    :param order: Масив номерів шардів для контактів у порядку книги.
+    """
+    def __init__(self, shards, order):
+        self.shards = shards
+        self._order = order
+
+    def __getitem__(self, name):
+        return self.shards[shard_of(name, len(self.shards))][name]
+
+    def __contains__(self, name):
+        return name in self.shards[shard_of(name, len(self.shards))]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def __iter__(self):
+        return self._merge(iter(shard) for shard in self.shards)
+
+    def _merge(self, iterables):
+        """Об'єднує імена або пари шардів у порядку книги; контакти пошкоджених шардів пропускаються."""
+        iterators = [iter(iterable) for iterable in iterables]
+        for shard in self._order:
+            item = next(iterators[shard], None)
+            if item is not None:
+                yield item
+
+    def _iter_items(self):
+        return self._merge(shard.items() for shard in self.shards)
+
+    def values(self):
+        return _MappedValues(self)
+
+    def items(self):
+        return _MappedItems(self)
+
+    def iter_encoded(self, select=None):
+        """
+        Повертає контакти у серіалізованому вигляді в порядку книги.
+
+        :param select: Функція, що за ім'ям вирішує, чи повертати контакт; без неї повертаються всі.
+        :return: Генератор пар (ім'я, байти pickle).
+        """
+        items = self._merge(encode_items(shard) for shard in self.shards)
+        if select is None:
+            return items
+        return ((name, payload) for name, payload in items if select(name))
+
+    def close(self):
+        """Звільняє відображення файлів шардів у пам'ять."""
+        for shard in self.shards:
+            if isinstance(shard, MappedRecords):
+                shard.close()
@@ -0,0 +1,855 @@
+import mmap
+import os
+import pickle
+import struct
+from abc import abstractmethod
+from array import array
+from collections import OrderedDict
+from collections.abc import ItemsView, Mapping, MutableMapping, ValuesView
+from datetime import date
+
+from indexes import calendar_slot, upcoming_slots
+from persistent import PersistentMap
+
+
+MAGIC = b"ABMAP01\n"
+HEADER = struct.Struct("<8sQQQ")
+NAME_LENGTH = struct.Struct("<H")
+
+
+class _MappedValues(ValuesView):
+    def __iter__(self):
+        for _, record in self._mapping._iter_items():
+            yield record
+
+
+class _MappedItems(ItemsView):
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class MappedRecords(MutableMapping):
+    """
+    Словник контактів поверх знімка, відображеного у пам'ять (mmap).
+
+    Файл знімка містить блоки записів, таблицю зміщень фіксованого розміру
+    (у порядку додавання) та таблицю номерів записів, відсортовану за ім'ям.
+    Контакт розпаковується лише при зверненні до нього і потрапляє в
+    обмежений LRU-кеш. Зміни зберігаються в пам'яті поверх знімка, доки
+    знімок не буде перезаписано.
+
+    :param filename: Ім'я файлу знімка.
+    :param cache_size: Максимальна кількість розпакованих контактів у кеші.
+    """
+    def __init__(self, filename, cache_size=4096):
+        self.filename = filename
+        self.cache_size = cache_size
+        self._file = open(filename, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, table_offset, order_offset = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a mapped address book snapshot")
+        view = memoryview(self._mmap)
+        self._count = count
+        self._offsets = view[table_offset:table_offset + 8 * (count + 1)].cast('Q')
+        self._order = view[order_offset:order_offset + 4 * count].cast('I')
+        view.release()
+        self._cache = OrderedDict()
+        self._overlay = {}
+        self._appended = set()
+        self._shadowed = set()
+
+    def close(self):
+        """Звільняє відображення файлу у пам'ять."""
+        for name in ('_offsets', '_order'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def _base_name(self, number):
+        offset = self._offsets[number]
+        length, = NAME_LENGTH.unpack_from(self._mmap, offset)
+        start = offset + NAME_LENGTH.size
+        return self._mmap[start:start + length].decode('utf-8')
+
+    def _base_payload(self, number):
+        offset = self._offsets[number]
+        length, = NAME_LENGTH.unpack_from(self._mmap, offset)
+        return self._mmap[offset + NAME_LENGTH.size + length:self._offsets[number + 1]]
+
+    def _base_number(self, name):
+        """
+        Бінарний пошук контакту у знімку за ім'ям.
+
+        :param name: Ім'я контакту.
+        :return: Номер запису у знімку або None, якщо не знайдено.
+        """
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._base_name(self._order[middle]) < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._base_name(self._order[low]) == name:
+            return self._order[low]
+        return None
+
+    def _decode(self, number):
+        record = self._cache.get(number)
+        if record is not None:
+            self._cache.move_to_end(number)
+            return record
+        record = pickle.loads(self._base_payload(number))
+        self._cache[number] = record
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return record
+
+    def _in_base(self, name):
+        return name not in self._shadowed and self._base_number(name) is not None
+
+    def __getitem__(self, name):
+        if name in self._overlay:
+            return self._overlay[name]
+        if name not in self._shadowed:
+            number = self._base_number(name)
+            if number is not None:
+                return self._decode(number)
+        raise KeyError(name)
+
+    def __setitem__(self, name, record):
+        if name not in self._overlay and not self._in_base(name):
+            self._appended.add(name)
+        self._overlay[name] = record
+
+    def __delitem__(self, name):
+        found = self._overlay.pop(name, None) is not None
+        self._appended.discard(name)
+        if self._in_base(name):
+            self._shadowed.add(name)
+            found = True
+        if not found:
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        return name in self._overlay or self._in_base(name)
+
+    def __len__(self):
+        return self._count - len(self._shadowed) + len(self._appended)
+
+    def __iter__(self):
+        for number in range(self._count):
+            name = self._base_name(number)
+            if name not in self._shadowed:
+                yield name
+        for name in self._overlay:
+            if name in self._appended:
+                yield name
+
+    def _iter_items(self):
+        overlay = self._overlay
+        for number in range(self._count):
+            name = self._base_name(number)
+            if name in self._shadowed:
+                continue
+            yield name, overlay[name] if name in overlay else self._decode(number)
+        for name, record in overlay.items():
+            if name in self._appended:
+                yield name, record
+
+    def values(self):
+        return _MappedValues(self)
+
+    def items(self):
+        return _MappedItems(self)
+
+    def iter_encoded(self, select=None):
+        """
+        Повертає контакти у серіалізованому вигляді для перезапису знімка.
+
+        Незмінені контакти передаються як є, без розпаковування.
+
+        :param select: Функція, що за ім'ям вирішує, чи повертати контакт; без неї повертаються всі.
+        :return: Генератор пар (ім'я, байти pickle).
+        """
+        overlay = self._overlay
+        for number in range(self._count):
+            name = self._base_name(number)
+            if name in self._shadowed or select is not None and not select(name):
+                continue
+            if name in overlay:
+                yield name, pickle.dumps(overlay[name], protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                yield name, self._base_payload(number)
+        for name, record in overlay.items():
+            if name in self._appended and (select is None or select(name)):
+                yield name, pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class Version:
+    """
+    Незмінний стан VersionedRecords.
+
+    :param base: Базове сховище, яке версії не змінюють.
+    :param changes: PersistentMap ім'я -> (номер, контакт) зі змінами поверх бази.
+        Номер -1 позначає контакт бази, інакше це порядковий номер додавання
+        нового контакту; контакт None позначає видалений контакт бази.
+    :param size: Кількість контактів у версії.
+    """
+    __slots__ = ('base', 'changes', 'size')
+
+    def __init__(self, base, changes=PersistentMap(), size=None):
+        self.base = base
+        self.changes = changes
+        self.size = len(base) if size is None else size
+
+    def get(self, name, default=None):
+        entry = self.changes.get(name)
+        if entry is None:
+            return self.base.get(name, default)
+        return default if entry[1] is None else entry[1]
+
+    def iter_items(self, base_items):
+        """
+        Перебирає контакти версії: спочатку базові в їх порядку, потім нові в порядку додавання.
+
+        :param base_items: Ітерований набір пар (ім'я, значення) бази.
+        :return: Генератор пар (ім'я, значення); для змінених контактів — контакт версії.
+        """
+        changes = dict(self.changes.items())
+        return _overlay_items(base_items, changes, sorted(
+            (entry[0], name) for name, entry in changes.items() if entry[0] >= 0))
+
+
+def _overlay_items(base_items, changes, appended):
+    """
+    Накладає зміни на контакти бази.
+
+    :param base_items: Пари (ім'я, значення) бази.
+    :param changes: Словник ім'я -> (номер, контакт).
+    :param appended: Пари (номер, ім'я) нових контактів у порядку перебору.
+    """
+    if not changes:
+        yield from base_items
+        return
+    for name, value in base_items:
+        entry = changes.get(name)
+        if entry is None:
+            yield name, value
+        elif entry[1] is not None:
+            yield name, entry[1]
+    for _, name in appended:
+        yield name, changes[name][1]
+
+
+class VersionedRecords(MutableMapping):
+    """
+    Словник контактів з незмінними версіями поверх базового сховища.
+
+    Базове сховище (dict або MappedRecords) версії не змінюють: зміни
+    накопичуються у звичайному словнику поточного стану, тому читання й
+    масові зміни мають швидкість dict. Звернення до current закріплює
+    накопичені зміни в PersistentMap за O(k log n) для k змін, і попередні
+    версії лишаються цілими завдяки спільним піддеревам. Тому перемикання
+    між версіями (undo/redo) не потребує глибоких копій, а snapshot() дає
+    стабільне подання для читання, поки тривають зміни. Порядок перебору
+    такий самий, як у dict: нові контакти йдуть у кінці.
+
+    :param base: Базове сховище контактів.
+    """
+    def __init__(self, base):
+        self._version = Version(base)
+        self._base = base
+        self._current = {}
+        self._dirty = set()
+        self._size = self._version.size
+        self._sequence = 0
+        self._adopted = {}
+
+    @property
+    def base(self):
+        return self._base
+
+    @property
+    def current(self):
+        """Поточна версія (Version); її можна передати в restore()."""
+        if self._dirty:
+            changes = self._version.changes
+            for name in self._dirty:
+                entry = self._current.get(name)
+                changes = changes.delete(name) if entry is None else changes.set(name, entry)
+            self._version = Version(self._base, changes, self._size)
+            self._dirty.clear()
+        return self._version
+
+    def restore(self, version):
+        """
+        Робить вказану версію поточною.
+
+        :param version: Version, отримана з current.
+        :return: Множина імен, контакти яких відрізняються від попередньої поточної версії.
+        :raise ValueError: Якщо версія належить іншому базовому сховищу.
+        """
+        if version.base is not self._base:
+            raise ValueError("Versions of different base storages cannot be restored")
+        changed = self.current.changes.changed_keys(version.changes)
+        reordered = False
+        for name in changed:
+            entry = version.changes.get(name)
+            if entry is None:
+                self._current.pop(name, None)
+            else:
+                reordered |= entry[0] >= 0 and name not in self._current
+                self._current[name] = entry
+        if reordered:
+            # Повернутий новий контакт має стати на своє місце в порядку додавання.
+            self._current = dict(sorted(self._current.items(), key=lambda item: item[1][0]))
+        self._version = version
+        self._size = version.size
+        return changed
+
+    def rebase(self, base, version):
+        """
+        Переносить на нове базове сховище зміни, зроблені після версії.
+
+        Використовується після перезапису знімка з версії version: нова база
+        вже містить її стан, тому переносяться лише пізніші зміни.
+
+        :param base: Нове базове сховище зі станом version.
+        :param version: Версія цього сховища, з якої записано нову базу.
+        :return: Новий VersionedRecords без історії попередніх версій.
+        """
+        current = self.current
+        rebased = VersionedRecords(base)
+        changed = version.changes.changed_keys(current.changes)
+        for name in sorted(changed, key=lambda name: self._current.get(name, (-1,))[0]):
+            record = current.get(name)
+            if record is not None:
+                rebased[name] = record
+            elif name in rebased:
+                del rebased[name]
+        return rebased
+
+    def adopt(self, version, written):
+        """
+        Переносить версію попереднього сховища на базу цього сховища.
+
+        Нова база містить стан версії written того самого попереднього
+        сховища, тому в перенесену версію потрапляють лише контакти, якими
+        version відрізняється від written. Контакти старої бази при цьому
+        розпаковуються, і перенесена версія на стару базу не посилається.
+
+        :param version: Version попереднього сховища.
+        :param written: Version попереднього сховища, з якої записано базу.
+        :return: Version поверх бази цього сховища, яку можна передати в restore().
+        """
+        changes = PersistentMap()
+        size = written.size
+        names = written.changes.changed_keys(version.changes)
+        for name in sorted(names, key=lambda name: (version.changes.get(name) or (-1,))[0]):
+            record = version.get(name)
+            if name in self._base:
+                changes = changes.set(name, (-1, record))
+                size -= record is None
+            elif record is not None:
+                # Новий контакт має однаковий номер у всіх версіях, щоб restore() зберігав порядок.
+                sequence = self._adopted.get(name)
+                if sequence is None:
+                    entry = self._current.get(name)
+                    if entry is not None and entry[0] >= 0:
+                        sequence = entry[0]
+                    else:
+                        sequence = self._sequence
+                        self._sequence += 1
+                    self._adopted[name] = sequence
+                changes = changes.set(name, (sequence, record))
+                size += 1
+        return Version(self._base, changes, size)
+
+    def snapshot(self):
+        """:return: Незмінне подання поточної версії для читання."""
+        return RecordsSnapshot(self.current)
+
+    def close(self):
+        """Закриває базове сховище, якщо воно цього потребує."""
+        if hasattr(self._base, 'close'):
+            self._base.close()
+
+    def __getitem__(self, name):
+        entry = self._current.get(name)
+        if entry is None:
+            return self._base[name]
+        if entry[1] is None:
+            raise KeyError(name)
+        return entry[1]
+
+    def __setitem__(self, name, record):
+        entry = self._current.get(name)
+        if entry is not None:
+            if entry[1] is None:
+                self._size += 1
+            self._current[name] = (entry[0], record)
+        elif name in self._base:
+            self._current[name] = (-1, record)
+        else:
+            self._current[name] = (self._sequence, record)
+            self._sequence += 1
+            self._size += 1
+        self._dirty.add(name)
+
+    def __delitem__(self, name):
+        entry = self._current.get(name)
+        if entry is None:
+            if name not in self._base:
+                raise KeyError(name)
+            self._current[name] = (-1, None)
+        elif entry[1] is None:
+            raise KeyError(name)
+        elif entry[0] < 0:
+            self._current[name] = (-1, None)
+        else:
+            del self._current[name]
+        self._size -= 1
+        self._dirty.add(name)
+
+    def __contains__(self, name):
+        entry = self._current.get(name)
+        if entry is None:
+            return name in self._base
+        return entry[1] is not None
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        # Імена бази беруться без розпакування контактів.
+        current = self._current
+        for name, _ in _overlay_items(((name, None) for name in self._base), current,
+                                      ((entry[0], name) for name, entry in current.items() if entry[0] >= 0)):
+            yield name
+
+    def _iter_items(self):
+        current = self._current
+        return _overlay_items(self._base.items(), current,
+                              ((entry[0], name) for name, entry in current.items() if entry[0] >= 0))
+
+    def values(self):
+        return _MappedValues(self)
+
+    def items(self):
+        return _MappedItems(self)
+
+    def iter_encoded(self, select=None):
+        """
+        Повертає контакти у серіалізованому вигляді для запису знімка.
+
+        Незмінені контакти бази передаються так, як їх віддає encode_items бази.
+
+        :param select: Функція, що за ім'ям вирішує, чи повертати контакт; без неї повертаються всі.
+        :return: Генератор пар (ім'я, байти pickle).
+        """
+        current = self._current
+        return _encode_overlay(_overlay_items(
+            encode_items(self._base), current,
+            ((entry[0], name) for name, entry in current.items() if entry[0] >= 0)), select)
+
+
+class RecordsSnapshot(Mapping):
+    """
+    Незмінне подання однієї версії VersionedRecords.
+
+    Його можна перебирати, поки книга змінюється: подання завжди показує
+    контакти на момент створення.
+
+    :param version: Version, яку показує подання.
+    """
+    def __init__(self, version):
+        self._version = version
+
+    def __getitem__(self, name):
+        record = self._version.get(name, _ABSENT)
+        if record is _ABSENT:
+            raise KeyError(name)
+        return record
+
+    def __len__(self):
+        return self._version.size
+
+    def __iter__(self):
+        # Імена бази беруться без розпакування контактів.
+        for name, _ in self._version.iter_items((name, None) for name in self._version.base):
+            yield name
+
+    def _iter_items(self):
+        return self._version.iter_items(self._version.base.items())
+
+    def values(self):
+        return _MappedValues(self)
+
+    def items(self):
+        return _MappedItems(self)
+
+    def iter_encoded(self, select=None):
+        """
+        Повертає контакти у серіалізованому вигляді для запису знімка.
+
+        Базове сховище лише читається, тому знімок можна записувати в іншому
+        потоці, поки книга змінюється.
+
+        :param select: Функція, що за ім'ям вирішує, чи повертати контакт; без неї повертаються всі.
+        :return: Генератор пар (ім'я, байти pickle).
+        """
+        return _encode_overlay(self._version.iter_items(encode_items(self._version.base)), select)
+
+
+def _encode_overlay(items, select=None):
+    """
+    Серіалізує контакти з накладених змін, а вже серіалізовані контакти бази передає як є.
+    Контакти, які відкидає select, пропускаються без серіалізації.
+    """
+    for name, value in items:
+        if select is not None and not select(name):
+            continue
+        yield name, value if isinstance(value, (bytes, memoryview)) else pickle.dumps(
+            value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+_ABSENT = object()
+
+
+def encode_items(data, select=None):
+    """
+    Серіалізує контакти словника для запису у знімок.
+
+    :param data: Словник контактів; сховища з методом iter_encoded (MappedRecords,
+                 VersionedRecords, RecordsSnapshot, ShardedRecords) передають незмінені контакти як є.
+    :param select: Функція, що за ім'ям вирішує, чи серіалізувати контакт; без неї серіалізуються всі.
+    :return: Ітератор пар (ім'я, байти pickle).
+    """
+    iter_encoded = getattr(data, 'iter_encoded', None)
+    if iter_encoded is not None:
+        return iter_encoded(select)
+    return ((name, pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+            for name, record in data.items() if select is None or select(name))
+
+
+def write_snapshot(filename, data):
+    """
+    Атомарно записує знімок адресної книги у форматі для відображення у пам'ять.
+
+    Дані спочатку записуються у тимчасовий файл, який після fsync
+    перейменовується поверх старого знімка.
+
+    :param filename: Ім'я файлу знімка.
+    :param data: Словник контактів для збереження.
+    """
+    write_encoded_snapshot(filename, encode_items(data))
+
+
+def write_encoded_snapshot(filename, items):
+    """
+    Атомарно записує знімок з уже серіалізованих контактів.
+
+    :param filename: Ім'я файлу знімка.
+    :param items: Ітерований набір пар (ім'я, байти pickle) у порядку книги.
+    :return: Кількість записаних контактів.
+    """
+    tmp_filename = f"{filename}.tmp"
+    offsets = array('Q')
+    names = []
+    with open(tmp_filename, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, 0, 0, 0))
+        position = HEADER.size
+        for name, payload in items:
+            encoded_name = name.encode('utf-8')
+            offsets.append(position)
+            names.append(name)
+            file.write(NAME_LENGTH.pack(len(encoded_name)))
+            file.write(encoded_name)
+            file.write(payload)
+            position += NAME_LENGTH.size + len(encoded_name) + len(payload)
+
+        padding = -position % 8
+        file.write(b"\0" * padding)
+        offsets.append(position)
+        table_offset = position + padding
+        file.write(offsets.tobytes())
+        order_offset = table_offset + len(offsets) * offsets.itemsize
+        order = array('I', sorted(range(len(names)), key=names.__getitem__))
+        file.write(order.tobytes())
+
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, len(names), table_offset, order_offset))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_filename, filename)
+    return len(names)
+
+
+def open_snapshot(filename):
+    """
+    Відкриває знімок адресної книги.
+
+    Знімки у форматі MappedRecords відображаються у пам'ять без розпаковування
+    контактів; старі знімки у вигляді pickle-словника завантажуються повністю.
+
+    :param filename: Ім'я файлу знімка.
+    :return: Словник контактів.
+    :raise FileNotFoundError: Якщо файл не існує.
+    """
+    with open(filename, 'rb') as file:
+        magic = file.read(len(MAGIC))
+        if magic != MAGIC:
+            file.seek(0)
+            return pickle.load(file)
+    return MappedRecords(filename)
+
+
+class QueryableStorage(MutableMapping):
+    """
+    Базовий клас сховищ, які самі виконують пошукові запити.
+
+    AddressBook передає такому сховищу пошук, запити найближчих днів
+    народження і пошук власників телефону замість побудови власних індексів
+    у пам'яті. Підклас має реалізувати всі методи запитів, інакше його
+    екземпляр не створиться.
+    """
+    @abstractmethod
+    def search_keys(self, search_term):
+        """
+        :param search_term: Підрядок для пошуку (без урахування регістру).
+        :return: Список імен знайдених контактів у порядку додавання.
+        """
+
+    @abstractmethod
+    def upcoming_keys(self, today, days):
+        """
+        :param today: Поточна дата.
+        :param days: Кількість днів уперед.
+        :return: Список пар (днів до дня народження, ім'я), впорядкований за днями.
+        """
+
+    @abstractmethod
+    def phone_keys(self, phone):
+        """
+        :param phone: Нормалізований номер телефону.
+        :return: Список імен контактів, яким належить номер.
+        """
+
+    @abstractmethod
+    def birthday_keys(self, slots):
+        """
+        :param slots: Номери кошиків календаря (calendar_slot).
+        :return: Список імен контактів з днями народження в цих кошиках.
+        """
+
+
+# FTS5 обрізає текст на символі NUL, тому поля пошуку в базі розділяються переносом рядка.
+SQLITE_FIELD_SEPARATOR = "\n"
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    birthday_ordinal INTEGER,
+    birthday_slot INTEGER,
+    search_text TEXT NOT NULL,
+    record BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_birthday_slot ON contacts(birthday_slot);
+CREATE TABLE IF NOT EXISTS phones (
+    contact_id INTEGER NOT NULL,
+    phone TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones(phone);
+CREATE INDEX IF NOT EXISTS phones_contact ON phones(contact_id);
+"""
+
+SQLITE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    search_text, content='contacts', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_fts(rowid, search_text) VALUES (new.id, new.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+    INSERT INTO contacts_fts(rowid, search_text) VALUES (new.id, new.search_text);
+END;
+"""
+
+
+class SQLiteRecords(QueryableStorage):
+    """
+    Сховище контактів у базі SQLite.
+
+    Ім'я, телефони та день року народження зберігаються в індексованих
+    стовпцях, а сам контакт — як pickle. Підрядковий пошук використовує
+    триграмний індекс FTS5 (якщо він доступний), тому книга може бути
+    більшою за оперативну пам'ять і відкривається миттєво. Зміни
+    накопичуються у транзакції, яка фіксується кожні commit_every записів
+    і під час commit().
+
+    :param filename: Ім'я файлу бази даних.
+    :param cache_size: Максимальна кількість розпакованих контактів у кеші.
+    :param commit_every: Кількість змін, після якої транзакція фіксується автоматично.
+    """
+    def __init__(self, filename, cache_size=4096, commit_every=1000):
+        self.filename = filename
+        self.cache_size = cache_size
+        self.commit_every = commit_every
+        self._cache = OrderedDict()
+        self._pending = 0
+        # sqlite3 імпортується лише для бази, щоб не сповільнювати запуск зі знімком.
+        import sqlite3
+        # Сервер звертається до бази з потоків пулу; доступ упорядковує блокування книги.
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        try:
+            self._conn.executescript(SQLITE_FTS_SCHEMA)
+            self._fts = True
+        except sqlite3.OperationalError:
+            self._fts = False
+        self._count = None
+
+    def close(self):
+        """Фіксує зміни і закриває з'єднання з базою."""
+        self.commit()
+        self._conn.close()
+
+    def commit(self):
+        """Фіксує накопичені зміни."""
+        self._conn.commit()
+        self._pending = 0
+
+    def _changed(self):
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def _remember(self, name, record):
+        self._cache[name] = record
+        self._cache.move_to_end(name)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def __getitem__(self, name):
+        record = self._cache.get(name)
+        if record is not None:
+            self._cache.move_to_end(name)
+            return record
+        row = self._conn.execute("SELECT record FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        record = pickle.loads(row[0])
+        self._remember(name, record)
+        return record
+
+    def __setitem__(self, name, record):
+        ordinal = record.birthday_ordinal
+        slot = None
+        if ordinal is not None:
+            birthday = date.fromordinal(ordinal)
+            slot = calendar_slot(birthday.month, birthday.day)
+        search_text = SQLITE_FIELD_SEPARATOR.join(field.lower() for field in record.search_fields())
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+
+        row = self._conn.execute("SELECT id FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            cursor = self._conn.execute(
+                "INSERT INTO contacts (name, birthday_ordinal, birthday_slot, search_text, record) "
+                "VALUES (?, ?, ?, ?, ?)", (name, ordinal, slot, search_text, payload))
+            contact_id = cursor.lastrowid
+            if self._count is not None:
+                self._count += 1
+        else:
+            contact_id, = row
+            self._conn.execute(
+                "UPDATE contacts SET birthday_ordinal = ?, birthday_slot = ?, search_text = ?, record = ? "
+                "WHERE id = ?", (ordinal, slot, search_text, payload, contact_id))
+            self._conn.execute("DELETE FROM phones WHERE contact_id = ?", (contact_id,))
+        self._conn.executemany("INSERT INTO phones (contact_id, phone) VALUES (?, ?)",
+                               ((contact_id, phone) for phone in dict.fromkeys(record.phone_numbers)))
+        self._remember(name, record)
+        self._changed()
+
+    def __delitem__(self, name):
+        row = self._conn.execute("SELECT id FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        self._conn.execute("DELETE FROM phones WHERE contact_id = ?", row)
+        self._conn.execute("DELETE FROM contacts WHERE id = ?", row)
+        self._cache.pop(name, None)
+        if self._count is not None:
+            self._count -= 1
+        self._changed()
+
+    def __contains__(self, name):
+        if name in self._cache:
+            return True
+        return self._conn.execute("SELECT 1 FROM contacts WHERE name = ?", (name,)).fetchone() is not None
+
+    def __len__(self):
+        # Кількість рахується при першому зверненні, щоб відкриття бази не залежало від її розміру.
+        if self._count is None:
+            self._count, = self._conn.execute("SELECT count(*) FROM contacts").fetchone()
+        return self._count
+
+    def __iter__(self):
+        for name, in self._conn.execute("SELECT name FROM contacts ORDER BY id"):
+            yield name
+
+    def _iter_items(self):
+        for name, payload in self._conn.execute("SELECT name, record FROM contacts ORDER BY id"):
+            record = self._cache.get(name)
+            yield name, record if record is not None else pickle.loads(payload)
+
+    def values(self):
+        return _MappedValues(self)
+
+    def items(self):
+        return _MappedItems(self)
+
+    def search_keys(self, search_term):
+        term = search_term.lower()
+        if self._fts and len(term) >= 3:
+            rows = self._conn.execute(
+                "SELECT c.name FROM contacts_fts JOIN contacts c ON c.id = contacts_fts.rowid "
+                "WHERE contacts_fts MATCH ? AND instr(c.search_text, ?) > 0 ORDER BY c.id",
+                ('"' + term.replace('"', '""') + '"', term))
+        else:
+            rows = self._conn.execute(
+                "SELECT name FROM contacts WHERE instr(search_text, ?) > 0 ORDER BY id", (term,))
+        return [name for name, in rows]
+
+    def upcoming_keys(self, today, days):
+        offsets = dict((slot, offset) for offset, slot in upcoming_slots(today, days))
+        if not offsets:
+            return []
+        placeholders = ",".join("?" * len(offsets))
+        rows = self._conn.execute(
+            f"SELECT name, birthday_slot FROM contacts WHERE birthday_slot IN ({placeholders}) ORDER BY id",
+            tuple(offsets))
+        return sorted(((offsets[slot], name) for name, slot in rows), key=lambda item: item[0])
+
+    def phone_keys(self, phone):
+        rows = self._conn.execute(
+            "SELECT c.name FROM phones p JOIN contacts c ON c.id = p.contact_id WHERE p.phone = ? ORDER BY c.id",
+            (phone,))
+        return [name for name, in rows]
+
+    def birthday_keys(self, slots):
+        slots = tuple(slots)
+        placeholders = ",".join("?" * len(slots))
+        rows = self._conn.execute(
+            f"SELECT name FROM contacts WHERE birthday_slot IN ({placeholders}) ORDER BY id", slots)
+        return [name for name, in rows]